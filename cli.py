@@ -3,6 +3,7 @@ from __future__ import annotations
 import argparse
 import logging
 from datetime import datetime, date
+from pathlib import Path
 from typing import Optional
 
 from sim.engines.rng import RNG
@@ -91,9 +92,330 @@ def build_parser() -> argparse.ArgumentParser:
         help="Adjusts narrative tone (default: neutral)",
     )
 
+    worker_parser = subparsers.add_parser(
+        "worker",
+        help="Execute simulation runs queued by the API in SIM_WORKER_MODE=queue (uses SIM_* environment settings)",
+    )
+    worker_parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Run every currently queued simulation and exit instead of polling",
+    )
+    worker_parser.add_argument(
+        "--poll",
+        type=float,
+        default=None,
+        help="Seconds between polls of an empty queue (default: SIM_QUEUE_POLL_INTERVAL)",
+    )
+    worker_parser.add_argument(
+        "--worker-id",
+        default=None,
+        help="Identifier recorded on claimed runs (default: host:pid:random)",
+    )
+
+    compare_parser = subparsers.add_parser(
+        "compare",
+        help="Compare two runs' finance and social series day by day",
+    )
+    for name in ("run_a", "run_b"):
+        compare_parser.add_argument(
+            name,
+            metavar=name.upper(),
+            help="Run id (from SIM_QUEUE_DB or SIM_RUNS_ROOT), run working directory, output/ directory or finance CSV",
+        )
+    compare_parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Holders listed, largest final value delta first (default: 10)",
+    )
+    compare_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the full comparison as JSON",
+    )
+
+    verify_parser = subparsers.add_parser(
+        "verify",
+        help="Re-run a recorded run and check its per-day state hashes, stopping at the first mismatch",
+    )
+    verify_parser.add_argument(
+        "run",
+        metavar="RUN",
+        help="Run id (from SIM_QUEUE_DB or SIM_RUNS_ROOT), run working directory, output/ directory or state hash CSV",
+    )
+    verify_parser.add_argument(
+        "--until",
+        type=_parse_date,
+        default=None,
+        help="Stop checking after this date (default: the last recorded day)",
+    )
+
+    memory_parser = subparsers.add_parser(
+        "memory",
+        help="Maintenance commands for the memory store (uses MEMORY_* environment settings)",
+    )
+    memory_subparsers = memory_parser.add_subparsers(dest="memory_command")
+    requantize_parser = memory_subparsers.add_parser(
+        "requantize",
+        help="Re-encode stored embeddings at a new storage precision",
+    )
+    requantize_parser.add_argument(
+        "--precision",
+        choices=("float32", "float16", "int8"),
+        required=True,
+        help="Target storage precision for embedding blobs",
+    )
+    requantize_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Rows rewritten per transaction (default: 500)",
+    )
+    requantize_parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="Run VACUUM afterwards so SQLite returns freed pages to the filesystem",
+    )
+    rebuild_arcs_parser = memory_subparsers.add_parser(
+        "rebuild-arcs",
+        help="Recompute the rolling per-entity arc accumulators from stored entity states",
+    )
+    rebuild_arcs_parser.add_argument(
+        "--as-of",
+        type=_parse_date,
+        default=None,
+        help="Last day of the rebuilt window, YYYY-MM-DD (default: latest stored entity state)",
+    )
+    compact_parser = memory_subparsers.add_parser(
+        "compact",
+        help="Roll old daily states and chunks up into weekly/monthly aggregates and delete the originals",
+    )
+    compact_parser.add_argument(
+        "--as-of",
+        type=_parse_date,
+        default=None,
+        help="Day retention ages are measured from, YYYY-MM-DD (default: latest stored state)",
+    )
+    compact_parser.add_argument(
+        "--hot-days",
+        type=int,
+        default=None,
+        help="Keep this many recent days at daily resolution (default: MEMORY_RETENTION_HOT_DAYS)",
+    )
+    compact_parser.add_argument(
+        "--monthly-after-days",
+        type=int,
+        default=None,
+        help="Roll days older than this into monthly rather than weekly buckets (default: MEMORY_RETENTION_MONTHLY_AFTER_DAYS)",
+    )
+    embed_worker_parser = memory_subparsers.add_parser(
+        "embed-worker",
+        help="Embed chunks queued by EMBEDDINGS_DEFERRED ticks, polling until interrupted",
+    )
+    embed_worker_parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Drain the current backlog and exit instead of polling",
+    )
+    embed_worker_parser.add_argument(
+        "--interval",
+        type=float,
+        default=None,
+        help="Seconds between polls (default: EMBEDDINGS_WORKER_INTERVAL)",
+    )
+    warm_parser = memory_subparsers.add_parser(
+        "warm-summaries",
+        help="Generate summaries left pending by MEMORY_LAZY_SUMMARIES ticks for recent days",
+    )
+    warm_parser.add_argument(
+        "--days",
+        type=int,
+        default=7,
+        help="Number of most recent days to warm (default: 7)",
+    )
+    warm_parser.add_argument(
+        "--as-of",
+        type=_parse_date,
+        default=None,
+        help="Last day to warm, YYYY-MM-DD (default: latest stored state)",
+    )
+
     return parser
 
 
+def _memory_store():
+    from server.src.memory.config import create_engine_from_config, load_memory_config
+    from server.src.memory.store import MemoryStore
+
+    config = load_memory_config()
+    store = MemoryStore(create_engine_from_config(config), config)
+    store.ensure_schema()
+    return store
+
+
+def _handle_memory(args: argparse.Namespace, parser: argparse.ArgumentParser) -> None:
+    if args.memory_command == "requantize":
+        store = _memory_store()
+        counts = store.requantize_embeddings(args.precision, batch_size=args.batch_size)
+        if args.vacuum and store.config.is_sqlite:
+            with store.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                connection.exec_driver_sql("VACUUM")
+        print(f"Requantised {counts['rewritten']} of {counts['scanned']} embedding(s) to {args.precision}.")
+    elif args.memory_command == "rebuild-arcs":
+        counts = _memory_store().rebuild_arc_accumulators(args.as_of)
+        print(f"Rebuilt arc accumulators for {counts['entities']} entity(ies) from {counts['entries']} summary(ies).")
+    elif args.memory_command == "compact":
+        from server.src.memory.compaction import Compactor
+
+        store = _memory_store()
+        counts = Compactor(store, store.config).compact(
+            args.as_of, hot_days=args.hot_days, monthly_after_days=args.monthly_after_days
+        )
+        print(
+            f"Compacted {counts['states_deleted']} state row(s) into {counts['rollups_written']} rollup(s) "
+            f"and {counts['chunks_deleted']} chunk(s) into {counts['arc_chunks']} arc chunk(s)."
+        )
+    elif args.memory_command == "embed-worker":
+        import threading
+
+        from server.src.memory.embedding_worker import EmbeddingWorker
+
+        store = _memory_store()
+        worker = EmbeddingWorker(store, store.config)
+        if args.once:
+            print(f"Embedded {worker.drain()} queued chunk(s); {store.embedding_backlog()['depth']} remaining.")
+            return
+        stop = threading.Event()
+        try:
+            worker.run_forever(stop, args.interval)
+        except KeyboardInterrupt:
+            stop.set()
+    elif args.memory_command == "warm-summaries":
+        from server.src.memory.lazy_summaries import SummaryMaterializer
+
+        store = _memory_store()
+        generated = SummaryMaterializer(store, store.config).warm(args.days, args.as_of)
+        print(f"Generated {generated} pending summary(ies) over the last {args.days} day(s).")
+    else:
+        parser.print_help()
+
+
+def _handle_worker(args: argparse.Namespace) -> None:
+    import threading
+
+    from server.src.simulations.config import load_simulation_config
+    from server.src.simulations.queue import QueueWorker, RunQueue
+
+    config = load_simulation_config()
+    queue = RunQueue(config.queue_path, lease_seconds=config.lease_seconds, max_attempts=config.max_attempts)
+    worker = QueueWorker(queue, config, worker_id=args.worker_id)
+    if args.once:
+        print(f"Processed {worker.drain()} simulation run(s); queue now {queue.counts()}.")
+        return
+    stop = threading.Event()
+    try:
+        worker.run_forever(stop, args.poll)
+    except KeyboardInterrupt:
+        stop.set()
+
+
+def _run_location(reference: str) -> tuple[Path, Optional[str]]:
+    from server.src.simulations.compare import run_output_location
+    from server.src.simulations.config import load_simulation_config
+    from server.src.simulations.queue import RunQueue
+
+    path = Path(reference)
+    if path.exists():
+        return path, None
+    config = load_simulation_config()
+    if config.queue_path.exists():
+        run = RunQueue(config.queue_path).get(reference)
+        if run is not None:
+            return run_output_location(run)
+    if (config.runs_root / reference).is_dir():
+        return config.runs_root / reference, None
+    raise SystemExit(f"Unknown run {reference!r}: not a path, a queued run id or a directory under {config.runs_root}")
+
+
+def _handle_compare(args: argparse.Namespace) -> None:
+    from server.src.simulations.compare import compare_runs
+
+    (path_a, tag_a), (path_b, tag_b) = _run_location(args.run_a), _run_location(args.run_b)
+    try:
+        comparison = compare_runs(path_a, path_b, labels=(args.run_a, args.run_b), run_tags=(tag_a, tag_b))
+    except (OSError, ValueError) as exc:
+        raise SystemExit(str(exc)) from exc
+    if args.json:
+        print(comparison.model_dump_json(indent=2))
+        return
+    print(f"{comparison.run_a} vs {comparison.run_b}: {comparison.days} day(s), {comparison.holders} holder(s).")
+    if comparison.identical:
+        print("Runs are identical.")
+        return
+    print(
+        f"First divergent day: {comparison.first_divergent_day} "
+        f"(finance {comparison.finance_first_divergent_day or '-'}, social {comparison.social_first_divergent_day or '-'})"
+    )
+    print(f"Divergent days: finance {comparison.divergent_days}, social {comparison.social_divergent_days}")
+    print(
+        f"Final deltas (B - A): value {comparison.final_total_value_delta:+,.2f}, "
+        f"cash {comparison.final_total_cash_delta:+,.2f}; "
+        f"largest daily |value delta| {comparison.max_abs_value_delta:,.2f}"
+    )
+    ranked = sorted(comparison.per_holder, key=lambda holder: abs(holder.final_value_delta or 0.0), reverse=True)
+    for holder in ranked[: args.top]:
+        print(
+            f"  {holder.holder}: value {holder.final_value_delta or 0.0:+,.2f}, cash {holder.final_cash_delta or 0.0:+,.2f}, "
+            f"first diverged {holder.first_divergent_day or '-'}"
+        )
+
+
+def _handle_verify(args: argparse.Namespace) -> None:
+    import contextlib
+    import io
+    import tempfile
+    import time
+
+    from sim.engines.statehash import StateHashMismatch, locate_state_hashes, read_state_hashes, recorded_parameters
+
+    path, tag = _run_location(args.run)
+    try:
+        hashes_path = locate_state_hashes(path, tag)
+        recorded = read_state_hashes(hashes_path)
+        seed, start, step = recorded_parameters(hashes_path)
+    except (OSError, ValueError) as exc:
+        raise SystemExit(str(exc)) from exc
+    if not recorded:
+        raise SystemExit(f"{hashes_path} records no days")
+    until = min(args.until, max(recorded)) if args.until else max(recorded)
+
+    started = time.perf_counter()
+    mismatch: Optional[StateHashMismatch] = None
+    # Rendering does not feed back into the world, so the replay discards its output.
+    with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+        scheduler = SimulationScheduler(
+            state=WorldState.from_files(seed=seed),
+            clock=SimClock(start, until, step=step),
+            renderer=DailyRenderer(fast=True, seed=seed, start=start, base_dir=Path(workdir)),
+            rng=RNG(seed),
+            expected_hashes=recorded,
+        )
+        try:
+            scheduler.run()
+        except StateHashMismatch as exc:
+            mismatch = exc
+    elapsed = time.perf_counter() - started
+
+    checked = sum(1 for day in recorded if scheduler.last_day is not None and day <= scheduler.last_day)
+    if mismatch is not None:
+        print(f"State diverged on {mismatch.day.isoformat()} after {checked} matching day(s).")
+        print(f"  recorded {mismatch.expected}")
+        print(f"  replayed {mismatch.actual}")
+        raise SystemExit(1)
+    print(f"Verified {checked} day(s) of {hashes_path.name} ({start.isoformat()} to {until.isoformat()}) in {elapsed:.2f}s.")
+
+
 def _handle_run(args: argparse.Namespace) -> None:
     if args.until < args.start:
         raise ValueError("End date must be on or after start date.")
@@ -142,6 +464,14 @@ def main(argv: Optional[list[str]] = None) -> None:
 
     if args.command == "run":
         _handle_run(args)
+    elif args.command == "worker":
+        _handle_worker(args)
+    elif args.command == "compare":
+        _handle_compare(args)
+    elif args.command == "verify":
+        _handle_verify(args)
+    elif args.command == "memory":
+        _handle_memory(args, parser)
     else:
         parser.print_help()
 
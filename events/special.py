@@ -29,11 +29,10 @@ def _origin_buy_in(day: date, *, state: WorldState, renderer: DailyRenderer) ->
     symbol = config.COIN_SYMBOL
     quantity = config.INVESTMENT_AMOUNT_USD / price
     for person_id in ("thomas", "jordy"):
-        person = state.people.get(person_id)
-        if not person:
+        if person_id not in state.people:
             continue
-        person.adjust_cash(-config.INVESTMENT_AMOUNT_USD)
-        person.add_tokens(symbol, quantity)
+        state.adjust_cash(person_id, -config.INVESTMENT_AMOUNT_USD)
+        state.add_tokens(person_id, symbol, quantity)
     renderer.add_story_sentence(
         "Morning haze over Toorak Road. Thomas leans on a half-cold long black, rehearsing his pitch.",
         priority=1,
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from server.src.memory.config import create_engine_from_config, load_memory_config
+from server.src.memory.schema import DailyStateWrite, EntityStateWrite, EntityUpsert, EventCreate, TickRunRequest
+from server.src.memory.store import MemoryStore
+from server.src.memory.tick_pipeline import TickPipeline
+
+ENTITIES = [f"person:bench_{index}" for index in range(20)]
+
+
+def _tick(day: date, salt: int) -> TickRunRequest:
+    return TickRunRequest(
+        date=day,
+        entities=[
+            EntityStateWrite(date=day, entity_id=entity, state={"cash": salt + index}, summary=f"{entity} holds {salt + index} on {day}")
+            for index, entity in enumerate(ENTITIES)
+        ],
+        global_state=DailyStateWrite(date=day, global_state={"tick": salt}, summary=f"Tick {salt}"),
+        events=[
+            EventCreate(ts=f"{day.isoformat()}T12:00:00", type="txn", payload={"amount": salt, "n": index}, links=[entity])
+            for index, entity in enumerate(ENTITIES)
+        ],
+    )
+
+
+def run_profile(profile: str, workdir: Path, *, readers: int, seconds: float) -> Dict[str, float]:
+    """Read latency (ms) for ``readers`` retrieval threads while one thread writes ticks back to back."""
+    env = {
+        "MEMORY_ENABLED": "true",
+        "MEMORY_DB_URL": f"sqlite:///{workdir / f'bench_{profile}.db'}",
+        "MEMORY_SQLITE_PROFILE": profile,
+        "VECTOR_DIM": "64",
+    }
+    config = load_memory_config(env)
+    store = MemoryStore(create_engine_from_config(config), config)
+    store.ensure_schema()
+    for entity in ENTITIES:
+        store.upsert_entity(EntityUpsert(id=entity, kind="person", name=entity))
+    pipeline = TickPipeline(store, config)
+    today = date.today()
+    for offset in range(14):
+        pipeline.run(_tick(today - timedelta(days=14 - offset), offset))
+
+    stop = threading.Event()
+    latencies: List[float] = []
+    errors = [0]
+    writes = [0]
+    lock = threading.Lock()
+
+    def writer() -> None:
+        salt = 100
+        while not stop.is_set():
+            try:
+                pipeline.run(_tick(today, salt))
+                writes[0] += 1
+            except Exception:
+                errors[0] += 1
+            salt += 1
+
+    def reader(index: int) -> None:
+        entity = ENTITIES[index % len(ENTITIES)]
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                # The SQL half of a retrieval: state window, linked events and a keyword search.
+                store.get_recent_entity_states([entity], 14)
+                store.get_recent_events([entity], window_days=60, limit=200)
+                store.keyword_search_chunks("holds", 50)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                continue
+            with lock:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    if not latencies:
+        return {"reads": 0, "writes": writes[0], "errors": errors[0]}
+    return {
+        "reads": len(latencies),
+        "writes": writes[0],
+        "errors": errors[0],
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2),
+        "max_ms": round(latencies[-1], 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare SQLite read latency under concurrent tick writes")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent retrieval threads")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Measurement window per profile")
+    parser.add_argument("--profiles", nargs="+", default=["compat", "performance"], help="MEMORY_SQLITE_PROFILE values to compare")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in args.profiles:
+            result = run_profile(profile, Path(tmp), readers=args.readers, seconds=args.seconds)
+            print(f"{profile:<12} " + " ".join(f"{key}={value}" for key, value in result.items()))
+
+
+if __name__ == "__main__":
+    main()
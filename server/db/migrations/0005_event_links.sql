@@ -0,0 +1,11 @@
+CREATE TABLE IF NOT EXISTS event_links (
+  event_id BIGINT NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+  entity_id TEXT NOT NULL,
+  ts TIMESTAMPTZ NOT NULL,
+  PRIMARY KEY (event_id, entity_id)
+);
+CREATE INDEX IF NOT EXISTS event_links_entity_ts_idx ON event_links (entity_id, ts DESC);
+
+INSERT INTO event_links (event_id, entity_id, ts)
+  SELECT DISTINCT id, unnest(links), ts FROM events WHERE links IS NOT NULL
+  ON CONFLICT DO NOTHING;
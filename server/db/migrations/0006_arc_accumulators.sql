@@ -0,0 +1,5 @@
+CREATE TABLE IF NOT EXISTS arc_accumulators (
+  entity_id TEXT PRIMARY KEY REFERENCES entities(id) ON DELETE CASCADE,
+  entries JSONB NOT NULL DEFAULT '[]'::jsonb,
+  updated_through DATE
+);
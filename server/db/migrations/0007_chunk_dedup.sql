@@ -0,0 +1,10 @@
+ALTER TABLE chunks ADD COLUMN IF NOT EXISTS content_hash TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS chunks_content_hash_idx ON chunks (content_hash);
+
+CREATE TABLE IF NOT EXISTS chunk_refs (
+  chunk_id BIGINT NOT NULL REFERENCES chunks(id) ON DELETE CASCADE,
+  ref_type TEXT NOT NULL DEFAULT '',
+  ref_id TEXT NOT NULL DEFAULT '',
+  ts TEXT NOT NULL DEFAULT '',
+  PRIMARY KEY (chunk_id, ref_type, ref_id, ts)
+);
@@ -0,0 +1,11 @@
+CREATE TABLE IF NOT EXISTS state_rollups (
+  scope TEXT NOT NULL,
+  period TEXT NOT NULL,
+  period_start DATE NOT NULL,
+  period_end DATE NOT NULL,
+  days INTEGER NOT NULL DEFAULT 0,
+  metrics JSONB NOT NULL DEFAULT '{}'::jsonb,
+  summary TEXT,
+  PRIMARY KEY (scope, period, period_start)
+);
+CREATE INDEX IF NOT EXISTS state_rollups_period_idx ON state_rollups (period, period_start);
@@ -0,0 +1,19 @@
+CREATE TABLE IF NOT EXISTS entity_metric (
+  entity_id TEXT NOT NULL,
+  key TEXT NOT NULL,
+  date DATE NOT NULL,
+  value DOUBLE PRECISION NOT NULL,
+  PRIMARY KEY (entity_id, key, date)
+);
+
+INSERT INTO entity_metric (entity_id, key, date, value)
+  SELECT entity_state.entity_id, item.key, entity_state.date, (item.value #>> '{}')::double precision
+  FROM entity_state, jsonb_each(entity_state.state) AS item
+  WHERE jsonb_typeof(item.value) = 'number'
+  ON CONFLICT DO NOTHING;
+
+INSERT INTO entity_metric (entity_id, key, date, value)
+  SELECT '__global__', item.key, daily_state.date, (item.value #>> '{}')::double precision
+  FROM daily_state, jsonb_each(daily_state.global_state) AS item
+  WHERE jsonb_typeof(item.value) = 'number'
+  ON CONFLICT DO NOTHING;
@@ -0,0 +1,4 @@
+ALTER TABLE embedding_queue ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMPTZ;
+
+DELETE FROM embeddings WHERE id NOT IN (SELECT MIN(id) FROM embeddings GROUP BY chunk_id);
+CREATE UNIQUE INDEX IF NOT EXISTS embeddings_chunk_id_key ON embeddings (chunk_id);
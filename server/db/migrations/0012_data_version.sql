@@ -0,0 +1,5 @@
+CREATE TABLE IF NOT EXISTS data_version (
+  id INTEGER PRIMARY KEY CHECK (id = 1),
+  version BIGINT NOT NULL
+);
+INSERT INTO data_version (id, version) VALUES (1, 0) ON CONFLICT DO NOTHING;
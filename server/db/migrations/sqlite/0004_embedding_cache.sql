@@ -0,0 +1,7 @@
+CREATE TABLE IF NOT EXISTS embedding_cache (
+  key TEXT PRIMARY KEY,
+  model TEXT NOT NULL,
+  dim INTEGER NOT NULL,
+  embedding BLOB NOT NULL,
+  created_at TEXT DEFAULT (datetime('now'))
+);
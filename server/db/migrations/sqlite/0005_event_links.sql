@@ -0,0 +1,14 @@
+CREATE TABLE IF NOT EXISTS event_links (
+  event_id INTEGER NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+  entity_id TEXT NOT NULL,
+  ts TEXT NOT NULL,
+  PRIMARY KEY (event_id, entity_id)
+);
+CREATE INDEX IF NOT EXISTS event_links_entity_ts_idx ON event_links (entity_id, ts DESC);
+
+INSERT OR IGNORE INTO event_links (event_id, entity_id, ts)
+  SELECT events.id, json_each.value, events.ts
+  FROM events, json_each(events.links)
+  WHERE events.links IS NOT NULL AND json_valid(events.links);
+
+DROP INDEX IF EXISTS events_links_idx;
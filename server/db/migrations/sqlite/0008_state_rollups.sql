@@ -0,0 +1,11 @@
+CREATE TABLE IF NOT EXISTS state_rollups (
+  scope TEXT NOT NULL,
+  period TEXT NOT NULL,
+  period_start TEXT NOT NULL,
+  period_end TEXT NOT NULL,
+  days INTEGER NOT NULL DEFAULT 0,
+  metrics TEXT NOT NULL DEFAULT '{}' CHECK (json_valid(metrics)),
+  summary TEXT,
+  PRIMARY KEY (scope, period, period_start)
+);
+CREATE INDEX IF NOT EXISTS state_rollups_period_idx ON state_rollups (period, period_start);
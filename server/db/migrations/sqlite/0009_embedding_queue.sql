@@ -0,0 +1,6 @@
+CREATE TABLE IF NOT EXISTS embedding_queue (
+  chunk_id INTEGER PRIMARY KEY REFERENCES chunks(id) ON DELETE CASCADE,
+  enqueued_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS embedding_queue_enqueued_idx ON embedding_queue (enqueued_at);
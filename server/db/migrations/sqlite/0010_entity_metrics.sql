@@ -0,0 +1,17 @@
+CREATE TABLE IF NOT EXISTS entity_metric (
+  entity_id TEXT NOT NULL,
+  key TEXT NOT NULL,
+  date TEXT NOT NULL,
+  value REAL NOT NULL,
+  PRIMARY KEY (entity_id, key, date)
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO entity_metric (entity_id, key, date, value)
+  SELECT entity_state.entity_id, json_each.key, entity_state.date, json_each.value
+  FROM entity_state, json_each(entity_state.state)
+  WHERE json_valid(entity_state.state) AND json_each.type IN ('integer', 'real');
+
+INSERT OR IGNORE INTO entity_metric (entity_id, key, date, value)
+  SELECT '__global__', json_each.key, daily_state.date, json_each.value
+  FROM daily_state, json_each(daily_state.global_state)
+  WHERE json_valid(daily_state.global_state) AND json_each.type IN ('integer', 'real');
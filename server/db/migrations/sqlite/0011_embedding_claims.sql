@@ -0,0 +1,5 @@
+ALTER TABLE embedding_queue ADD COLUMN claimed_until TEXT;
+
+DELETE FROM embeddings WHERE id NOT IN (SELECT MIN(id) FROM embeddings GROUP BY chunk_id);
+DROP INDEX IF EXISTS embeddings_chunk_idx;
+CREATE UNIQUE INDEX IF NOT EXISTS embeddings_chunk_id_key ON embeddings (chunk_id);
@@ -10,7 +10,7 @@ import httpx
 
 from .memory.chunker import Chunker
 from .memory.config import MemoryConfig, create_engine_from_config, load_memory_config
-from .memory.embeddings import embed_batch
+from .memory.embedding_worker import embed_chunks
 from .memory.retriever import Retriever, RetrieverLimitsOverride
 from .memory.schema import ChunkInput, PromptPack, RetrieveRequest
 from .memory.store import MemoryStore
@@ -280,10 +280,7 @@ class AppBrain:
         if not chunk_inputs:
             return
         records = self.store.add_chunks(chunk_inputs)
-        if self.config.vector_dim and records:
-            vectors = embed_batch((record.text for record in records), self.config)
-            pairs = list(zip([record.id for record in records], vectors))
-            self.store.add_embeddings(pairs)
+        embed_chunks(self.store, self.config, records)
 
 
 def _invoke_llm(messages: List[Dict[str, object]], config: MemoryConfig, max_tokens: int) -> Dict[str, object]:
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import calendar
+from datetime import date, timedelta
+from typing import List, Optional, Sequence, Tuple
+
+ArcEntry = Tuple[str, str]
+
+ARC_WINDOW_DAYS = 31
+WEEKLY_ARC_DAYS = 28
+ARC_SAMPLE_SIZE = 5
+
+
+def merge_arc_entry(
+    entries: Sequence[Sequence[str]],
+    day: date,
+    summary: Optional[str],
+    *,
+    window_days: int = ARC_WINDOW_DAYS,
+) -> List[ArcEntry]:
+    """Fold one day's summary into a rolling accumulator of ``(iso_date, summary)`` pairs.
+
+    Re-running a day replaces its entry, and anything older than ``window_days`` before ``day``
+    is dropped, so the accumulator stays bounded no matter how long the world runs.
+    """
+    iso = day.isoformat()
+    cutoff = (day - timedelta(days=window_days - 1)).isoformat()
+    merged = {entry_date: text for entry_date, text in entries if cutoff <= entry_date and entry_date != iso}
+    if summary:
+        merged[iso] = summary
+    return sorted(merged.items())
+
+
+def arc_summaries(entries: Sequence[Sequence[str]], start: date, end: date) -> List[str]:
+    """Summaries whose date falls within ``[start, end]``, oldest first."""
+    lower, upper = start.isoformat(), end.isoformat()
+    return [text for entry_date, text in entries if lower <= entry_date <= upper and text]
+
+
+def sample_summaries(summaries: Sequence[str], size: int = ARC_SAMPLE_SIZE) -> List[str]:
+    """Evenly spaced picks (always including the latest) so long spans are not just their last days."""
+    if len(summaries) <= size:
+        return list(summaries)
+    step = (len(summaries) - 1) / (size - 1)
+    return [summaries[round(index * step)] for index in range(size)]
+
+
+def is_weekly_arc_day(day: date) -> bool:
+    return day.weekday() == 6
+
+
+def is_monthly_arc_day(day: date) -> bool:
+    return day.day == calendar.monthrange(day.year, day.month)[1]
+
+
+__all__ = [
+    "ARC_WINDOW_DAYS",
+    "WEEKLY_ARC_DAYS",
+    "arc_summaries",
+    "is_monthly_arc_day",
+    "is_weekly_arc_day",
+    "merge_arc_entry",
+    "sample_summaries",
+]
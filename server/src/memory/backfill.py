@@ -0,0 +1,356 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+
+from .config import MemoryConfig
+from .embedding_worker import embed_chunks
+from .schema import (
+    ChunkInput,
+    DailyStateRecord,
+    Entity,
+    EntityStateRecord,
+    EventCreate,
+    EventLinkRecord,
+    EventRecord,
+    EventResponse,
+    GLOBAL_ROLLUP_SCOPE,
+)
+from .store import MemoryStore
+from .tick_pipeline import TickPipeline, event_chunk_text
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BackfillDay:
+    day: date
+    states: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    events: List[EventCreate] = field(default_factory=list)
+    rows: int = 0
+
+
+def iter_backfill_days(path: Path, *, after: Optional[date] = None) -> Iterator[BackfillDay]:
+    """Stream ``date,entity_id,metric,value[,ts,actor_id,type]`` rows grouped into days.
+
+    Rows must be sorted (or at least grouped) by ascending date so only one day is held in memory.
+    Days up to and including ``after`` are skipped without being materialised.
+    """
+    current: Optional[BackfillDay] = None
+    with path.open(newline="") as handle:
+        for line_no, row in enumerate(csv.DictReader(handle), start=2):
+            row_date = date.fromisoformat(row["date"])
+            if after is not None and row_date <= after:
+                continue
+            if current is None or row_date != current.day:
+                if current is not None:
+                    if row_date < current.day:
+                        raise ValueError(
+                            f"{path}:{line_no}: {row_date.isoformat()} follows {current.day.isoformat()}; sort the CSV by date"
+                        )
+                    yield current
+                current = BackfillDay(day=row_date)
+            entity_id = row["entity_id"]
+            metric = row.get("metric") or "value"
+            value = float(row.get("value") or 0)
+            current.states.setdefault(entity_id, {})[metric] = value
+            ts = datetime.fromisoformat(row.get("ts") or f"{row['date']}T00:00:00")
+            current.events.append(
+                EventCreate(
+                    # SQLite drops an offset without converting, so offsets are resolved to UTC here.
+                    ts=ts.astimezone(timezone.utc) if ts.tzinfo else ts,
+                    actor_id=row.get("actor_id") or None,
+                    type=row.get("type") or "txn",
+                    payload={"metric": metric, "value": value},
+                    links=[entity_id],
+                )
+            )
+            current.rows += 1
+    if current is not None:
+        yield current
+
+
+def read_checkpoint(path: Path, source: Path) -> Optional[date]:
+    if not path.exists():
+        return None
+    data = json.loads(path.read_text())
+    if data.get("source") != str(source.resolve()):
+        raise ValueError(f"Checkpoint {path} belongs to {data.get('source')}; pass --restart to discard it")
+    return date.fromisoformat(data["last_day"])
+
+
+def write_checkpoint(path: Path, source: Path, last_day: date, *, days: int, rows: int) -> None:
+    """Atomically record the last fully committed day."""
+    payload = {"source": str(source.resolve()), "last_day": last_day.isoformat(), "days": days, "rows": rows}
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(payload, indent=2))
+    os.replace(tmp, path)
+
+
+class BulkBackfill:
+    """Resumable bulk loader: many days per transaction, summaries on a worker pool.
+
+    Each batch of ``batch_days`` days is written in a single transaction: raw events go in via
+    ``COPY`` on Postgres or a multi-row ``INSERT ... RETURNING`` on SQLite, states are upserted,
+    and chunks, arcs and embeddings are produced exactly as :class:`TickPipeline` would. The
+    checkpoint file is rewritten after every commit, so a rerun resumes after the last committed day.
+    """
+
+    def __init__(
+        self,
+        store: MemoryStore,
+        config: MemoryConfig,
+        *,
+        batch_days: int = 30,
+        workers: int = 4,
+    ) -> None:
+        self.store = store
+        self.config = config
+        self.batch_days = max(1, batch_days)
+        self.workers = max(1, workers)
+        self.pipeline = TickPipeline(store, config)
+
+    def run(self, source: Path, *, checkpoint: Optional[Path] = None) -> Dict[str, int]:
+        self.store.ensure_schema()
+        resume_after = read_checkpoint(checkpoint, source) if checkpoint else None
+        totals = {"days": 0, "rows": 0, "events": 0, "chunks": 0, "embeddings": 0, "embeddings_queued": 0}
+        first_batch = True
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="memory-backfill") as executor:
+            for batch in _batched(iter_backfill_days(source, after=resume_after), self.batch_days):
+                # Only the first batch after a resume can repeat a commit whose checkpoint write was lost.
+                counts = self._load_batch(batch, executor, skip_existing=first_batch and resume_after is not None)
+                first_batch = False
+                totals["days"] += len(batch)
+                for key in ("rows", "events", "chunks", "embeddings", "embeddings_queued"):
+                    totals[key] += counts[key]
+                if checkpoint:
+                    write_checkpoint(checkpoint, source, batch[-1].day, days=totals["days"], rows=totals["rows"])
+                logger.info("memory.backfill.batch", extra={"through": batch[-1].day.isoformat(), **counts})
+        return totals
+
+    # ------------------------------------------------------------------
+    def _load_batch(self, batch: Sequence[BackfillDay], executor: ThreadPoolExecutor, *, skip_existing: bool) -> Dict[str, int]:
+        summaries = self._summarise(batch, executor)
+        with self.store.write_session() as session:
+            self._ensure_entities(session, batch)
+            if skip_existing:
+                batch = self._drop_loaded_events(session, batch)
+            events = self._insert_events(session, [event for day in batch for event in day.events])
+            self._upsert_states(session, batch, summaries)
+
+            chunk_inputs: List[ChunkInput] = []
+            for day in batch:
+                ts = datetime.combine(day.day, datetime.min.time())
+                # Lazy mode leaves summaries pending: no summary chunk and no arc entry until materialised.
+                day_summaries = {entity_id: summaries[(day.day, entity_id)] for entity_id in day.states}
+                day_summaries = {entity_id: summary for entity_id, summary in day_summaries.items() if summary}
+                for entity_id, summary in day_summaries.items():
+                    chunk_inputs.extend(self.pipeline.chunker.chunk_entity_summary(entity_id, summary, ts))
+                accumulators = self.store.update_arc_accumulators(day.day, day_summaries, session=session)
+                chunk_inputs.extend(self.pipeline.arc_chunks(day.day, accumulators))
+            for event in events:
+                chunk_inputs.extend(
+                    self.pipeline.chunker.chunk_event(
+                        event.id, event_chunk_text(event.id, event.type, event.payload), event.ts, event.links
+                    )
+                )
+
+            records = self.store.add_chunks(chunk_inputs, session=session)
+            embedded, queued = embed_chunks(self.store, self.config, records, session=session)
+        return {
+            "rows": sum(day.rows for day in batch),
+            "events": len(events),
+            "chunks": len(records),
+            "embeddings": embedded,
+            "embeddings_queued": queued,
+        }
+
+    def _summarise(self, batch: Sequence[BackfillDay], executor: ThreadPoolExecutor) -> Dict[Tuple[date, str], Optional[str]]:
+        """Entity and daily summaries for the whole batch, fanned out over the worker pool."""
+        if self.config.summaries_lazy:
+            return {key: None for day in batch for key in [(day.day, "")] + [(day.day, entity_id) for entity_id in day.states]}
+        summarizer = self.pipeline.summarizer
+        jobs: Dict[Tuple[date, str], Any] = {}
+        for day in batch:
+            events = [_as_response(index, event) for index, event in enumerate(day.events)]
+            for entity_id, state in day.states.items():
+                linked = [event for event in events if entity_id in event.links]
+                jobs[(day.day, entity_id)] = executor.submit(summarizer.summarize_entity_day, entity_id, state, linked, day.day)
+            headlines = [event.type or "event" for event in day.events]
+            jobs[(day.day, "")] = executor.submit(summarizer.summarize_daily, _global_state(day), headlines, day.day)
+        return {key: future.result() for key, future in jobs.items()}
+
+    def _ensure_entities(self, session: Session, batch: Sequence[BackfillDay]) -> None:
+        ids: Set[str] = set()
+        for day in batch:
+            ids.update(day.states)
+            ids.update(event.actor_id for event in day.events if event.actor_id)
+        if ids:
+            session.execute(
+                self.store._insert_ignore(Entity),
+                [{"id": value, "kind": value.split(":", 1)[0] if ":" in value else "entity", "meta": {}} for value in sorted(ids)],
+            )
+
+    def _drop_loaded_events(self, session: Session, batch: Sequence[BackfillDay]) -> List[BackfillDay]:
+        """Skip events already committed for these days (a replayed batch); states are upserts anyway."""
+        # A day widens the window each way: an event's UTC instant can fall outside its local date.
+        start = datetime.combine(batch[0].day - timedelta(days=1), datetime.min.time())
+        end = datetime.combine(batch[-1].day + timedelta(days=2), datetime.min.time())
+        existing = {
+            _fingerprint(record.ts, record.actor_id, record.type, record.payload, record.links)
+            for record in session.execute(select(EventRecord).where(EventRecord.ts >= start).where(EventRecord.ts < end)).scalars()
+        }
+        if not existing:
+            return list(batch)
+        for day in batch:
+            day.events = [
+                event
+                for event in day.events
+                if _fingerprint(event.ts, event.actor_id, event.type, event.payload, event.links) not in existing
+            ]
+        return list(batch)
+
+    def _insert_events(self, session: Session, events: Sequence[EventCreate]) -> List[EventResponse]:
+        if not events:
+            return []
+        if self.config.is_postgres:
+            ids = list(
+                session.execute(
+                    text("SELECT nextval(pg_get_serial_sequence('events', 'id')) FROM generate_series(1, :n)"),
+                    {"n": len(events)},
+                ).scalars()
+            )
+            _copy_rows(
+                session,
+                "events",
+                ("id", "ts", "actor_id", "type", "payload", "links"),
+                (
+                    (event_id, event.ts.isoformat(), event.actor_id, event.type, json.dumps(event.payload), _pg_array(event.links))
+                    for event_id, event in zip(ids, events)
+                ),
+            )
+        else:
+            rows = [
+                {"ts": event.ts, "actor_id": event.actor_id, "type": event.type, "payload": event.payload, "links": event.links}
+                for event in events
+            ]
+            ids = list(session.execute(insert(EventRecord).returning(EventRecord.id, sort_by_parameter_order=True), rows).scalars())
+
+        responses = [
+            EventResponse(id=event_id, ts=event.ts, actor_id=event.actor_id, type=event.type, payload=event.payload, links=event.links)
+            for event_id, event in zip(ids, events)
+        ]
+        links = [(event.id, link, event.ts) for event in responses for link in dict.fromkeys(event.links)]
+        if links and self.config.is_postgres:
+            _copy_rows(session, "event_links", ("event_id", "entity_id", "ts"), ((a, b, c.isoformat()) for a, b, c in links))
+        elif links:
+            session.execute(
+                self.store._insert_ignore(EventLinkRecord),
+                [{"event_id": event_id, "entity_id": entity_id, "ts": ts} for event_id, entity_id, ts in links],
+            )
+        return responses
+
+    def _upsert_states(
+        self,
+        session: Session,
+        batch: Sequence[BackfillDay],
+        summaries: Dict[Tuple[date, str], Optional[str]],
+    ) -> None:
+        entity_rows = [
+            {"date": day.day, "entity_id": entity_id, "state": state, "summary": summaries[(day.day, entity_id)]}
+            for day in batch
+            for entity_id, state in day.states.items()
+        ]
+        daily_rows = [
+            {"date": day.day, "global_state": _global_state(day), "summary": summaries[(day.day, "")]} for day in batch
+        ]
+        self.store.replace_metrics(
+            [(row["entity_id"], row["date"], row["state"]) for row in entity_rows]
+            + [(GLOBAL_ROLLUP_SCOPE, row["date"], row["global_state"]) for row in daily_rows],
+            session=session,
+        )
+        if entity_rows:
+            stmt = self.store._dialect_insert(EntityStateRecord)
+            session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["date", "entity_id"],
+                    set_={"state": stmt.excluded.state, "summary": stmt.excluded.summary},
+                ),
+                entity_rows,
+            )
+        if daily_rows:
+            stmt = self.store._dialect_insert(DailyStateRecord)
+            session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["date"],
+                    set_={"global_state": stmt.excluded.global_state, "summary": stmt.excluded.summary},
+                ),
+                daily_rows,
+            )
+
+
+def _batched(days: Iterable[BackfillDay], size: int) -> Iterator[List[BackfillDay]]:
+    batch: List[BackfillDay] = []
+    for day in days:
+        batch.append(day)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _global_state(day: BackfillDay) -> Dict[str, int]:
+    return {"entities": len(day.states), "total_events": len(day.events)}
+
+
+def _as_response(index: int, event: EventCreate) -> EventResponse:
+    return EventResponse(id=index, ts=event.ts, actor_id=event.actor_id, type=event.type, payload=event.payload, links=event.links)
+
+
+def _fingerprint(ts: datetime, actor_id: Optional[str], event_type: Optional[str], payload: Any, links: Any) -> Tuple[Any, ...]:
+    # Compare instants in naive UTC: Postgres returns stored events in UTC, SQLite returns them naive.
+    stamp = (ts.astimezone(timezone.utc) if ts.tzinfo else ts).replace(tzinfo=None).isoformat() if ts else ""
+    return stamp, actor_id, event_type, json.dumps(payload or {}, sort_keys=True), tuple(links or ())
+
+
+def _pg_array(values: Sequence[str]) -> str:
+    escaped = ('"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"' for value in values)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _copy_rows(session: Session, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> None:
+    """Stream rows through ``COPY ... FROM STDIN`` on the session's own connection (Postgres only)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["\\N" if value is None else value for value in row])
+    buffer.seek(0)
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+__all__ = [
+    "BackfillDay",
+    "BulkBackfill",
+    "iter_backfill_days",
+    "read_checkpoint",
+    "write_checkpoint",
+]
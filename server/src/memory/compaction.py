@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import calendar
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .arcs import sample_summaries
+from .chunker import Chunker
+from .config import MemoryConfig
+from .embedding_worker import embed_chunks
+from .schema import GLOBAL_ROLLUP_SCOPE, ChunkInput, ChunkRecord, StateRollupRecord
+from .store import MemoryStore
+from .summarizer import Summarizer
+
+logger = logging.getLogger(__name__)
+
+COMPACTABLE_CHUNK_TYPES = ("entity_state", "event", "arc_rollup")
+ROLLUP_CHUNK_TYPE = "arc_rollup"
+
+Bucket = Tuple[str, date]
+
+
+@dataclass
+class _Rollup:
+    period: str
+    start: date
+    end: date
+    days: int = 0
+    metrics: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    summaries: List[str] = field(default_factory=list)
+
+
+class Compactor:
+    """Tiered retention: fold old daily rows into weekly/monthly rollups and old chunks into arc chunks.
+
+    Relative to ``as_of`` (the newest stored state day by default), days older than
+    ``retention_hot_days`` are rolled into weekly buckets and days older than
+    ``retention_monthly_after_days`` into monthly buckets; weekly rollups that age past the monthly
+    threshold are merged into their month. The originals are deleted once their rollup is written.
+    """
+
+    def __init__(self, store: MemoryStore, config: MemoryConfig) -> None:
+        self.store = store
+        self.config = config
+        self.summarizer = Summarizer(config)
+        self.chunker = Chunker(config)
+
+    def compact(
+        self,
+        as_of: Optional[date] = None,
+        *,
+        hot_days: Optional[int] = None,
+        monthly_after_days: Optional[int] = None,
+    ) -> Dict[str, int]:
+        stats = {"scopes": 0, "states_deleted": 0, "rollups_written": 0, "chunks_deleted": 0, "arc_chunks": 0}
+        as_of = as_of or self.store.latest_state_date()
+        if as_of is None:
+            return stats
+        hot_days = self.config.retention_hot_days if hot_days is None else hot_days
+        monthly_after_days = self.config.retention_monthly_after_days if monthly_after_days is None else monthly_after_days
+        hot_cutoff = as_of - timedelta(days=hot_days)
+        monthly_cutoff = as_of - timedelta(days=max(monthly_after_days, hot_days))
+
+        scopes = list(dict.fromkeys(self.store.state_scopes_before(hot_cutoff) + self.store.weekly_rollup_scopes_before(monthly_cutoff)))
+        for scope in scopes:
+            written, deleted = self._compact_states(scope, hot_cutoff, monthly_cutoff)
+            stats["rollups_written"] += written
+            stats["states_deleted"] += deleted
+        stats["scopes"] = len(scopes)
+
+        chunk_stats = self._compact_chunks(hot_cutoff, monthly_cutoff)
+        stats.update(chunk_stats)
+        logger.info("memory.compaction.done", extra={"as_of": as_of.isoformat(), **stats})
+        return stats
+
+    # ------------------------------------------------------------------
+    def _compact_states(self, scope: str, hot_cutoff: date, monthly_cutoff: date) -> Tuple[int, int]:
+        rollups: Dict[Bucket, _Rollup] = {}
+        for day, state, summary in self.store.get_states_before(scope, hot_cutoff):
+            bucket = _bucket(day, monthly_cutoff)
+            rollup = rollups.setdefault(bucket, _new_rollup(bucket))
+            rollup.days += 1
+            fold_metrics(rollup.metrics, state, day)
+            if summary:
+                rollup.summaries.append(summary)
+
+        # Existing rollups are only touched when new days land in their bucket or they age into a month.
+        existing = self.store.get_state_rollups(scope)
+        touched = set(rollups)
+        touched.update(
+            _bucket(record.period_start, monthly_cutoff)
+            for record in existing
+            if _bucket(record.period_start, monthly_cutoff) != (record.period, record.period_start)
+        )
+        remove: List[Bucket] = []
+        prior: Dict[Bucket, List[str]] = {}
+        for record in existing:
+            own = (record.period, record.period_start)
+            bucket = _bucket(record.period_start, monthly_cutoff)
+            if bucket not in touched:
+                continue
+            if bucket != own:
+                remove.append(own)
+            rollup = rollups.setdefault(bucket, _new_rollup(bucket))
+            rollup.days += record.days
+            rollup.metrics = merge_metrics(record.metrics or {}, rollup.metrics)
+            if record.summary:
+                prior.setdefault(bucket, []).append(_strip_rollup_label(record.summary))
+        if not rollups:
+            return 0, 0
+        for bucket, summaries in prior.items():
+            rollups[bucket].summaries[:0] = summaries
+
+        records = [
+            StateRollupRecord(
+                scope=scope,
+                period=rollup.period,
+                period_start=rollup.start,
+                period_end=rollup.end,
+                days=rollup.days,
+                metrics=rollup.metrics,
+                summary=self._rollup_summary(scope, rollup),
+            )
+            for rollup in rollups.values()
+        ]
+        deleted = self.store.save_state_rollups(scope, records, remove=remove, states_before=hot_cutoff)
+        return len(records), deleted
+
+    def _compact_chunks(self, hot_cutoff: date, monthly_cutoff: date) -> Dict[str, int]:
+        """Walk old chunks one period at a time so memory stays bounded by a single week/month."""
+        cutoff_ts = _midnight(hot_cutoff)
+        deleted = written = 0
+        cursor = self.store.earliest_chunk_ts(cutoff_ts, COMPACTABLE_CHUNK_TYPES)
+        while cursor is not None:
+            period, start = _bucket(cursor.date(), monthly_cutoff)
+            # Windows never straddle the monthly cutoff, so a monthly rollup is never re-read as weekly.
+            window_start = _midnight(start)
+            window_end = min(_midnight(_period_end(period, start) + timedelta(days=1)), cutoff_ts)
+            if period == "monthly":
+                window_end = min(window_end, _midnight(monthly_cutoff))
+            chunks = self.store.get_chunks_between(window_start, window_end, COMPACTABLE_CHUNK_TYPES)
+
+            groups: Dict[str, List[ChunkRecord]] = {}
+            for chunk in chunks:
+                groups.setdefault(_chunk_scope(chunk), []).append(chunk)
+            arc_inputs: List[ChunkInput] = []
+            originals: List[int] = []
+            label = f"{period.title()} rollup {start.isoformat()}..{_period_end(period, start).isoformat()}"
+            for scope, members in groups.items():
+                if len(members) == 1 and members[0].ref_type == ROLLUP_CHUNK_TYPE and (members[0].meta or {}).get("period") == period:
+                    continue
+                text = self.summarizer.summarize_arc(scope, sample_summaries([chunk.text for chunk in members]), label=label)
+                meta = {
+                    "entity_id": scope,
+                    "period": period,
+                    "period_start": start.isoformat(),
+                    "compacted_from": sum(int((chunk.meta or {}).get("compacted_from", 1)) for chunk in members),
+                }
+                arc_inputs.extend(
+                    self.chunker.chunk_text(text, ref_type=ROLLUP_CHUNK_TYPE, ref_id=scope, ts=window_start, meta=meta)
+                )
+                originals.extend(chunk.id for chunk in members)
+
+            if arc_inputs:
+                records = self.store.add_chunks(arc_inputs)
+                kept = {record.id for record in records}
+                deleted += self.store.delete_chunks([chunk_id for chunk_id in originals if chunk_id not in kept])
+                written += len(records)
+                embed_chunks(self.store, self.config, records)
+            cursor = self.store.earliest_chunk_ts(cutoff_ts, COMPACTABLE_CHUNK_TYPES, after=window_end)
+        return {"chunks_deleted": deleted, "arc_chunks": written}
+
+    def _rollup_summary(self, scope: str, rollup: _Rollup) -> str:
+        subject = "global state" if scope == GLOBAL_ROLLUP_SCOPE else scope
+        label = f"{rollup.period.title()} rollup {rollup.start.isoformat()}..{rollup.end.isoformat()}"
+        return self.summarizer.summarize_arc(subject, sample_summaries(rollup.summaries), label=label)
+
+
+def fold_metrics(metrics: Dict[str, Dict[str, Any]], state: Dict[str, Any], day: date) -> None:
+    """Fold one day's numeric keys into running min/max/mean/last aggregates (in place)."""
+    iso = day.isoformat()
+    for key, value in state.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        merged = merge_metrics(metrics, {key: {"min": value, "max": value, "mean": value, "count": 1, "last": value, "last_date": iso}})
+        metrics[key] = merged[key]
+
+
+def merge_metrics(left: Dict[str, Dict[str, Any]], right: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Combine two aggregate maps; order-independent because ``last`` follows ``last_date``."""
+    merged = {key: dict(stats) for key, stats in left.items()}
+    for key, stats in right.items():
+        current = merged.get(key)
+        if current is None:
+            merged[key] = dict(stats)
+            continue
+        count = current["count"] + stats["count"]
+        current["mean"] = (current["mean"] * current["count"] + stats["mean"] * stats["count"]) / count
+        current["count"] = count
+        current["min"] = min(current["min"], stats["min"])
+        current["max"] = max(current["max"], stats["max"])
+        if stats["last_date"] >= current["last_date"]:
+            current["last"] = stats["last"]
+            current["last_date"] = stats["last_date"]
+    return merged
+
+
+def _bucket(day: date, monthly_cutoff: date) -> Bucket:
+    """Monthly bucket before ``monthly_cutoff``, otherwise a week clipped to its month and the cutoff.
+
+    Clipping keeps every weekly bucket inside one calendar month (so it folds exactly into that month
+    later) and on one side of the cutoff (so re-running with the same policy is a no-op).
+    """
+    if day < monthly_cutoff:
+        return "monthly", day.replace(day=1)
+    return "weekly", max(day - timedelta(days=day.weekday()), day.replace(day=1), monthly_cutoff)
+
+
+def _period_end(period: str, start: date) -> date:
+    month_end = start.replace(day=calendar.monthrange(start.year, start.month)[1])
+    if period == "monthly":
+        return month_end
+    return min(start + timedelta(days=6 - start.weekday()), month_end)
+
+
+def _strip_rollup_label(summary: str) -> str:
+    if summary.startswith(("Weekly rollup ", "Monthly rollup ")) and ": " in summary:
+        return summary.split(": ", 1)[1]
+    return summary
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+
+def _new_rollup(bucket: Bucket) -> _Rollup:
+    period, start = bucket
+    return _Rollup(period=period, start=start, end=_period_end(period, start))
+
+
+def _chunk_scope(chunk: ChunkRecord) -> str:
+    meta = chunk.meta or {}
+    if meta.get("entity_id"):
+        return str(meta["entity_id"])
+    links = meta.get("links") or []
+    if links:
+        return str(links[0])
+    if chunk.ref_type == "entity_state" and chunk.ref_id:
+        return chunk.ref_id
+    return GLOBAL_ROLLUP_SCOPE
+
+
+__all__ = ["Compactor", "fold_metrics", "merge_metrics"]
@@ -2,12 +2,15 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from urllib.parse import urlparse
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.engine import Engine
 
+EMBEDDINGS_BACKENDS = ("auto", "remote", "hashing", "random")
+VECTOR_PRECISIONS = ("float32", "float16", "int8")
+
 
 @dataclass
 class RetrieverLimits:
@@ -22,16 +25,45 @@ class MemoryConfig:
     db_url: str = "sqlite:///./memory.db"
     db_vendor: str = "sqlite"
     embeddings_model: str = "text-embedding-3-large"
+    embeddings_backend: str = "auto"
     llm_model: str = "gpt-4o-mini"
     max_tokens: int = 30_000
     vector_dim: int = 1536
+    vector_precision: str = "float32"
     retriever_limits: RetrieverLimits = field(default_factory=RetrieverLimits)
+    retriever_concurrency: int = 4
+    retriever_stage_timeout: float = 10.0
+    retrieval_cache_size: int = 256
+    retrieval_cache_ttl: float = 300.0
+    retention_hot_days: int = 90
+    retention_monthly_after_days: int = 365
+    compaction_enabled: bool = False
     echo_sql: bool = False
+    sqlite_profile: str = "performance"
+    sqlite_cache_mb: int = 64
+    sqlite_mmap_mb: int = 256
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_read_pool_size: int = 8
     llm_api_base: str = "https://api.openai.com/v1"
     llm_api_key: Optional[str] = None
     embeddings_api_base: str = "https://api.openai.com/v1"
     embeddings_api_key: Optional[str] = None
     http_timeout: float = 15.0
+    http_max_connections: int = 10
+    embeddings_batch_size: int = 96
+    embeddings_batch_tokens: int = 8000
+    embeddings_concurrency: int = 4
+    embeddings_max_retries: int = 3
+    embedding_cache_size: int = 4096
+    embedding_cache_persist: bool = True
+    embeddings_deferred: bool = False
+    embeddings_worker_batch: int = 256
+    embeddings_worker_interval: float = 10.0
+    summaries_lazy: bool = False
+    summary_warm_days: int = 0
+    summarizer_concurrency: int = 4
+    summarizer_timeout: float = 30.0
+    summary_cache_size: int = 2048
 
     @property
     def is_sqlite(self) -> bool:
@@ -41,6 +73,11 @@ class MemoryConfig:
     def is_postgres(self) -> bool:
         return self.db_vendor == "postgres" or self.db_url.startswith("postgres")
 
+    @property
+    def sqlite_tuned(self) -> bool:
+        """WAL + tuned pragmas + a separate read engine; ``MEMORY_SQLITE_PROFILE=compat`` keeps SQLite defaults."""
+        return self.is_sqlite and self.sqlite_profile == "performance" and not _is_sqlite_memory(self.db_url)
+
     @property
     def llm_enabled(self) -> bool:
         return bool(self.llm_api_key and self.llm_model)
@@ -50,6 +87,15 @@ class MemoryConfig:
         key = self.embeddings_api_key or self.llm_api_key
         return bool(key and self.embeddings_model)
 
+    @property
+    def remote_embeddings_enabled(self) -> bool:
+        return self.embeddings_backend in {"auto", "remote"} and self.embeddings_enabled
+
+    @property
+    def local_embeddings_backend(self) -> str:
+        """Backend used offline or when remote calls fail: ``hashing`` (default) or legacy ``random``."""
+        return "random" if self.embeddings_backend == "random" else "hashing"
+
 
 def _determine_vendor(db_url: str, explicit: str | None) -> str:
     if explicit:
@@ -71,25 +117,64 @@ def load_memory_config(env: Dict[str, str] | None = None) -> MemoryConfig:
     enabled = enabled_raw in {"1", "true", "yes", "on"}
     db_url = env.get("MEMORY_DB_URL") or ("sqlite:///./memory.db")
     vendor = _determine_vendor(db_url, env.get("MEMORY_DB_VENDOR"))
+    embeddings_backend = env.get("EMBEDDINGS_BACKEND", "auto").strip().lower()
+    if embeddings_backend not in EMBEDDINGS_BACKENDS:
+        raise ValueError(
+            f"EMBEDDINGS_BACKEND must be one of {', '.join(EMBEDDINGS_BACKENDS)}, got {embeddings_backend!r}"
+        )
+    vector_precision = env.get("VECTOR_PRECISION", "float32").strip().lower()
+    if vector_precision not in VECTOR_PRECISIONS:
+        raise ValueError(
+            f"VECTOR_PRECISION must be one of {', '.join(VECTOR_PRECISIONS)}, got {vector_precision!r}"
+        )
     config = MemoryConfig(
         enabled=enabled,
         db_url=db_url,
         db_vendor=vendor,
         embeddings_model=env.get("EMBEDDINGS_MODEL", "text-embedding-3-large"),
+        embeddings_backend=embeddings_backend,
         llm_model=env.get("LLM_MODEL", "gpt-4o-mini"),
         max_tokens=int(env.get("MEMORY_MAX_TOKENS", "30000")),
         vector_dim=int(env.get("VECTOR_DIM", "1536")),
+        vector_precision=vector_precision,
         retriever_limits=RetrieverLimits(
             chunks=int(env.get("RETRIEVER_LIMIT_CHUNKS", env.get("RETRIEVER_LIMITS_CHUNKS", "200"))),
             events=int(env.get("RETRIEVER_LIMIT_EVENTS", env.get("RETRIEVER_LIMITS_EVENTS", "1000"))),
             states_days=int(env.get("RETRIEVER_LIMIT_STATES_DAYS", env.get("RETRIEVER_LIMITS_STATES_DAYS", "14"))),
         ),
+        retriever_concurrency=int(env.get("RETRIEVER_CONCURRENCY", "4")),
+        retriever_stage_timeout=float(env.get("RETRIEVER_STAGE_TIMEOUT", "10")),
+        retrieval_cache_size=int(env.get("RETRIEVAL_CACHE_SIZE", "256")),
+        retrieval_cache_ttl=float(env.get("RETRIEVAL_CACHE_TTL", "300")),
+        retention_hot_days=int(env.get("MEMORY_RETENTION_HOT_DAYS", "90")),
+        retention_monthly_after_days=int(env.get("MEMORY_RETENTION_MONTHLY_AFTER_DAYS", "365")),
+        compaction_enabled=env.get("MEMORY_COMPACTION_ENABLED", "false").lower() in {"1", "true", "yes", "on"},
         echo_sql=env.get("MEMORY_SQL_ECHO", "false").lower() in {"1", "true", "yes"},
+        sqlite_profile=env.get("MEMORY_SQLITE_PROFILE", "performance").strip().lower(),
+        sqlite_cache_mb=int(env.get("MEMORY_SQLITE_CACHE_MB", "64")),
+        sqlite_mmap_mb=int(env.get("MEMORY_SQLITE_MMAP_MB", "256")),
+        sqlite_busy_timeout_ms=int(env.get("MEMORY_SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        sqlite_read_pool_size=int(env.get("MEMORY_SQLITE_READ_POOL_SIZE", "8")),
         llm_api_base=env.get("LLM_API_BASE", "https://api.openai.com/v1"),
         llm_api_key=env.get("LLM_API_KEY") or env.get("OPENAI_API_KEY"),
         embeddings_api_base=env.get("EMBEDDINGS_API_BASE", env.get("LLM_API_BASE", "https://api.openai.com/v1")),
         embeddings_api_key=env.get("EMBEDDINGS_API_KEY") or env.get("LLM_API_KEY") or env.get("OPENAI_API_KEY"),
         http_timeout=float(env.get("MEMORY_HTTP_TIMEOUT", "15")),
+        http_max_connections=int(env.get("MEMORY_HTTP_MAX_CONNECTIONS", "10")),
+        embeddings_batch_size=int(env.get("EMBEDDINGS_BATCH_SIZE", "96")),
+        embeddings_batch_tokens=int(env.get("EMBEDDINGS_BATCH_TOKENS", "8000")),
+        embeddings_concurrency=int(env.get("EMBEDDINGS_CONCURRENCY", "4")),
+        embeddings_max_retries=int(env.get("EMBEDDINGS_MAX_RETRIES", "3")),
+        embedding_cache_size=int(env.get("EMBEDDING_CACHE_SIZE", "4096")),
+        embedding_cache_persist=env.get("EMBEDDING_CACHE_PERSIST", "true").lower() in {"1", "true", "yes", "on"},
+        embeddings_deferred=env.get("EMBEDDINGS_DEFERRED", "false").lower() in {"1", "true", "yes", "on"},
+        embeddings_worker_batch=int(env.get("EMBEDDINGS_WORKER_BATCH", "256")),
+        embeddings_worker_interval=float(env.get("EMBEDDINGS_WORKER_INTERVAL", "10")),
+        summaries_lazy=env.get("MEMORY_LAZY_SUMMARIES", "false").lower() in {"1", "true", "yes", "on"},
+        summary_warm_days=int(env.get("MEMORY_SUMMARY_WARM_DAYS", "0")),
+        summarizer_concurrency=int(env.get("SUMMARIZER_CONCURRENCY", "4")),
+        summarizer_timeout=float(env.get("SUMMARIZER_TIMEOUT", "30")),
+        summary_cache_size=int(env.get("SUMMARY_CACHE_SIZE", "2048")),
     )
     return config
 
@@ -105,7 +190,69 @@ def create_engine_from_config(config: MemoryConfig) -> Engine:
         pool_pre_ping=True,
         connect_args=connect_args,
     )
+    if config.sqlite_tuned:
+        event.listen(engine, "connect", _sqlite_pragma_listener(config, read_only=False))
     return engine
 
 
-__all__ = ["MemoryConfig", "RetrieverLimits", "load_memory_config", "create_engine_from_config"]
+def create_read_engine(config: MemoryConfig) -> Optional[Engine]:
+    """Read-only engine for the SQLite performance profile, or ``None`` when reads should share the writer.
+
+    In WAL mode readers never block the single writer (or each other), so retrieval gets its own
+    pool of ``query_only`` connections instead of queueing behind tick writes.
+    """
+    if not config.sqlite_tuned:
+        return None
+    engine = create_engine(
+        config.db_url,
+        echo=config.echo_sql,
+        future=True,
+        pool_pre_ping=True,
+        pool_size=config.sqlite_read_pool_size,
+        max_overflow=config.sqlite_read_pool_size,
+        connect_args={"check_same_thread": False},
+    )
+    event.listen(engine, "connect", _sqlite_pragma_listener(config, read_only=True))
+    return engine
+
+
+def sqlite_pragmas(config: MemoryConfig, *, read_only: bool = False) -> List[str]:
+    pragmas = [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA cache_size=-{config.sqlite_cache_mb * 1024}",
+        f"PRAGMA mmap_size={config.sqlite_mmap_mb * 1024 * 1024}",
+        f"PRAGMA busy_timeout={config.sqlite_busy_timeout_ms}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+def _sqlite_pragma_listener(config: MemoryConfig, *, read_only: bool):
+    pragmas = sqlite_pragmas(config, read_only=read_only)
+
+    def apply(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return apply
+
+
+def _is_sqlite_memory(db_url: str) -> bool:
+    return db_url.rstrip("/") == "sqlite:" or ":memory:" in db_url or "mode=memory" in db_url
+
+
+__all__ = [
+    "MemoryConfig",
+    "RetrieverLimits",
+    "create_engine_from_config",
+    "create_read_engine",
+    "load_memory_config",
+    "sqlite_pragmas",
+]
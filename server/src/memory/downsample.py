@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Indices kept by largest-triangle-three-buckets; always includes the first and last sample.
+
+    Each bucket's triangle areas are computed in one NumPy pass, so the Python loop runs once per
+    output point rather than once per input sample.
+    """
+    n = len(x)
+    if points >= n or n <= 2:
+        return np.arange(n)
+    if points < 3:
+        return np.array([0, n - 1])[:max(points, 1)]
+
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Average of the next bucket (or the last point) is the third triangle vertex.
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous]) - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def minmax(y: np.ndarray, points: int) -> np.ndarray:
+    """Indices of each bucket's minimum and maximum (in time order), about ``points`` in total."""
+    n = len(y)
+    if points >= n or n <= 2:
+        return np.arange(n)
+    buckets = max(points // 2, 1)
+    offsets = np.linspace(0, n, buckets + 1).astype(np.int64)[:-1]
+    sizes = np.diff(np.append(offsets, n))
+    bucket_ids = np.repeat(np.arange(buckets), sizes)
+    # Sort by (bucket, value) once: the first/last entry of each bucket is its min/max.
+    order = np.lexsort((y, bucket_ids))
+    lows = order[offsets]
+    highs = order[offsets + sizes - 1]
+    return np.unique(np.concatenate((lows, highs)))
+
+
+def downsample(x: np.ndarray, y: np.ndarray, points: int, method: str = "lttb") -> Tuple[np.ndarray, np.ndarray]:
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsample method {method!r}; expected one of {', '.join(DOWNSAMPLE_METHODS)}")
+    keep = lttb(x, y, points) if method == "lttb" else minmax(y, points)
+    return x[keep], y[keep]
+
+
+__all__ = ["DOWNSAMPLE_METHODS", "downsample", "lttb", "minmax"]
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import timedelta
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from .config import MemoryConfig
+from .embeddings import embed_batch
+from .schema import ChunkRecord
+from .store import MemoryStore
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed batch stays with one worker; a worker that dies mid-batch releases it by timing out.
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def embed_chunks(
+    store: MemoryStore,
+    config: MemoryConfig,
+    records: Sequence[ChunkRecord],
+    correlation_id: Optional[str] = None,
+    *,
+    session: Optional[Session] = None,
+) -> Tuple[int, int]:
+    """Embed ``records`` that have no embedding yet, or queue them when ``EMBEDDINGS_DEFERRED`` is set.
+
+    Returns ``(embedded, queued)``. Chunks reused by content dedup already carry an embedding and
+    are skipped either way.
+    """
+    if not config.vector_dim or not records:
+        return 0, 0
+    missing = set(store.chunks_missing_embeddings([record.id for record in records], session=session))
+    targets = [record for record in records if record.id in missing]
+    if not targets:
+        return 0, 0
+    if config.embeddings_deferred:
+        return 0, store.enqueue_embeddings([record.id for record in targets], correlation_id, session=session)
+    vectors = embed_batch((record.text for record in targets), config, cache=store.embedding_cache)
+    store.add_embeddings(list(zip([record.id for record in targets], vectors)), correlation_id, session=session)
+    return len(targets), 0
+
+
+class EmbeddingWorker:
+    """Drains ``embedding_queue`` in oldest-first batches.
+
+    Runs on the ``MemoryJobManager`` scheduler when ``EMBEDDINGS_DEFERRED=true`` or standalone via
+    ``python cli.py memory embed-worker``. Keyword retrieval sees queued chunks immediately;
+    semantic retrieval picks them up once their embedding lands. Batches are claimed in the
+    database, so any number of workers, in any number of processes, can drain the same queue.
+    """
+
+    def __init__(self, store: MemoryStore, config: MemoryConfig) -> None:
+        self.store = store
+        self.config = config
+
+    def run_once(self, limit: Optional[int] = None) -> int:
+        """Embed one batch; returns the number of chunks taken off the queue."""
+        records = self.store.claim_embeddings(limit or self.config.embeddings_worker_batch, CLAIM_LEASE)
+        if not records:
+            return 0
+        missing = set(self.store.chunks_missing_embeddings([record.id for record in records]))
+        targets = [record for record in records if record.id in missing]
+        if targets:
+            vectors = embed_batch((record.text for record in targets), self.config, cache=self.store.embedding_cache)
+            self.store.add_embeddings(list(zip([record.id for record in targets], vectors)))
+        self.store.dequeue_embeddings([record.id for record in records if record.id not in missing])
+        logger.info("memory.embedding_worker.batch", extra={"embedded": len(targets), "dequeued": len(records)})
+        return len(records)
+
+    def drain(self, max_batches: Optional[int] = None) -> int:
+        total = batches = 0
+        while max_batches is None or batches < max_batches:
+            processed = self.run_once()
+            if not processed:
+                break
+            total += processed
+            batches += 1
+        return total
+
+    def run_forever(self, stop: threading.Event, interval: Optional[float] = None) -> None:
+        interval = self.config.embeddings_worker_interval if interval is None else interval
+        while not stop.is_set():
+            try:
+                self.drain()
+            except Exception as exc:  # pragma: no cover - background path
+                logger.exception("memory.embedding_worker.failed", exc_info=exc)
+            stop.wait(interval)
+
+
+__all__ = ["EmbeddingWorker", "embed_chunks"]
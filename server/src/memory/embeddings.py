@@ -5,16 +5,74 @@ import json
 import logging
 import math
 import random
-from typing import Iterable, List, Sequence
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import Retrying, stop_after_attempt, wait_exponential
 
+from .cache import LRUCache
 from .config import MemoryConfig
+from .http_pool import get_http_client
+from .local_embedder import MODEL_LABEL as LOCAL_MODEL_LABEL
+from .local_embedder import hash_embed_batch
+
+if TYPE_CHECKING:  # pragma: no cover - import cycle guard
+    from .store import MemoryStore
 
 logger = logging.getLogger(__name__)
 
 
+class EmbeddingCache:
+    """Content-addressed embedding cache: in-process LRU backed by the ``embedding_cache`` table."""
+
+    def __init__(self, config: MemoryConfig, store: Optional["MemoryStore"] = None) -> None:
+        self.config = config
+        self.store = store if config.embedding_cache_persist else None
+        self.lru: LRUCache[str, List[float]] = LRUCache(config.embedding_cache_size)
+
+    def get_many(self, keys: Sequence[str], *, persistent: bool = True) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        missing: List[str] = []
+        for key in dict.fromkeys(keys):
+            vector = self.lru.get(key)
+            if vector is None:
+                missing.append(key)
+            else:
+                found[key] = vector
+        if missing and persistent and self.store is not None:
+            try:
+                stored = self.store.get_cached_embeddings(missing)
+            except Exception as exc:  # pragma: no cover - cache must never break embedding
+                logger.warning("memory.embeddings.cache_read_failed", exc_info=exc)
+                stored = {}
+            for key, vector in stored.items():
+                self.lru.put(key, vector)
+                found[key] = vector
+        return found
+
+    def put_many(self, entries: Sequence[Tuple[str, str, List[float]]], *, persistent: bool = True) -> None:
+        if not entries:
+            return
+        for key, _, vector in entries:
+            self.lru.put(key, vector)
+        if persistent and self.store is not None:
+            try:
+                self.store.put_cached_embeddings(entries)
+            except Exception as exc:  # pragma: no cover - cache must never break embedding
+                logger.warning("memory.embeddings.cache_write_failed", exc_info=exc)
+
+    def stats(self) -> Dict[str, int]:
+        return self.lru.stats()
+
+
+def embedding_cache_key(model: str, dim: int, text: str) -> str:
+    normalised = " ".join(text.split())
+    digest = hashlib.sha256(f"{model}\x1f{dim}\x1f{normalised}".encode("utf-8"))
+    return digest.hexdigest()
+
+
 def _rng_for_text(text: str) -> random.Random:
     digest = hashlib.sha256(text.encode("utf-8")).digest()
     seed = int.from_bytes(digest[:8], "big")
@@ -36,39 +94,210 @@ def _pad_or_trim(vector: Sequence[float], dim: int) -> List[float]:
     return values
 
 
-def _remote_embed(text: str, config: MemoryConfig) -> List[float]:
-    base = config.embeddings_api_base.rstrip("/")
-    endpoint = f"{base}/embeddings"
-    headers = {
-        "Authorization": f"Bearer {config.embeddings_api_key}",
-        "Content-Type": "application/json",
-    }
-    payload = {"model": config.embeddings_model, "input": text}
-    with httpx.Client(timeout=config.http_timeout) as client:
-        response = client.post(endpoint, headers=headers, json=payload)
-        response.raise_for_status()
-        data = response.json()
-    try:
-        vector = data["data"][0]["embedding"]
-    except (KeyError, IndexError) as exc:  # pragma: no cover - defensive
-        raise ValueError(f"Unexpected embedding response: {json.dumps(data)[:200]}") from exc
-    return _normalize(_pad_or_trim(vector, config.vector_dim))
+class EmbeddingClient:
+    """Batched, pooled and bounded-concurrency client for OpenAI-compatible ``/embeddings`` endpoints."""
+
+    def __init__(self, config: MemoryConfig, *, client: Optional[httpx.Client] = None) -> None:
+        self.config = config
+        self.client = client or get_http_client(config)
+        self.endpoint = f"{config.embeddings_api_base.rstrip('/')}/embeddings"
+        self.headers = {
+            "Authorization": f"Bearer {config.embeddings_api_key}",
+            "Content-Type": "application/json",
+        }
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def embed(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Embed ``texts`` in order; entries of batches that exhausted their retries are ``None``."""
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        batches = plan_batches(texts, self.config.embeddings_batch_size, self.config.embeddings_batch_tokens)
+        if not batches:
+            return results
+        if len(batches) == 1 or self.config.embeddings_concurrency <= 1:
+            outcomes = [self._embed_batch_safe(texts, batch) for batch in batches]
+        else:
+            executor = self._get_executor()
+            futures = [executor.submit(self._embed_batch_safe, texts, batch) for batch in batches]
+            outcomes = [future.result() for future in futures]
+        for batch, vectors in zip(batches, outcomes):
+            if vectors is None:
+                continue
+            for index, vector in zip(batch, vectors):
+                results[index] = vector
+        return results
 
+    def close(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=0.2, min=0.2, max=2))
-def embed_text(text: str, config: MemoryConfig) -> List[float]:
-    if config.embeddings_enabled:
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.config.embeddings_concurrency,
+                    thread_name_prefix="memory-embed",
+                )
+            return self._executor
+
+    def _embed_batch_safe(self, texts: Sequence[str], batch: Sequence[int]) -> Optional[List[List[float]]]:
         try:
-            return _remote_embed(text, config)
+            for attempt in Retrying(
+                stop=stop_after_attempt(self.config.embeddings_max_retries),
+                wait=wait_exponential(multiplier=0.2, min=0.2, max=2),
+                reraise=True,
+            ):
+                with attempt:
+                    return self._post([texts[index] for index in batch])
         except Exception as exc:  # pragma: no cover - network failures
-            logger.warning("memory.embeddings.remote_failed", exc_info=exc)
+            logger.warning("memory.embeddings.batch_failed", extra={"size": len(batch)}, exc_info=exc)
+        return None
+
+    def _post(self, inputs: List[str]) -> List[List[float]]:
+        payload = {"model": self.config.embeddings_model, "input": inputs}
+        response = self.client.post(self.endpoint, headers=self.headers, json=payload)
+        response.raise_for_status()
+        data = response.json()
+        try:
+            items = sorted(data["data"], key=lambda item: item.get("index", 0))
+            vectors = [item["embedding"] for item in items]
+        except (KeyError, TypeError) as exc:  # pragma: no cover - defensive
+            raise ValueError(f"Unexpected embedding response: {json.dumps(data)[:200]}") from exc
+        if len(vectors) != len(inputs):
+            raise ValueError(f"Embedding response returned {len(vectors)} vectors for {len(inputs)} inputs")
+        return [_normalize(_pad_or_trim(vector, self.config.vector_dim)) for vector in vectors]
+
+
+def plan_batches(texts: Sequence[str], max_inputs: int, max_tokens: int) -> List[List[int]]:
+    """Group text indices into request batches bounded by input count and estimated tokens."""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = _estimate_tokens(text)
+        if current and (len(current) >= max_inputs or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+_clients: Dict[Tuple[object, ...], EmbeddingClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_embedding_client(config: MemoryConfig) -> EmbeddingClient:
+    """Process-lifetime client per endpoint/settings combination."""
+    key = (
+        config.embeddings_api_base,
+        config.embeddings_api_key,
+        config.embeddings_model,
+        config.vector_dim,
+        config.embeddings_batch_size,
+        config.embeddings_batch_tokens,
+        config.embeddings_concurrency,
+        config.embeddings_max_retries,
+        config.http_timeout,
+        config.http_max_connections,
+    )
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = EmbeddingClient(config)
+            _clients[key] = client
+        return client
+
+
+def _local_embed_many(texts: Sequence[str], config: MemoryConfig) -> List[List[float]]:
+    if config.local_embeddings_backend == "random":
+        return [_random_embed(text, config) for text in texts]
+    return hash_embed_batch(texts, config.vector_dim).tolist()
+
+
+def _random_embed(text: str, config: MemoryConfig) -> List[float]:
     rng = _rng_for_text(f"{config.embeddings_model}:{text}")
     values = [rng.uniform(-1.0, 1.0) for _ in range(config.vector_dim)]
     return _normalize(values)
 
 
-def embed_batch(texts: Iterable[str], config: MemoryConfig) -> List[List[float]]:
-    return [embed_text(text, config) for text in texts]
+def _local_model_label(config: MemoryConfig) -> str:
+    if config.local_embeddings_backend == "random":
+        return f"local:{config.embeddings_model}"
+    return LOCAL_MODEL_LABEL
+
+
+def embed_text(text: str, config: MemoryConfig, *, cache: Optional[EmbeddingCache] = None) -> List[float]:
+    return embed_batch([text], config, cache=cache)[0]
+
+
+def embed_batch(
+    texts: Iterable[str],
+    config: MemoryConfig,
+    *,
+    cache: Optional[EmbeddingCache] = None,
+) -> List[List[float]]:
+    items = list(texts)
+    if not items:
+        return []
+    dim = config.vector_dim
+    remote = config.remote_embeddings_enabled
+    local_model = _local_model_label(config)
+    # Hashing vectors are cheaper to recompute than to fetch, so they only live in the LRU.
+    persist_local = config.local_embeddings_backend == "random"
+    model = config.embeddings_model if remote else local_model
+    keys = [embedding_cache_key(model, dim, text) for text in items]
+    cached = cache.get_many(keys, persistent=remote or persist_local) if cache is not None else {}
+
+    results: List[Optional[List[float]]] = [cached.get(key) for key in keys]
+    pending: Dict[str, str] = {}
+    for index, text in enumerate(items):
+        if results[index] is None:
+            pending.setdefault(keys[index], text)
+
+    computed: Dict[str, List[float]] = {}
+    remote_entries: List[Tuple[str, str, List[float]]] = []
+    local_entries: List[Tuple[str, str, List[float]]] = []
+    if pending and remote:
+        pending_keys = list(pending)
+        vectors = get_embedding_client(config).embed([pending[key] for key in pending_keys])
+        for key, vector in zip(pending_keys, vectors):
+            if vector is not None:
+                computed[key] = vector
+                remote_entries.append((key, model, vector))
+
+    local_keys = [key for key in pending if key not in computed]
+    if local_keys:
+        local_texts = [pending[key] for key in local_keys]
+        for key, text, vector in zip(local_keys, local_texts, _local_embed_many(local_texts, config)):
+            computed[key] = vector
+            local_key = key if not remote else embedding_cache_key(local_model, dim, text)
+            local_entries.append((local_key, local_model, vector))
+
+    for index, key in enumerate(keys):
+        if results[index] is None:
+            results[index] = computed[key]
+
+    if cache is not None:
+        cache.put_many(remote_entries)
+        cache.put_many(local_entries, persistent=persist_local)
+    return [vector for vector in results if vector is not None]
 
 
-__all__ = ["embed_text", "embed_batch"]
+__all__ = [
+    "EmbeddingCache",
+    "EmbeddingClient",
+    "embedding_cache_key",
+    "embed_text",
+    "embed_batch",
+    "get_embedding_client",
+    "plan_batches",
+]
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import atexit
+import threading
+from typing import Dict, Tuple
+
+import httpx
+
+from .config import MemoryConfig
+
+_clients: Dict[Tuple[float, int], httpx.Client] = {}
+_lock = threading.Lock()
+
+
+def get_http_client(config: MemoryConfig) -> httpx.Client:
+    """Return a process-wide pooled client so keep-alive connections survive across calls."""
+    key = (config.http_timeout, config.http_max_connections)
+    with _lock:
+        client = _clients.get(key)
+        if client is None or client.is_closed:
+            limits = httpx.Limits(
+                max_connections=config.http_max_connections,
+                max_keepalive_connections=config.http_max_connections,
+            )
+            client = httpx.Client(timeout=config.http_timeout, limits=limits)
+            _clients[key] = client
+        return client
+
+
+def close_http_clients() -> None:
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+atexit.register(close_http_clients)
+
+
+__all__ = ["get_http_client", "close_http_clients"]
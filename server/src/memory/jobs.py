@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
-from typing import Callable, Optional
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Optional
 
 from apscheduler.schedulers.background import BackgroundScheduler
 
+from .compaction import Compactor
+from .embedding_worker import EmbeddingWorker
+from .lazy_summaries import SummaryMaterializer
 from .schema import TickRunRequest
 from .tick_pipeline import TickPipeline
 
@@ -20,6 +23,9 @@ class MemoryJobManager:
         self.pipeline = pipeline
         self.fetch_tick = fetch_tick
         self.scheduler = BackgroundScheduler(timezone="UTC")
+        self.compactor = Compactor(pipeline.store, pipeline.config)
+        self.embedding_worker = EmbeddingWorker(pipeline.store, pipeline.config)
+        self.summary_warmer = SummaryMaterializer(pipeline.store, pipeline.config, pipeline.summarizer)
         self._started = False
 
     def start(self) -> None:
@@ -29,6 +35,23 @@ class MemoryJobManager:
         self.scheduler.start()
         if self.fetch_tick:
             self.scheduler.add_job(self._run_daily_tick, "cron", hour=1, id="memory-daily-tick", replace_existing=True)
+        if self.pipeline.config.compaction_enabled:
+            self.scheduler.add_job(
+                self._run_compaction, "cron", day_of_week="sun", hour=3, id="memory-compaction", replace_existing=True
+            )
+        if self.pipeline.config.embeddings_deferred:
+            self.scheduler.add_job(
+                self._run_embedding_worker,
+                "interval",
+                seconds=self.pipeline.config.embeddings_worker_interval,
+                id="memory-embedding-worker",
+                replace_existing=True,
+                coalesce=True,
+            )
+        if self.pipeline.config.summaries_lazy and self.pipeline.config.summary_warm_days > 0:
+            self.scheduler.add_job(
+                self._run_summary_warmer, "interval", hours=1, id="memory-summary-warmer", replace_existing=True, coalesce=True
+            )
         self._started = True
 
     def shutdown(self) -> None:
@@ -46,6 +69,34 @@ class MemoryJobManager:
         logger.info("memory.jobs.tick_run", extra={"correlation_id": correlation_id, "date": payload.date.isoformat()})
         return self.pipeline.run(payload, correlation_id=correlation_id or _now_correlation())
 
+    def trigger_compaction(self, as_of: date | None = None, correlation_id: str | None = None) -> Dict[str, int]:
+        logger.info("memory.jobs.compaction_run", extra={"correlation_id": correlation_id})
+        return self.compactor.compact(as_of)
+
+    def trigger_embeddings(self, max_batches: int | None = None) -> int:
+        return self.embedding_worker.drain(max_batches)
+
+    def trigger_summary_warm(self, days: int | None = None, as_of: date | None = None) -> int:
+        return self.summary_warmer.warm(days, as_of)
+
+    def _run_summary_warmer(self) -> None:
+        try:
+            self.trigger_summary_warm()
+        except Exception as exc:  # pragma: no cover - background path
+            logger.exception("memory.jobs.summary_warm_failed", exc_info=exc)
+
+    def _run_embedding_worker(self) -> None:
+        try:
+            self.trigger_embeddings()
+        except Exception as exc:  # pragma: no cover - background path
+            logger.exception("memory.jobs.embeddings_failed", exc_info=exc)
+
+    def _run_compaction(self) -> None:
+        try:
+            self.trigger_compaction(correlation_id=_now_correlation())
+        except Exception as exc:  # pragma: no cover - background path
+            logger.exception("memory.jobs.compaction_failed", exc_info=exc)
+
     def _run_daily_tick(self) -> None:
         try:
             self.trigger_tick()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .chunker import Chunker
+from .config import MemoryConfig
+from .embedding_worker import embed_chunks
+from .schema import ChunkInput, DailyStateRecord, EntityStateRecord
+from .store import MemoryStore, as_event_response
+from .summarizer import EntityDay, Summarizer
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryMaterializer:
+    """Generates summaries the tick left pending (``MEMORY_LAZY_SUMMARIES``) the first time they are read.
+
+    Generated summaries are written back to ``entity_state``/``daily_state``, chunked and folded into
+    the arc accumulators like eager ones, so each is paid for once; ``warm`` does the same ahead of
+    time for recent days.
+    """
+
+    def __init__(self, store: MemoryStore, config: MemoryConfig, summarizer: Optional[Summarizer] = None) -> None:
+        self.store = store
+        self.config = config
+        self.summarizer = summarizer or Summarizer(config)
+        self.chunker = Chunker(config)
+
+    def materialize(
+        self,
+        entity_states: Sequence[EntityStateRecord],
+        daily_states: Sequence[DailyStateRecord] = (),
+    ) -> int:
+        """Fill in missing summaries on the given (detached) records in place; returns how many were generated."""
+        pending = [record for record in entity_states if record.summary is None]
+        pending_daily = [record for record in daily_states if record is not None and record.summary is None]
+        if not pending and not pending_daily:
+            return 0
+
+        events_by_day = {
+            day: [as_event_response(event) for event in self.store.get_events_between(_midnight(day), _midnight(day + timedelta(days=1)))]
+            for day in {record.date for record in pending} | {record.date for record in pending_daily}
+        }
+        generated = self.summarizer.summarize_entities(
+            [
+                EntityDay(
+                    entity_id=record.entity_id,
+                    state=record.state or {},
+                    day=record.date,
+                    recent_events=[event for event in events_by_day[record.date] if record.entity_id in event.links],
+                )
+                for record in pending
+            ]
+        )
+        entity_summaries: Dict[Tuple[date, str], str] = {}
+        chunk_inputs: List[ChunkInput] = []
+        for record, summary in zip(pending, generated):
+            record.summary = summary
+            entity_summaries[(record.date, record.entity_id)] = summary
+            chunk_inputs.extend(self.chunker.chunk_entity_summary(record.entity_id, summary, _midnight(record.date)))
+
+        daily_summaries: Dict[date, str] = {}
+        for record in pending_daily:
+            headlines = [event.type or "event" for event in events_by_day[record.date]]
+            record.summary = self.summarizer.summarize_daily(record.global_state or {}, headlines, record.date)
+            daily_summaries[record.date] = record.summary
+
+        self.store.set_state_summaries(entity_summaries, daily_summaries)
+        by_day: Dict[date, Dict[str, Optional[str]]] = {}
+        for (day, entity_id), summary in entity_summaries.items():
+            by_day.setdefault(day, {})[entity_id] = summary
+        for day in sorted(by_day):
+            self.store.update_arc_accumulators(day, by_day[day])
+        if chunk_inputs:
+            embed_chunks(self.store, self.config, self.store.add_chunks(chunk_inputs))
+        logger.info("memory.summaries.materialized", extra={"entities": len(pending), "daily": len(pending_daily)})
+        return len(pending) + len(pending_daily)
+
+    def warm(self, days: Optional[int] = None, as_of: Optional[date] = None) -> int:
+        """Materialise every pending summary from the last ``days`` days (default ``MEMORY_SUMMARY_WARM_DAYS``)."""
+        days = self.config.summary_warm_days if days is None else days
+        if days <= 0:
+            return 0
+        as_of = as_of or self.store.latest_state_date() or date.today()
+        entity_states, daily_states = self.store.pending_summary_states(as_of - timedelta(days=days - 1))
+        by_day: Dict[date, Tuple[List[EntityStateRecord], List[DailyStateRecord]]] = {}
+        for record in entity_states:
+            by_day.setdefault(record.date, ([], []))[0].append(record)
+        for record in daily_states:
+            by_day.setdefault(record.date, ([], []))[1].append(record)
+        # One day at a time keeps each summariser fan-out and chunk write bounded.
+        return sum(self.materialize(*by_day[day]) for day in sorted(by_day))
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+
+__all__ = ["SummaryMaterializer"]
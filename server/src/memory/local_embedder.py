@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+MODEL_LABEL = "local-hash-v1"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_WORD_WEIGHT = 1.0
+_BIGRAM_WEIGHT = 0.7
+_CHAR_WEIGHT = 0.35
+_CHAR_NGRAM = 3
+
+
+@lru_cache(maxsize=262_144)
+def _hash_feature(feature: str) -> Tuple[int, int]:
+    """Stable 64-bit feature hash split into a bucket seed and a sign bit."""
+    value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return value >> 1, 1 if value & 1 else -1
+
+
+def _features(text: str) -> List[Tuple[str, float]]:
+    tokens = _TOKEN_RE.findall(text.lower())
+    features: List[Tuple[str, float]] = [(f"w:{token}", _WORD_WEIGHT) for token in tokens]
+    features.extend(
+        (f"b:{left} {right}", _BIGRAM_WEIGHT) for left, right in zip(tokens, tokens[1:])
+    )
+    for token in tokens:
+        padded = f"#{token}#"
+        if len(padded) <= _CHAR_NGRAM:
+            continue
+        features.extend(
+            (f"c:{padded[i:i + _CHAR_NGRAM]}", _CHAR_WEIGHT) for i in range(len(padded) - _CHAR_NGRAM + 1)
+        )
+    return features
+
+
+def hash_embed_batch(texts: Sequence[str], dim: int) -> np.ndarray:
+    """Signed feature-hashing embeddings over word, bigram and character n-grams.
+
+    Returns an L2-normalised ``float32`` matrix of shape ``(len(texts), dim)``. Texts that share
+    vocabulary land close together, so offline deployments still get meaningful similarity.
+    """
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    if not texts or dim <= 0:
+        return matrix
+    rows: List[int] = []
+    names: List[str] = []
+    weights: List[float] = []
+    for row, text in enumerate(texts):
+        for name, weight in _features(text):
+            rows.append(row)
+            names.append(name)
+            weights.append(weight)
+    if not rows:
+        return matrix
+
+    lookup: Dict[str, Tuple[int, int]] = {name: _hash_feature(name) for name in set(names)}
+    hashed = np.array([lookup[name] for name in names], dtype=np.int64).reshape(-1, 2)
+    cols = hashed[:, 0] % dim
+    values = hashed[:, 1].astype(np.float32) * np.asarray(weights, dtype=np.float32)
+    np.add.at(matrix, (np.asarray(rows, dtype=np.int64), cols), values)
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+__all__ = ["MODEL_LABEL", "hash_embed_batch"]
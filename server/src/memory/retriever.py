@@ -1,15 +1,25 @@
 from __future__ import annotations
 
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
 from datetime import datetime, timezone
-from typing import Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 from dataclasses import dataclass
 
+from .cache import LRUCache
 from .config import MemoryConfig
 from .embeddings import embed_text
+from .lazy_summaries import SummaryMaterializer
 from .schema import (
+    ChunkRecord,
     ChunkWithScore,
+    DailyStateRecord,
     DailyStateWrite,
+    EntityStateRecord,
     EntityStateWrite,
     EventResponse,
     PromptPack,
@@ -17,6 +27,8 @@ from .schema import (
 )
 from .store import MemoryStore, as_event_response
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class RetrieverLimitsOverride:
@@ -29,6 +41,12 @@ class Retriever:
     def __init__(self, store: MemoryStore, config: MemoryConfig) -> None:
         self.store = store
         self.config = config
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.cache: LRUCache[Tuple[Any, ...], PromptPack] = LRUCache(
+            config.retrieval_cache_size, ttl_seconds=config.retrieval_cache_ttl
+        )
+        self.materializer = SummaryMaterializer(store, config)
 
     def retrieve(
         self,
@@ -43,39 +61,50 @@ class Retriever:
             states_days=self.config.retriever_limits.states_days,
         )
 
-        states_records = self.store.get_recent_entity_states(entities, limits_cfg.states_days)
+        # Migrate up front so concurrent stages do not race to apply migrations.
+        self.store.ensure_schema()
+        # The data version is part of the key, so any committed write makes older packs unreachable.
+        cache_key = (
+            self.store.data_version,
+            request.question,
+            tuple(entities),
+            tuple(request.keywords),
+            limits_cfg.chunks,
+            limits_cfg.events,
+            limits_cfg.states_days,
+        )
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            pack = cached.model_copy(deep=True)
+            pack.meta["cache"] = "hit"
+            return pack
+
+        keywords = request.keywords or _extract_keywords(request.question)
+        keyword_query = " & ".join(keywords) if self.store.config.is_postgres else " ".join(keywords)
+
+        stages: Dict[str, Callable[[], Any]] = {
+            "states": lambda: self._load_states(entities, limits_cfg.states_days),
+            "events": lambda: self.store.get_recent_events(entities, window_days=60, limit=limits_cfg.events),
+        }
+        if keyword_query:
+            stages["keyword"] = lambda: self.store.keyword_search_chunks(keyword_query, limits_cfg.chunks)
+        if self.config.vector_dim and request.question.strip():
+            stages["semantic"] = lambda: self._semantic_search(request.question, limits_cfg.chunks)
+        results, stage_meta = self._run_stages(stages)
+
+        states_records, daily_record = results.get("states") or ([], None)
         states = [
             EntityStateWrite(date=record.date, entity_id=record.entity_id, state=record.state or {}, summary=record.summary)
             for record in states_records
         ]
-
         daily = None
-        if states:
-            most_recent_date = max(record.date for record in states_records)
-            daily_record = self.store.get_daily_state(most_recent_date)
-            if daily_record:
-                daily = DailyStateWrite(date=daily_record.date, global_state=daily_record.global_state or {}, summary=daily_record.summary)
-
-        events_records = self.store.get_recent_events(entities, window_days=60, limit=limits_cfg.events)
-        events = [as_event_response(record) for record in events_records]
+        if daily_record:
+            daily = DailyStateWrite(date=daily_record.date, global_state=daily_record.global_state or {}, summary=daily_record.summary)
 
-        keywords = request.keywords or _extract_keywords(request.question)
-        keyword_query = " & ".join(keywords) if self.store.config.is_postgres else " ".join(keywords)
-        chunk_candidates = []
-        if keyword_query:
-            keyword_chunks = self.store.keyword_search_chunks(keyword_query, limits_cfg.chunks)
-            chunk_candidates.extend((chunk, 0.25) for chunk in keyword_chunks)
+        events = [as_event_response(record) for record in results.get("events") or []]
 
-        semantic_scores: List[Tuple[int, float]] = []
-        if self.config.vector_dim and request.question.strip():
-            try:
-                vector = embed_text(request.question, self.config)
-                semantic_chunks = self.store.vector_search_chunks(vector, limits_cfg.chunks)
-                for chunk, score in semantic_chunks:
-                    semantic_scores.append((chunk.id, score))
-                    chunk_candidates.append((chunk, 0.45 * score))
-            except Exception:
-                pass
+        chunk_candidates = [(chunk, 0.25) for chunk in results.get("keyword") or []]
+        chunk_candidates.extend((chunk, 0.45 * score) for chunk, score in results.get("semantic") or [])
 
         combined: Dict[int, ChunkWithScore] = {}
         now = datetime.now(timezone.utc)
@@ -116,14 +145,90 @@ class Retriever:
             trimmed_chunks.append(chunk)
             token_count += approx_tokens
 
-        return PromptPack(
+        pack = PromptPack(
             question=request.question,
             entities=list(entities),
             states=states,
             daily=daily,
             events=events,
             chunks=trimmed_chunks,
+            meta=dict(stage_meta, cache="miss", data_version=cache_key[0]),
         )
+        if not stage_meta["degraded"]:
+            self.cache.put(cache_key, pack.model_copy(deep=True))
+        return pack
+
+    def _load_states(self, entities: Sequence[str], states_days: int) -> Tuple[List[EntityStateRecord], Optional[DailyStateRecord]]:
+        records = self.store.get_recent_entity_states(entities, states_days)
+        daily = None
+        if records:
+            daily = self.store.get_daily_state(max(record.date for record in records))
+        if self.config.summaries_lazy:
+            self.materializer.materialize(records, [daily] if daily else [])
+        return records, daily
+
+    def _semantic_search(self, question: str, limit: int) -> List[Tuple[ChunkRecord, float]]:
+        vector = embed_text(question, self.config, cache=self.store.embedding_cache)
+        return self.store.vector_search_chunks(vector, limit)
+
+    def _run_stages(self, stages: Dict[str, Callable[[], Any]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Run independent retrieval stages concurrently.
+
+        A stage that raises or misses the shared deadline contributes nothing and is listed under
+        ``degraded``; per-stage and total wall-clock timings are reported in milliseconds.
+        """
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
+        degraded: List[str] = []
+        results: Dict[str, Any] = {}
+
+        def timed(name: str, stage: Callable[[], Any]) -> Any:
+            stage_started = time.perf_counter()
+            try:
+                return stage()
+            finally:
+                timings[name] = round((time.perf_counter() - stage_started) * 1000, 2)
+
+        if self.config.retriever_concurrency <= 1:
+            for name, stage in stages.items():
+                try:
+                    results[name] = timed(name, stage)
+                except Exception as exc:
+                    logger.warning("memory.retrieve.stage_failed", extra={"stage": name}, exc_info=exc)
+                    degraded.append(name)
+        else:
+            executor = self._get_executor()
+            futures = {name: executor.submit(timed, name, stage) for name, stage in stages.items()}
+            deadline = started + self.config.retriever_stage_timeout
+            for name, future in futures.items():
+                try:
+                    results[name] = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+                except FutureTimeout:
+                    logger.warning("memory.retrieve.stage_timeout", extra={"stage": name})
+                    future.cancel()
+                    degraded.append(name)
+                except Exception as exc:
+                    logger.warning("memory.retrieve.stage_failed", extra={"stage": name}, exc_info=exc)
+                    degraded.append(name)
+
+        stage_timings = {name: timings.get(name) for name in stages}
+        stage_timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+        return results, {"timings_ms": stage_timings, "degraded": degraded}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.config.retriever_concurrency,
+                    thread_name_prefix="memory-retrieve",
+                )
+            return self._executor
+
+    def close(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
 
 
 def _extract_keywords(question: str) -> List[str]:
@@ -4,9 +4,11 @@ from dataclasses import dataclass
 from datetime import date
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from .config import MemoryConfig, create_engine_from_config, load_memory_config
+from .downsample import downsample
 from .retriever import Retriever
 from .schema import (
     DailyStateWrite,
@@ -15,6 +17,7 @@ from .schema import (
     EventCreate,
     EventResponse,
     MemoryStatus,
+    MetricSeries,
     PromptPack,
     RetrieveRequest,
     TickRunRequest,
@@ -61,7 +64,19 @@ def build_memory_router(
         counts = container.store.get_counts()
         vector_state = "enabled" if container.config.vector_dim else "disabled"
         last_tick = container.store.get_last_chunk_time()
-        return MemoryStatus(db=container.config.db_vendor, vector=vector_state, last_tick=last_tick, counts=counts)
+        return MemoryStatus(
+            db=container.config.db_vendor,
+            vector=vector_state,
+            last_tick=last_tick,
+            counts=counts,
+            data_version=container.store.data_version,
+            caches={
+                "retrieval": container.retriever.cache.stats(),
+                "embeddings": container.store.embedding_cache.stats(),
+                "summaries": container.pipeline.summarizer.cache.stats(),
+            },
+            embedding_backlog=container.store.embedding_backlog(),
+        )
 
     @router.post("/entity", response_model=EntityUpsert)
     def upsert_entity(payload: EntityUpsert, container: MemoryContainer = Depends(require_enabled)) -> EntityUpsert:
@@ -86,13 +101,41 @@ def build_memory_router(
         record = container.store.get_latest_entity_state(entity_id)
         if not record:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Entity state not found")
+        if container.config.summaries_lazy:
+            container.retriever.materializer.materialize([record])
         return EntityStateWrite(date=record.date, entity_id=record.entity_id, state=record.state or {}, summary=record.summary)
 
+    @router.get("/entity/{entity_id}/series", response_model=MetricSeries)
+    def metric_series(
+        entity_id: str,
+        key: str = Query(..., description="Numeric state key, e.g. cash"),
+        start: Optional[date] = Query(None, alias="from"),
+        end: Optional[date] = Query(None, alias="to"),
+        points: int = Query(500, ge=2, le=10_000, description="Maximum points returned"),
+        method: str = Query("lttb", pattern="^(lttb|minmax)$"),
+        container: MemoryContainer = Depends(require_enabled),
+    ) -> MetricSeries:
+        dates, values = container.store.metric_series(entity_id, key, start, end)
+        if not dates and key not in container.store.metric_keys(entity_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No metric {key!r} for {entity_id}")
+        ordinals = np.fromiter((day.toordinal() for day in dates), dtype=np.float64, count=len(dates))
+        xs, ys = downsample(ordinals, np.asarray(values, dtype=np.float64), points, method)
+        return MetricSeries(
+            entity_id=entity_id,
+            key=key,
+            method=method,
+            total=len(dates),
+            dates=[date.fromordinal(int(x)) for x in xs],
+            values=ys.tolist(),
+        )
+
     @router.get("/daily/{target_date}", response_model=DailyStateWrite)
     def daily_state(target_date: date, container: MemoryContainer = Depends(require_enabled)) -> DailyStateWrite:
         record = container.store.get_daily_state(target_date)
         if not record:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Daily state not found")
+        if container.config.summaries_lazy:
+            container.retriever.materializer.materialize([], [record])
         return DailyStateWrite(date=record.date, global_state=record.global_state or {}, summary=record.summary)
 
     return router
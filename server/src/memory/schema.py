@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import json
+import re
+import sqlite3
 from array import array
 from datetime import date, datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Literal, Optional, Sequence
+from typing import Any, Dict, Iterable, List, Literal, Optional, Sequence, Set
 
+import numpy as np
 from fastapi import HTTPException
 from pydantic import BaseModel, Field
 from sqlalchemy import (
@@ -20,6 +23,7 @@ from sqlalchemy import (
     Text,
     UniqueConstraint,
     event,
+    text,
 )
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import SQLAlchemyError
@@ -27,6 +31,8 @@ from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.sql import func
 from sqlalchemy.types import LargeBinary, TypeDecorator
 
+from .config import VECTOR_PRECISIONS
+
 try:  # Optional dependency - only needed for Postgres
     from pgvector.sqlalchemy import Vector
 except ImportError:  # pragma: no cover - fallback when pgvector not installed
@@ -107,6 +113,47 @@ class StringArray(TypeDecorator):
         return json.loads(value)
 
 
+VectorPrecision = Literal["float32", "float16", "int8"]
+
+# float32 keeps the original headerless layout; compact formats carry a 4-byte header.
+_QUANT_MAGIC = b"\x93QV"
+_QUANT_CODES = {"float16": b"h", "int8": b"b"}
+_QUANT_NAMES = {code: name for name, code in _QUANT_CODES.items()}
+
+
+def encode_vector(values: Sequence[float], precision: str = "float32") -> bytes:
+    """Serialise a vector for blob storage at the requested precision."""
+    data = np.asarray(values, dtype=np.float32)
+    if precision == "float32":
+        return data.tobytes()
+    if precision == "float16":
+        return _QUANT_MAGIC + _QUANT_CODES["float16"] + data.astype(np.float16).tobytes()
+    if precision == "int8":
+        peak = float(np.max(np.abs(data))) if data.size else 0.0
+        scale = peak / 127.0 if peak > 0 else 1.0
+        quantised = np.clip(np.rint(data / scale), -127, 127).astype(np.int8)
+        return _QUANT_MAGIC + _QUANT_CODES["int8"] + np.float32(scale).tobytes() + quantised.tobytes()
+    raise ValueError(f"Unsupported vector precision: {precision!r}")
+
+
+def vector_precision(blob: bytes) -> str:
+    if blob[:3] == _QUANT_MAGIC and blob[3:4] in _QUANT_NAMES:
+        return _QUANT_NAMES[blob[3:4]]
+    return "float32"
+
+
+def decode_vector_array(blob: bytes) -> np.ndarray:
+    """Dequantise any stored layout back to a ``float32`` array."""
+    raw = bytes(blob)
+    precision = vector_precision(raw)
+    if precision == "float16":
+        return np.frombuffer(raw, dtype=np.float16, offset=4).astype(np.float32)
+    if precision == "int8":
+        scale = np.frombuffer(raw, dtype=np.float32, count=1, offset=4)[0]
+        return np.frombuffer(raw, dtype=np.int8, offset=8).astype(np.float32) * scale
+    return np.frombuffer(raw, dtype=np.float32)
+
+
 class VectorType(TypeDecorator):
     impl = LargeBinary
     cache_ok = True
@@ -125,16 +172,34 @@ class VectorType(TypeDecorator):
             return None
         if dialect.name == "postgresql" and Vector is not None:
             return value
-        arr = array("f", (float(x) for x in value))
-        return arr.tobytes()
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return bytes(value)  # already encoded at the configured precision
+        return encode_vector(value)
 
     def process_result_value(self, value, dialect):  # type: ignore[override]
         if value is None:
             return None
         if dialect.name == "postgresql" and Vector is not None:
             return list(value)
+        return decode_vector_array(value).tolist()
+
+
+class PackedVector(TypeDecorator):
+    """Float32 vector packed into bytes on every dialect (no pgvector indexing)."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):  # type: ignore[override]
+        if value is None:
+            return None
+        return array("f", (float(x) for x in value)).tobytes()
+
+    def process_result_value(self, value, dialect):  # type: ignore[override]
+        if value is None:
+            return None
         arr = array("f")
-        arr.frombytes(value)
+        arr.frombytes(bytes(value))
         return list(arr)
 
 
@@ -182,6 +247,14 @@ class EventRecord(Base):
     links: Mapped[List[str]] = mapped_column(StringArray, default=list)
 
 
+class EventLinkRecord(Base):
+    __tablename__ = "event_links"
+
+    event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    entity_id: Mapped[str] = mapped_column(String, primary_key=True)
+    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
 class DailyStateRecord(Base):
     __tablename__ = "daily_state"
 
@@ -200,6 +273,51 @@ class EntityStateRecord(Base):
     summary: Mapped[Optional[str]] = mapped_column(Text)
 
 
+GLOBAL_ROLLUP_SCOPE = "__global__"
+
+
+class EntityMetricRecord(Base):
+    """One numeric state value per (entity, key, day); ``daily_state`` metrics use ``GLOBAL_ROLLUP_SCOPE``."""
+
+    __tablename__ = "entity_metric"
+
+    entity_id: Mapped[str] = mapped_column(String, primary_key=True)
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+    value: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class StateRollupRecord(Base):
+    """Weekly/monthly aggregate of compacted ``entity_state`` (scope = entity id) or ``daily_state`` rows."""
+
+    __tablename__ = "state_rollups"
+
+    scope: Mapped[str] = mapped_column(String, primary_key=True)
+    period: Mapped[str] = mapped_column(String, primary_key=True)
+    period_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    period_end: Mapped[date] = mapped_column(Date, nullable=False)
+    days: Mapped[int] = mapped_column(Integer, default=0)
+    metrics: Mapped[Dict[str, Any]] = mapped_column(JSONType, default=dict)
+    summary: Mapped[Optional[str]] = mapped_column(Text)
+
+
+class DataVersionRecord(Base):
+    """Single row counting committed writes, so every process sharing the database sees the same version."""
+
+    __tablename__ = "data_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class ArcAccumulatorRecord(Base):
+    __tablename__ = "arc_accumulators"
+
+    entity_id: Mapped[str] = mapped_column(ForeignKey("entities.id", ondelete="CASCADE"), primary_key=True)
+    entries: Mapped[List[List[str]]] = mapped_column(JSONType, default=list)
+    updated_through: Mapped[Optional[date]] = mapped_column(Date)
+
+
 class ChunkRecord(Base):
     __tablename__ = "chunks"
 
@@ -209,16 +327,51 @@ class ChunkRecord(Base):
     ts: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     text: Mapped[str] = mapped_column(Text, nullable=False)
     meta: Mapped[Dict[str, Any]] = mapped_column(JSONType, default=dict)
+    content_hash: Mapped[Optional[str]] = mapped_column(String, unique=True)
+
+
+class ChunkRefRecord(Base):
+    """Provenance row: one per source (ref_type, ref_id, ts) that produced a deduplicated chunk."""
+
+    __tablename__ = "chunk_refs"
+
+    chunk_id: Mapped[int] = mapped_column(ForeignKey("chunks.id", ondelete="CASCADE"), primary_key=True)
+    ref_type: Mapped[str] = mapped_column(String, primary_key=True, default="")
+    ref_id: Mapped[str] = mapped_column(String, primary_key=True, default="")
+    ts: Mapped[str] = mapped_column(String, primary_key=True, default="")
 
 
 class EmbeddingRecord(Base):
     __tablename__ = "embeddings"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    chunk_id: Mapped[int] = mapped_column(ForeignKey("chunks.id", ondelete="CASCADE"))
+    chunk_id: Mapped[int] = mapped_column(ForeignKey("chunks.id", ondelete="CASCADE"), unique=True)
     embedding: Mapped[Optional[List[float]]] = mapped_column(VectorType(1536))
 
 
+class EmbeddingQueueRecord(Base):
+    """Chunk awaiting an embedding from the deferred worker; ``enqueued_at`` drives backlog lag.
+
+    A worker claims a row until ``claimed_until``; a claim left by a crashed worker simply lapses.
+    """
+
+    __tablename__ = "embedding_queue"
+
+    chunk_id: Mapped[int] = mapped_column(ForeignKey("chunks.id", ondelete="CASCADE"), primary_key=True)
+    enqueued_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    claimed_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+
+class EmbeddingCacheRecord(Base):
+    __tablename__ = "embedding_cache"
+
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    model: Mapped[str] = mapped_column(String, nullable=False)
+    dim: Mapped[int] = mapped_column(Integer, nullable=False)
+    embedding: Mapped[List[float]] = mapped_column(PackedVector, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
 EntityKind = Literal["person", "wallet", "property", "business", "security"]
 
 
@@ -296,6 +449,7 @@ class PromptPack(BaseModel):
     daily: Optional[DailyStateWrite] = None
     events: List[EventResponse] = Field(default_factory=list)
     chunks: List[ChunkWithScore] = Field(default_factory=list)
+    meta: Dict[str, Any] = Field(default_factory=dict)
 
 
 class RetrieveRequest(BaseModel):
@@ -311,11 +465,30 @@ class TickRunRequest(BaseModel):
     events: List[EventCreate] = Field(default_factory=list)
 
 
+class MetricSeries(BaseModel):
+    """Columnar (``dates``/``values``) metric history, downsampled when longer than ``points``."""
+
+    entity_id: str
+    key: str
+    method: str
+    total: int
+    dates: List[date]
+    values: List[float]
+
+
 class MemoryStatus(BaseModel):
     db: str
     vector: str
     last_tick: Optional[datetime]
     counts: Dict[str, int]
+    data_version: int = 0
+    caches: Dict[str, Dict[str, int]] = Field(default_factory=dict)
+    embedding_backlog: Dict[str, float] = Field(default_factory=dict)
+
+
+def uses_pgvector(vendor: str) -> bool:
+    """True when embeddings live in a native pgvector column rather than a blob."""
+    return vendor == "postgres" and Vector is not None
 
 
 def _migration_root(vendor: str) -> Path:
@@ -325,32 +498,97 @@ def _migration_root(vendor: str) -> Path:
     return base
 
 
-def _apply_sql(engine: Engine, vendor: str, sql: str) -> None:
-    if vendor == "sqlite":
-        raw = engine.raw_connection()
-        try:
-            raw.executescript(sql)
-            raw.commit()
-        finally:
-            raw.close()
-        return
-
+def _apply_sql(engine: Engine, sql: str) -> None:
     statements = [stmt.strip() for stmt in sql.split(";") if stmt.strip()]
     with engine.begin() as connection:
         for statement in statements:
             connection.exec_driver_sql(statement)
 
 
+_ADD_COLUMN = re.compile(r"^ALTER\s+TABLE\s+(\w+)\s+ADD\s+COLUMN\s+(\w+)", re.IGNORECASE)
+
+
+def _sqlite_statements(sql: str) -> List[str]:
+    """Split a script on statement boundaries; ``;`` inside trigger bodies does not end a statement."""
+    statements: List[str] = []
+    buffer = ""
+    for piece in sql.split(";"):
+        buffer += piece + ";"
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip(" \t\r\n;"):
+                statements.append(buffer.strip())
+            buffer = ""
+    return statements
+
+
+def _apply_sqlite_migration(engine: Engine, name: str, sql: str) -> None:
+    """Apply and record one migration under SQLite's write lock, so racing processes run it once.
+
+    ``executescript`` commits before it runs, so the statements are executed one by one inside
+    ``BEGIN IMMEDIATE`` instead; SQLite DDL is transactional, so a failure leaves nothing behind.
+    ``ADD COLUMN`` is skipped when the column exists, which SQLite cannot express in the SQL itself.
+    """
+    raw = engine.raw_connection()
+    connection = raw.driver_connection
+    isolation_level = connection.isolation_level
+    connection.isolation_level = None
+    try:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            applied = connection.execute("SELECT 1 FROM schema_migrations WHERE name = ?", (name,)).fetchone()
+            if applied is None:
+                for statement in _sqlite_statements(sql):
+                    added = _ADD_COLUMN.match(statement)
+                    if added is not None:
+                        table, column = added.groups()
+                        if any(row[1] == column for row in connection.execute(f"PRAGMA table_info({table})")):
+                            continue
+                    connection.execute(statement)
+                connection.execute(
+                    "INSERT INTO schema_migrations (name, applied_at) VALUES (?, ?)",
+                    (name, datetime.utcnow().isoformat()),
+                )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+    finally:
+        connection.isolation_level = isolation_level
+        raw.close()
+
+
+def _applied_migrations(engine: Engine) -> Set[str]:
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS schema_migrations (name TEXT PRIMARY KEY, applied_at TEXT NOT NULL)"
+        )
+        return {row[0] for row in connection.exec_driver_sql("SELECT name FROM schema_migrations")}
+
+
+def _record_migration(engine: Engine, name: str) -> None:
+    # Concurrent workers may race to apply the same file; Postgres migrations use IF NOT EXISTS so either wins.
+    sql = "INSERT INTO schema_migrations (name, applied_at) VALUES (:name, :applied_at) ON CONFLICT DO NOTHING"
+    with engine.begin() as connection:
+        connection.execute(text(sql), {"name": name, "applied_at": datetime.utcnow().isoformat()})
+
+
 def run_migrations(engine: Engine, vendor: str) -> None:
     root = _migration_root(vendor)
     if not root.exists():
         raise HTTPException(status_code=500, detail=f"Missing migrations for vendor {vendor}")
 
+    applied = _applied_migrations(engine)
     for path in sorted(root.glob("*.sql")):
+        if path.name in applied:
+            continue
         sql = path.read_text()
         try:
-            _apply_sql(engine, vendor, sql)
-        except SQLAlchemyError as exc:  # pragma: no cover - surfaces migration issues
+            if vendor == "sqlite":
+                _apply_sqlite_migration(engine, path.name, sql)
+            else:
+                _apply_sql(engine, sql)
+                _record_migration(engine, path.name)
+        except (SQLAlchemyError, sqlite3.DatabaseError) as exc:  # pragma: no cover - surfaces migration issues
             raise HTTPException(status_code=500, detail=f"Migration {path.name} failed: {exc}") from exc
 
 
@@ -379,14 +617,29 @@ __all__ = [
     "RetrieveRequest",
     "TickRunRequest",
     "MemoryStatus",
+    "MetricSeries",
     "run_migrations",
+    "VectorPrecision",
+    "VECTOR_PRECISIONS",
+    "encode_vector",
+    "decode_vector_array",
+    "vector_precision",
+    "uses_pgvector",
     "Entity",
     "Attribute",
     "Relation",
     "EventRecord",
+    "EventLinkRecord",
     "DailyStateRecord",
     "EntityStateRecord",
+    "ArcAccumulatorRecord",
+    "StateRollupRecord",
+    "GLOBAL_ROLLUP_SCOPE",
     "ChunkRecord",
+    "ChunkRefRecord",
     "EmbeddingRecord",
+    "EmbeddingCacheRecord",
+    "EmbeddingQueueRecord",
+    "EntityMetricRecord",
     "Base",
 ]
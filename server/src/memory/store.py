@@ -1,48 +1,94 @@
 from __future__ import annotations
 
+import hashlib
 import logging
+import threading
 from contextlib import contextmanager
 from datetime import date, datetime, timedelta, timezone
 from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from sqlalchemy import Select, and_, delete, desc, func, select
+import numpy as np
+from sqlalchemy import LargeBinary, Select, and_, bindparam, delete, desc, func, or_, select, type_coerce, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session, sessionmaker
 
-from .config import MemoryConfig
+from .config import MemoryConfig, create_read_engine
+from .embeddings import EmbeddingCache
 from .ids import entity_id
+from .arcs import ARC_WINDOW_DAYS, merge_arc_entry
 from .schema import (
     Attribute,
+    ArcAccumulatorRecord,
     AttributeSet,
     ChunkInput,
     ChunkRecord,
+    ChunkRefRecord,
     DailyStateRecord,
     DailyStateWrite,
+    DataVersionRecord,
+    EmbeddingCacheRecord,
+    EmbeddingQueueRecord,
     EmbeddingRecord,
     Entity,
+    EntityMetricRecord,
     EntityStateRecord,
     EntityStateWrite,
     EntityUpsert,
     EventCreate,
+    EventLinkRecord,
     EventRecord,
     EventResponse,
+    GLOBAL_ROLLUP_SCOPE,
     PromptPack,
     Relation,
     RelationSet,
     RetrieveRequest,
+    StateRollupRecord,
+    VECTOR_PRECISIONS,
+    decode_vector_array,
+    encode_vector,
     run_migrations,
+    uses_pgvector,
+    vector_precision,
 )
 
 logger = logging.getLogger(__name__)
 
+METRIC_BUCKETS = ("day", "week", "month")
+
+# Keyed by database URL (and pool settings), so building many stores does not open a pool per store.
+_read_engines: Dict[Tuple[Any, ...], Optional[Engine]] = {}
+_read_engines_lock = threading.Lock()
+
+
+def _shared_read_engine(config: MemoryConfig) -> Optional[Engine]:
+    key = (
+        config.db_url,
+        config.echo_sql,
+        config.sqlite_tuned,
+        config.sqlite_read_pool_size,
+        config.sqlite_cache_mb,
+        config.sqlite_mmap_mb,
+        config.sqlite_busy_timeout_ms,
+    )
+    with _read_engines_lock:
+        if key not in _read_engines:
+            _read_engines[key] = create_read_engine(config)
+        return _read_engines[key]
+
 
 class MemoryStore:
-    def __init__(self, engine: Engine, config: MemoryConfig) -> None:
+    def __init__(self, engine: Engine, config: MemoryConfig, *, read_engine: Optional[Engine] = None) -> None:
         self.engine = engine
         self.config = config
+        # Under the SQLite performance profile reads get their own WAL reader pool.
+        self.read_engine = read_engine or (_shared_read_engine(config) if engine.dialect.name == "sqlite" else None) or engine
         self.Session = sessionmaker(bind=engine, future=True, expire_on_commit=False)
+        self.ReadSession = sessionmaker(bind=self.read_engine, future=True, expire_on_commit=False)
         self._migrated = False
+        self.embedding_cache = EmbeddingCache(config, self)
 
     def ensure_schema(self) -> None:
         if self._migrated:
@@ -62,6 +108,48 @@ class MemoryStore:
         finally:
             session.close()
 
+    @contextmanager
+    def read_session(self) -> Iterator[Session]:
+        """Session for pure reads; on tuned SQLite it never waits behind the writer."""
+        session = self.ReadSession()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    @contextmanager
+    def write_session(self) -> Iterator[Session]:
+        """Session whose successful commit bumps :attr:`data_version` in the same transaction."""
+        with self.session() as session:
+            yield session
+            self._bump_data_version(session)
+
+    @contextmanager
+    def _join(self, session: Optional[Session], *, write: bool = True) -> Iterator[Session]:
+        """Reuse a caller's session (its transaction commits later) or open a fresh one."""
+        if session is not None:
+            yield session
+            return
+        with (self.write_session() if write else self.session()) as own:
+            yield own
+
+    @property
+    def data_version(self) -> int:
+        """Monotonic counter of committed writes to this database, shared by every process using it."""
+        self.ensure_schema()
+        with self.read_session() as session:
+            return session.execute(select(DataVersionRecord.version)).scalar() or 0
+
+    def bump_data_version(self) -> int:
+        self.ensure_schema()
+        with self.session() as session:
+            return self._bump_data_version(session)
+
+    @staticmethod
+    def _bump_data_version(session: Session) -> int:
+        stmt = update(DataVersionRecord).values(version=DataVersionRecord.version + 1).returning(DataVersionRecord.version)
+        return session.execute(stmt).scalar_one()
+
     # --- Write operations -------------------------------------------------
 
     def upsert_entity(self, payload: EntityUpsert, correlation_id: Optional[str] = None) -> Entity:
@@ -69,7 +157,7 @@ class MemoryStore:
         entity_id_value = payload.id or entity_id(payload.kind, payload.name or payload.kind)
         log_extra = {"correlation_id": correlation_id, "entity_id": entity_id_value}
         logger.info("memory.upsert_entity", extra=log_extra)
-        with self.session() as session:
+        with self.write_session() as session:
             existing = session.get(Entity, entity_id_value)
             if existing:
                 existing.kind = payload.kind
@@ -85,7 +173,7 @@ class MemoryStore:
         self.ensure_schema()
         log_extra = {"correlation_id": correlation_id, "entity_id": payload.entity_id, "key": payload.key}
         logger.info("memory.set_attribute", extra=log_extra)
-        with self.session() as session:
+        with self.write_session() as session:
             record = Attribute(
                 entity_id=payload.entity_id,
                 key=payload.key,
@@ -104,7 +192,7 @@ class MemoryStore:
             "rel": payload.rel,
         }
         logger.info("memory.add_relation", extra=log_extra)
-        with self.session() as session:
+        with self.write_session() as session:
             record = Relation(
                 src_id=payload.src_id,
                 dst_id=payload.dst_id,
@@ -120,7 +208,7 @@ class MemoryStore:
         log_extra = {"correlation_id": correlation_id, "ts": payload.ts.isoformat(), "type": payload.type}
         logger.info("memory.append_event", extra=log_extra)
         links = list(dict.fromkeys(payload.links))
-        with self.session() as session:
+        with self.write_session() as session:
             record = EventRecord(
                 ts=payload.ts,
                 actor_id=payload.actor_id,
@@ -130,13 +218,15 @@ class MemoryStore:
             )
             session.add(record)
             session.flush()
+            session.add_all(EventLinkRecord(event_id=record.id, entity_id=link, ts=payload.ts) for link in links)
             return record
 
     def write_entity_state(self, payload: EntityStateWrite, correlation_id: Optional[str] = None) -> EntityStateRecord:
         self.ensure_schema()
         log_extra = {"correlation_id": correlation_id, "entity_id": payload.entity_id, "date": payload.date.isoformat()}
         logger.info("memory.write_entity_state", extra=log_extra)
-        with self.session() as session:
+        with self.write_session() as session:
+            self.replace_metrics([(payload.entity_id, payload.date, payload.state)], session=session)
             record = session.get(EntityStateRecord, {"date": payload.date, "entity_id": payload.entity_id})
             if record:
                 record.state = payload.state
@@ -156,7 +246,8 @@ class MemoryStore:
         self.ensure_schema()
         log_extra = {"correlation_id": correlation_id, "date": payload.date.isoformat()}
         logger.info("memory.write_daily_state", extra=log_extra)
-        with self.session() as session:
+        with self.write_session() as session:
+            self.replace_metrics([(GLOBAL_ROLLUP_SCOPE, payload.date, payload.global_state)], session=session)
             record = session.get(DailyStateRecord, payload.date)
             if record:
                 record.global_state = payload.global_state
@@ -171,31 +262,114 @@ class MemoryStore:
             session.add(record)
             return record
 
-    def add_chunks(self, chunks: Sequence[ChunkInput], correlation_id: Optional[str] = None) -> List[ChunkRecord]:
+    def replace_metrics(
+        self,
+        states: Iterable[Tuple[str, date, Dict[str, Any]]],
+        *,
+        session: Optional[Session] = None,
+    ) -> int:
+        """Mirror the numeric keys of ``(entity_id, day, state)`` snapshots into ``entity_metric``.
+
+        Each (entity, day) is replaced wholesale, so keys dropped from a rewritten state disappear too.
+        """
+        by_day: Dict[date, List[str]] = {}
+        rows: List[Dict[str, Any]] = []
+        for scope, day, state in states:
+            by_day.setdefault(day, []).append(scope)
+            rows.extend(
+                {"entity_id": scope, "key": key, "date": day, "value": float(value)}
+                for key, value in numeric_metrics(state).items()
+            )
+        if not by_day:
+            return 0
+        with self._join(session) as session:
+            for day, scopes in by_day.items():
+                session.execute(
+                    delete(EntityMetricRecord)
+                    .where(EntityMetricRecord.date == day)
+                    .where(EntityMetricRecord.entity_id.in_(scopes))
+                )
+            if rows:
+                session.execute(self._insert_ignore(EntityMetricRecord), rows)
+        return len(rows)
+
+    def add_chunks(
+        self,
+        chunks: Sequence[ChunkInput],
+        correlation_id: Optional[str] = None,
+        *,
+        session: Optional[Session] = None,
+    ) -> List[ChunkRecord]:
+        """Store chunks, reusing the existing row when the same source already produced identical text.
+
+        Returns one record per distinct chunk in input order. Every occurrence is kept as provenance in
+        ``chunk_refs``, and a reused chunk moves to its newest timestamp/meta so recency scoring holds.
+        """
         self.ensure_schema()
         if not chunks:
             return []
         log_extra = {"correlation_id": correlation_id, "count": len(chunks)}
         logger.info("memory.add_chunks", extra=log_extra)
-        with self.session() as session:
-            records: List[ChunkRecord] = []
-            for chunk in chunks:
-                record = ChunkRecord(
-                    ref_type=chunk.ref_type,
-                    ref_id=chunk.ref_id,
-                    ts=chunk.ts,
-                    text=chunk.text,
-                    meta=chunk.meta,
-                )
-                session.add(record)
-                session.flush([record])
-                records.append(record)
-            return records
+        hashes = [chunk_content_hash(chunk) for chunk in chunks]
+        first: Dict[str, ChunkInput] = {}
+        for digest, chunk in zip(hashes, chunks):
+            first.setdefault(digest, chunk)
+        with self._join(session) as session:
+            # Insert-or-ignore on the unique content hash, then read back: a concurrent writer adding the
+            # same text can win the insert, but never makes this one fail.
+            session.execute(
+                self._insert_ignore(ChunkRecord),
+                [
+                    {
+                        "ref_type": chunk.ref_type,
+                        "ref_id": chunk.ref_id,
+                        "ts": chunk.ts,
+                        "text": chunk.text,
+                        "meta": chunk.meta,
+                        "content_hash": digest,
+                    }
+                    for digest, chunk in first.items()
+                ],
+            )
+            known: Dict[str, ChunkRecord] = {
+                record.content_hash: record
+                for record in session.execute(
+                    select(ChunkRecord).where(ChunkRecord.content_hash.in_(list(first)))
+                ).scalars()
+                if record.content_hash
+            }
+            records: Dict[str, ChunkRecord] = {}
+            refs = set()
+            for chunk, digest in zip(chunks, hashes):
+                record = known[digest]
+                if chunk.ts and (record.ts is None or _as_utc(chunk.ts) > _as_utc(record.ts)):
+                    record.ts = chunk.ts
+                    record.meta = chunk.meta
+                records.setdefault(digest, record)
+                refs.add((record.id, chunk.ref_type or "", chunk.ref_id or "", chunk.ts.isoformat() if chunk.ts else ""))
+            session.execute(
+                self._insert_ignore(ChunkRefRecord),
+                [{"chunk_id": chunk_id, "ref_type": ref_type, "ref_id": ref_id, "ts": ts} for chunk_id, ref_type, ref_id, ts in refs],
+            )
+            return list(records.values())
+
+    def chunks_missing_embeddings(self, chunk_ids: Sequence[int], *, session: Optional[Session] = None) -> List[int]:
+        """Subset of ``chunk_ids`` (order kept) with no stored embedding, e.g. fresh rather than reused chunks."""
+        if not chunk_ids:
+            return []
+        self.ensure_schema()
+        with self._join(session, write=False) as session:
+            embedded = set(
+                session.execute(select(EmbeddingRecord.chunk_id).where(EmbeddingRecord.chunk_id.in_(list(chunk_ids)))).scalars()
+            )
+        return [chunk_id for chunk_id in chunk_ids if chunk_id not in embedded]
 
     def add_embeddings(
         self,
         vectors: Sequence[Tuple[int, Sequence[float]]],
         correlation_id: Optional[str] = None,
+        *,
+        session: Optional[Session] = None,
     ) -> List[EmbeddingRecord]:
         self.ensure_schema()
         if not vectors:
@@ -203,26 +377,194 @@ class MemoryStore:
         log_extra = {"correlation_id": correlation_id, "count": len(vectors)}
         logger.info("memory.add_embeddings", extra=log_extra)
         target_dim = self.config.vector_dim
-        with self.session() as session:
-            records: List[EmbeddingRecord] = []
-            for chunk_id, vector in vectors:
-                normalized = self._normalize_vector(vector, target_dim)
-                record = EmbeddingRecord(chunk_id=chunk_id, embedding=normalized)
-                session.add(record)
-                session.flush([record])
-                records.append(record)
+        blob_storage = not uses_pgvector(self.config.db_vendor)
+        rows: Dict[int, Dict[str, Any]] = {}
+        for chunk_id, vector in vectors:
+            normalized = self._normalize_vector(vector, target_dim)
+            stored: Any = encode_vector(normalized, self.config.vector_precision) if blob_storage else normalized
+            rows[chunk_id] = {"chunk_id": chunk_id, "embedding": stored}
+        with self._join(session) as session:
+            # Embeddings are unique per chunk, so a chunk another worker embedded meanwhile is skipped.
+            records = list(session.scalars(self._insert_ignore(EmbeddingRecord).returning(EmbeddingRecord), list(rows.values())))
+            session.execute(
+                delete(EmbeddingQueueRecord).where(EmbeddingQueueRecord.chunk_id.in_([chunk_id for chunk_id, _ in vectors]))
+            )
             return records
 
+    def enqueue_embeddings(
+        self,
+        chunk_ids: Sequence[int],
+        correlation_id: Optional[str] = None,
+        *,
+        session: Optional[Session] = None,
+    ) -> int:
+        """Queue chunks for the deferred embedding worker; returns how many were newly queued.
+
+        Already-queued chunks keep their place.
+        """
+        if not chunk_ids:
+            return 0
+        self.ensure_schema()
+        logger.info("memory.enqueue_embeddings", extra={"correlation_id": correlation_id, "count": len(chunk_ids)})
+        now = datetime.now(timezone.utc)
+        with self._join(session) as session:
+            queued = session.scalars(
+                self._insert_ignore(EmbeddingQueueRecord).returning(EmbeddingQueueRecord.chunk_id),
+                [{"chunk_id": chunk_id, "enqueued_at": now} for chunk_id in dict.fromkeys(chunk_ids)],
+            )
+            return len(queued.all())
+
+    def dequeue_embeddings(self, chunk_ids: Sequence[int]) -> None:
+        if not chunk_ids:
+            return
+        self.ensure_schema()
+        with self.write_session() as session:
+            session.execute(delete(EmbeddingQueueRecord).where(EmbeddingQueueRecord.chunk_id.in_(list(chunk_ids))))
+
+    def claim_embeddings(self, limit: int, lease: timedelta) -> List[ChunkRecord]:
+        """Claim up to ``limit`` queued chunks, oldest first, for ``lease``; no other worker gets them meanwhile.
+
+        The claim is one ``UPDATE ... RETURNING``, so workers in separate processes never share a row.
+        Claimed rows stay queued until their embedding lands, and a lapsed claim can be taken again.
+        """
+        self.ensure_schema()
+        now = datetime.now(timezone.utc)
+        claimable = or_(EmbeddingQueueRecord.claimed_until.is_(None), EmbeddingQueueRecord.claimed_until < now)
+        oldest = (
+            select(EmbeddingQueueRecord.chunk_id)
+            .where(claimable)
+            .order_by(EmbeddingQueueRecord.enqueued_at, EmbeddingQueueRecord.chunk_id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        with self.session() as session:
+            claimed = session.scalars(
+                update(EmbeddingQueueRecord)
+                .where(EmbeddingQueueRecord.chunk_id.in_(oldest.scalar_subquery()))
+                .where(claimable)
+                .values(claimed_until=now + lease)
+                .returning(EmbeddingQueueRecord.chunk_id)
+            ).all()
+            if not claimed:
+                return []
+            stmt = (
+                select(ChunkRecord)
+                .join(EmbeddingQueueRecord, EmbeddingQueueRecord.chunk_id == ChunkRecord.id)
+                .where(ChunkRecord.id.in_(claimed))
+                .order_by(EmbeddingQueueRecord.enqueued_at, EmbeddingQueueRecord.chunk_id)
+            )
+            return list(session.execute(stmt).scalars())
+
+    def embedding_backlog(self) -> Dict[str, float]:
+        """Queue depth and the age in seconds of the oldest queued chunk."""
+        self.ensure_schema()
+        with self.read_session() as session:
+            depth, oldest = session.execute(
+                select(func.count(), func.min(EmbeddingQueueRecord.enqueued_at)).select_from(EmbeddingQueueRecord)
+            ).one()
+        if isinstance(oldest, str):  # aggregates bypass the column type on SQLite
+            oldest = datetime.fromisoformat(oldest)
+        lag = (datetime.now(timezone.utc) - _as_utc(oldest)).total_seconds() if oldest else 0.0
+        return {"depth": int(depth or 0), "lag_seconds": round(max(lag, 0.0), 3)}
+
+    def update_arc_accumulators(
+        self,
+        day: date,
+        summaries: Dict[str, Optional[str]],
+        *,
+        session: Optional[Session] = None,
+    ) -> Dict[str, List[List[str]]]:
+        """Fold ``day``'s summaries into each entity's rolling arc window in one round trip."""
+        if not summaries:
+            return {}
+        self.ensure_schema()
+        updated: Dict[str, List[List[str]]] = {}
+        with self._join(session, write=False) as session:
+            existing = {
+                record.entity_id: record
+                for record in session.execute(
+                    select(ArcAccumulatorRecord).where(ArcAccumulatorRecord.entity_id.in_(list(summaries)))
+                ).scalars()
+            }
+            for entity_id_value, summary in summaries.items():
+                record = existing.get(entity_id_value)
+                if record is None:
+                    record = ArcAccumulatorRecord(entity_id=entity_id_value, entries=[])
+                    session.add(record)
+                entries = [list(entry) for entry in merge_arc_entry(record.entries or [], day, summary)]
+                record.entries = entries
+                if record.updated_through is None or record.updated_through < day:
+                    record.updated_through = day
+                updated[entity_id_value] = entries
+        return updated
+
+    def get_arc_accumulators(self, entity_ids: Sequence[str]) -> Dict[str, List[List[str]]]:
+        if not entity_ids:
+            return {}
+        self.ensure_schema()
+        with self.read_session() as session:
+            stmt = select(ArcAccumulatorRecord).where(ArcAccumulatorRecord.entity_id.in_(list(entity_ids)))
+            return {record.entity_id: list(record.entries or []) for record in session.execute(stmt).scalars()}
+
+    def rebuild_arc_accumulators(self, as_of: Optional[date] = None, *, window_days: int = ARC_WINDOW_DAYS) -> Dict[str, int]:
+        """Recompute every accumulator from ``entity_state`` (recovery path; reads the full window once)."""
+        self.ensure_schema()
+        with self.session() as session:
+            if as_of is None:
+                as_of = session.execute(select(func.max(EntityStateRecord.date))).scalar()
+            session.execute(delete(ArcAccumulatorRecord))
+            if as_of is None:
+                return {"entities": 0, "entries": 0}
+            stmt = (
+                select(EntityStateRecord.entity_id, EntityStateRecord.date, EntityStateRecord.summary)
+                .where(EntityStateRecord.date > as_of - timedelta(days=window_days))
+                .where(EntityStateRecord.date <= as_of)
+                .order_by(EntityStateRecord.entity_id, EntityStateRecord.date)
+            )
+            windows: Dict[str, List[List[str]]] = {}
+            latest: Dict[str, date] = {}
+            for entity_id_value, state_date, summary in session.execute(stmt):
+                entries = windows.setdefault(entity_id_value, [])
+                if summary:
+                    entries.append([state_date.isoformat(), summary])
+                latest[entity_id_value] = state_date
+            session.add_all(
+                ArcAccumulatorRecord(entity_id=key, entries=entries, updated_through=latest[key])
+                for key, entries in windows.items()
+            )
+        return {"entities": len(windows), "entries": sum(len(entries) for entries in windows.values())}
+
+    def put_cached_embeddings(self, entries: Sequence[Tuple[str, str, Sequence[float]]]) -> None:
+        if not entries:
+            return
+        self.ensure_schema()
+        rows = [
+            {"key": key, "model": model, "dim": len(vector), "embedding": list(vector)}
+            for key, model, vector in entries
+        ]
+        with self.session() as session:
+            session.execute(self._insert_ignore(EmbeddingCacheRecord), rows)
+
     # --- Retrieval helpers -----------------------------------------------
 
+    def get_cached_embeddings(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        if not keys:
+            return {}
+        self.ensure_schema()
+        with self.read_session() as session:
+            stmt = select(EmbeddingCacheRecord.key, EmbeddingCacheRecord.embedding).where(
+                EmbeddingCacheRecord.key.in_(list(keys))
+            )
+            return {row.key: row.embedding for row in session.execute(stmt)}
+
     def get_entity(self, entity_id_value: str) -> Optional[Entity]:
         self.ensure_schema()
-        with self.session() as session:
+        with self.read_session() as session:
             return session.get(Entity, entity_id_value)
 
     def get_latest_entity_state(self, entity_id_value: str) -> Optional[EntityStateRecord]:
         self.ensure_schema()
-        with self.session() as session:
+        with self.read_session() as session:
             stmt = (
                 select(EntityStateRecord)
                 .where(EntityStateRecord.entity_id == entity_id_value)
@@ -233,7 +575,7 @@ class MemoryStore:
 
     def get_daily_state(self, target_date: date) -> Optional[DailyStateRecord]:
         self.ensure_schema()
-        with self.session() as session:
+        with self.read_session() as session:
             return session.get(DailyStateRecord, target_date)
 
     def get_recent_entity_states(self, entity_ids: Sequence[str], days: int) -> List[EntityStateRecord]:
@@ -241,7 +583,7 @@ class MemoryStore:
             return []
         self.ensure_schema()
         cutoff = date.today() - timedelta(days=days)
-        with self.session() as session:
+        with self.read_session() as session:
             stmt = (
                 select(EntityStateRecord)
                 .where(EntityStateRecord.entity_id.in_(entity_ids))
@@ -250,36 +592,191 @@ class MemoryStore:
             )
             return list(session.execute(stmt).scalars())
 
+    def metric_keys(self, entity_id_value: str) -> List[str]:
+        self.ensure_schema()
+        with self.read_session() as session:
+            stmt = select(EntityMetricRecord.key).where(EntityMetricRecord.entity_id == entity_id_value).distinct()
+            return sorted(session.execute(stmt).scalars())
+
+    def metric_series(
+        self,
+        entity_id_value: str,
+        key: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Tuple[List[date], List[float]]:
+        """Columnar ``(dates, values)`` for one metric over ``[start, end]``; an index range scan."""
+        self.ensure_schema()
+        stmt = (
+            select(EntityMetricRecord.date, EntityMetricRecord.value)
+            .where(EntityMetricRecord.entity_id == entity_id_value)
+            .where(EntityMetricRecord.key == key)
+            .order_by(EntityMetricRecord.date)
+        )
+        if start is not None:
+            stmt = stmt.where(EntityMetricRecord.date >= start)
+        if end is not None:
+            stmt = stmt.where(EntityMetricRecord.date <= end)
+        with self.read_session() as session:
+            rows = session.execute(stmt).all()
+        return [row[0] for row in rows], [float(row[1]) for row in rows]
+
+    def metric_aggregate(
+        self,
+        entity_id_value: str,
+        key: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """``count``/``min``/``max``/``mean`` plus the ``first`` and ``last`` values (and dates) in range."""
+        self.ensure_schema()
+        conditions = [EntityMetricRecord.entity_id == entity_id_value, EntityMetricRecord.key == key]
+        if start is not None:
+            conditions.append(EntityMetricRecord.date >= start)
+        if end is not None:
+            conditions.append(EntityMetricRecord.date <= end)
+        with self.read_session() as session:
+            count, low, high, mean = session.execute(
+                select(
+                    func.count(),
+                    func.min(EntityMetricRecord.value),
+                    func.max(EntityMetricRecord.value),
+                    func.avg(EntityMetricRecord.value),
+                ).where(*conditions)
+            ).one()
+            edges = {}
+            for label, order in (("first", EntityMetricRecord.date), ("last", EntityMetricRecord.date.desc())):
+                row = session.execute(
+                    select(EntityMetricRecord.date, EntityMetricRecord.value).where(*conditions).order_by(order).limit(1)
+                ).first()
+                edges[label] = (row[0], float(row[1])) if row else (None, None)
+        return {
+            "count": int(count or 0),
+            "min": None if low is None else float(low),
+            "max": None if high is None else float(high),
+            "mean": None if mean is None else float(mean),
+            "first": edges["first"][1],
+            "first_date": edges["first"][0],
+            "last": edges["last"][1],
+            "last_date": edges["last"][0],
+        }
+
+    def metric_buckets(
+        self,
+        entity_id_value: str,
+        key: str,
+        bucket: str = "week",
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> List[Dict[str, Any]]:
+        """Resample a metric into ``day``/``week``/``month`` buckets of min/max/mean/last/count."""
+        if bucket not in METRIC_BUCKETS:
+            raise ValueError(f"Unknown bucket {bucket!r}; expected one of {', '.join(METRIC_BUCKETS)}")
+        dates, values = self.metric_series(entity_id_value, key, start, end)
+        if not dates:
+            return []
+        starts = np.array([_bucket_start(day, bucket).toordinal() for day in dates])
+        series = np.asarray(values, dtype=np.float64)
+        # Dates are sorted, so each bucket is one contiguous run.
+        boundaries = np.flatnonzero(np.diff(starts)) + 1
+        offsets = np.concatenate(([0], boundaries))
+        counts = np.diff(np.concatenate((offsets, [len(series)])))
+        sums = np.add.reduceat(series, offsets)
+        return [
+            {
+                "start": date.fromordinal(int(starts[offset])),
+                "min": float(low),
+                "max": float(high),
+                "mean": float(total / count),
+                "last": float(series[offset + count - 1]),
+                "count": int(count),
+            }
+            for offset, count, total, low, high in zip(
+                offsets, counts, sums, np.minimum.reduceat(series, offsets), np.maximum.reduceat(series, offsets)
+            )
+        ]
+
+    def pending_summary_states(self, since: date) -> Tuple[List[EntityStateRecord], List[DailyStateRecord]]:
+        """Entity and daily states from ``since`` onwards still waiting for a lazy summary."""
+        self.ensure_schema()
+        with self.read_session() as session:
+            entity_states = session.execute(
+                select(EntityStateRecord)
+                .where(EntityStateRecord.date >= since)
+                .where(EntityStateRecord.summary.is_(None))
+                .order_by(EntityStateRecord.date, EntityStateRecord.entity_id)
+            ).scalars()
+            daily_states = session.execute(
+                select(DailyStateRecord)
+                .where(DailyStateRecord.date >= since)
+                .where(DailyStateRecord.summary.is_(None))
+                .order_by(DailyStateRecord.date)
+            ).scalars()
+            return list(entity_states), list(daily_states)
+
+    def set_state_summaries(
+        self,
+        entity_summaries: Dict[Tuple[date, str], str],
+        daily_summaries: Optional[Dict[date, str]] = None,
+    ) -> int:
+        """Fill in lazily generated summaries; rows that gained a summary meanwhile keep theirs."""
+        if not entity_summaries and not daily_summaries:
+            return 0
+        self.ensure_schema()
+        updated = 0
+        with self.write_session() as session:
+            for (day, entity_id), summary in entity_summaries.items():
+                updated += session.execute(
+                    EntityStateRecord.__table__.update()
+                    .where(EntityStateRecord.date == day)
+                    .where(EntityStateRecord.entity_id == entity_id)
+                    .where(EntityStateRecord.summary.is_(None))
+                    .values(summary=summary)
+                ).rowcount or 0
+            for day, summary in (daily_summaries or {}).items():
+                updated += session.execute(
+                    DailyStateRecord.__table__.update()
+                    .where(DailyStateRecord.date == day)
+                    .where(DailyStateRecord.summary.is_(None))
+                    .values(summary=summary)
+                ).rowcount or 0
+        return updated
+
+    def get_events_between(
+        self,
+        start: datetime,
+        end: datetime,
+        entity_ids: Optional[Sequence[str]] = None,
+    ) -> List[EventRecord]:
+        """Events with ``start <= ts < end``, optionally only those linked to ``entity_ids``."""
+        self.ensure_schema()
+        stmt = select(EventRecord).where(EventRecord.ts >= start).where(EventRecord.ts < end).order_by(EventRecord.ts, EventRecord.id)
+        if entity_ids is not None:
+            linked = select(EventLinkRecord.event_id).where(EventLinkRecord.entity_id.in_(list(entity_ids)))
+            stmt = stmt.where(EventRecord.id.in_(linked))
+        with self.read_session() as session:
+            return list(session.execute(stmt).scalars())
+
     def get_recent_events(self, entity_ids: Sequence[str], window_days: int, limit: int) -> List[EventRecord]:
         if not entity_ids:
             return []
         self.ensure_schema()
         since_ts = datetime.now(timezone.utc) - timedelta(days=window_days)
-        with self.session() as session:
-            if self.config.is_postgres:
-                stmt = (
-                    select(EventRecord)
-                    .where(EventRecord.ts >= since_ts)
-                    .where(EventRecord.links.op("&&")(list(entity_ids)))
-                    .order_by(EventRecord.ts.desc())
-                    .limit(limit)
-                )
-                return list(session.execute(stmt).scalars())
-
-            stmt = (
-                select(EventRecord)
-                .where(EventRecord.ts >= since_ts)
-                .order_by(EventRecord.ts.desc())
-                .limit(limit)
-            )
-            rows = list(session.execute(stmt).scalars())
-            return [row for row in rows if any(link in entity_ids for link in (row.links or []))]
+        # Served by event_links_entity_ts_idx instead of scanning the links array/JSON of every event.
+        linked = (
+            select(EventLinkRecord.event_id)
+            .where(EventLinkRecord.entity_id.in_(list(entity_ids)))
+            .where(EventLinkRecord.ts >= since_ts)
+        )
+        stmt = select(EventRecord).where(EventRecord.id.in_(linked)).order_by(EventRecord.ts.desc()).limit(limit)
+        with self.read_session() as session:
+            return list(session.execute(stmt).scalars())
 
     def keyword_search_chunks(self, query: str, limit: int) -> List[ChunkRecord]:
         if not query.strip():
             return []
         self.ensure_schema()
-        with self.session() as session:
+        with self.read_session() as session:
             if self.config.is_postgres:
                 stmt = (
                     select(ChunkRecord)
@@ -298,7 +795,7 @@ class MemoryStore:
         self.ensure_schema()
         target_dim = self.config.vector_dim
         normalized = self._normalize_vector(vector, target_dim)
-        with self.session() as session:
+        with self.read_session() as session:
             if self.config.is_postgres and hasattr(EmbeddingRecord.embedding, "cosine_distance"):
                 score_expr = 1 - EmbeddingRecord.embedding.cosine_distance(normalized)
                 stmt = (
@@ -309,14 +806,26 @@ class MemoryStore:
                 )
                 rows = session.execute(stmt).all()
                 return [(row[0], float(row.score)) for row in rows]
-            # SQLite fallback: no vector index, return empty
-            rows = (
-                session.query(ChunkRecord)
-                .join(EmbeddingRecord, EmbeddingRecord.chunk_id == ChunkRecord.id)
-                .limit(limit)
-                .all()
-            )
-            return [(row, 0.0) for row in rows]
+            # SQLite fallback: no vector index, brute-force cosine scan in NumPy
+            rows = session.execute(
+                select(EmbeddingRecord.chunk_id, type_coerce(EmbeddingRecord.embedding, LargeBinary).label("blob"))
+            ).all()
+            chunk_ids: List[int] = []
+            vectors: List[np.ndarray] = []
+            for row in rows:
+                if row.blob is None:
+                    continue
+                values = decode_vector_array(row.blob)
+                if values.size != target_dim:
+                    continue
+                chunk_ids.append(row.chunk_id)
+                vectors.append(values)
+            if not vectors:
+                return []
+            ranked = _cosine_top_k(np.vstack(vectors), np.asarray(normalized, dtype=np.float32), chunk_ids, limit)
+            records = session.execute(select(ChunkRecord).where(ChunkRecord.id.in_([cid for cid, _ in ranked])))
+            by_id = {record.id: record for record in records.scalars()}
+            return [(by_id[cid], score) for cid, score in ranked if cid in by_id]
 
     def get_counts(self) -> Dict[str, int]:
         self.ensure_schema()
@@ -333,17 +842,188 @@ class MemoryStore:
 
     def get_last_chunk_time(self) -> Optional[datetime]:
         self.ensure_schema()
-        with self.session() as session:
+        with self.read_session() as session:
             stmt = select(func.max(ChunkRecord.ts)).scalar_subquery()
             return session.execute(select(stmt)).scalar_one_or_none()
 
+    def requantize_embeddings(self, precision: str, *, batch_size: int = 500) -> Dict[str, int]:
+        """Re-encode stored embedding blobs at ``precision``; returns scanned/rewritten counts."""
+        if precision not in VECTOR_PRECISIONS:
+            raise ValueError(f"Unsupported vector precision: {precision!r}")
+        self.ensure_schema()
+        if uses_pgvector(self.config.db_vendor):
+            logger.info("memory.requantize.skipped", extra={"reason": "pgvector column"})
+            return {"scanned": 0, "rewritten": 0}
+        blob = type_coerce(EmbeddingRecord.embedding, LargeBinary)
+        scanned = rewritten = 0
+        last_id = 0
+        while True:
+            with self.session() as session:
+                rows = session.execute(
+                    select(EmbeddingRecord.id, blob.label("blob"))
+                    .where(EmbeddingRecord.id > last_id)
+                    .order_by(EmbeddingRecord.id)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+                updates = []
+                for row in rows:
+                    scanned += 1
+                    if row.blob is None or vector_precision(row.blob) == precision:
+                        continue
+                    encoded = encode_vector(decode_vector_array(row.blob), precision)
+                    updates.append({"row_id": row.id, "blob": encoded})
+                if updates:
+                    table = EmbeddingRecord.__table__
+                    session.execute(
+                        table.update()
+                        .where(table.c.id == bindparam("row_id"))
+                        .values(embedding=type_coerce(bindparam("blob"), LargeBinary)),
+                        updates,
+                    )
+                    rewritten += len(updates)
+                last_id = rows[-1].id
+        logger.info("memory.requantize", extra={"precision": precision, "scanned": scanned, "rewritten": rewritten})
+        return {"scanned": scanned, "rewritten": rewritten}
+
     def prune_chunk_embeddings(self, chunk_ids: Sequence[int]) -> None:
         if not chunk_ids:
             return
         self.ensure_schema()
-        with self.session() as session:
+        with self.write_session() as session:
             session.execute(delete(EmbeddingRecord).where(EmbeddingRecord.chunk_id.in_(chunk_ids)))
 
+    # --- Retention / compaction -------------------------------------------
+
+    def latest_state_date(self) -> Optional[date]:
+        self.ensure_schema()
+        with self.session() as session:
+            latest_entity = session.execute(select(func.max(EntityStateRecord.date))).scalar()
+            latest_daily = session.execute(select(func.max(DailyStateRecord.date))).scalar()
+        candidates = [value for value in (latest_entity, latest_daily) if value is not None]
+        return max(candidates) if candidates else None
+
+    def state_scopes_before(self, before: date) -> List[str]:
+        """Entity ids (plus :data:`GLOBAL_ROLLUP_SCOPE` for daily_state) with rows older than ``before``."""
+        self.ensure_schema()
+        with self.session() as session:
+            scopes = list(
+                session.execute(
+                    select(EntityStateRecord.entity_id).where(EntityStateRecord.date < before).distinct()
+                ).scalars()
+            )
+            has_daily = session.execute(select(DailyStateRecord.date).where(DailyStateRecord.date < before).limit(1)).first()
+        if has_daily:
+            scopes.append(GLOBAL_ROLLUP_SCOPE)
+        return scopes
+
+    def get_states_before(self, scope: str, before: date) -> List[Tuple[date, Dict[str, Any], Optional[str]]]:
+        self.ensure_schema()
+        with self.session() as session:
+            if scope == GLOBAL_ROLLUP_SCOPE:
+                stmt = (
+                    select(DailyStateRecord.date, DailyStateRecord.global_state, DailyStateRecord.summary)
+                    .where(DailyStateRecord.date < before)
+                    .order_by(DailyStateRecord.date)
+                )
+            else:
+                stmt = (
+                    select(EntityStateRecord.date, EntityStateRecord.state, EntityStateRecord.summary)
+                    .where(EntityStateRecord.entity_id == scope)
+                    .where(EntityStateRecord.date < before)
+                    .order_by(EntityStateRecord.date)
+                )
+            return [(row[0], row[1] or {}, row[2]) for row in session.execute(stmt)]
+
+    def get_state_rollups(self, scope: str) -> List[StateRollupRecord]:
+        self.ensure_schema()
+        with self.read_session() as session:
+            stmt = select(StateRollupRecord).where(StateRollupRecord.scope == scope).order_by(StateRollupRecord.period_start)
+            return list(session.execute(stmt).scalars())
+
+    def weekly_rollup_scopes_before(self, before: date) -> List[str]:
+        self.ensure_schema()
+        with self.session() as session:
+            stmt = (
+                select(StateRollupRecord.scope)
+                .where(StateRollupRecord.period == "weekly")
+                .where(StateRollupRecord.period_start < before)
+                .distinct()
+            )
+            return list(session.execute(stmt).scalars())
+
+    def save_state_rollups(
+        self,
+        scope: str,
+        rollups: Sequence[StateRollupRecord],
+        *,
+        remove: Sequence[Tuple[str, date]] = (),
+        states_before: Optional[date] = None,
+    ) -> int:
+        """Write ``scope``'s rollups and drop the rows they replace in one transaction.
+
+        Returns the number of raw state rows deleted. Doing both atomically means an interrupted
+        compaction never folds the same day into a rollup twice.
+        """
+        self.ensure_schema()
+        with self.write_session() as session:
+            for period, period_start in remove:
+                session.execute(
+                    delete(StateRollupRecord)
+                    .where(StateRollupRecord.scope == scope)
+                    .where(StateRollupRecord.period == period)
+                    .where(StateRollupRecord.period_start == period_start)
+                )
+            for rollup in rollups:
+                session.merge(rollup)
+            if states_before is None:
+                return 0
+            if scope == GLOBAL_ROLLUP_SCOPE:
+                stmt = delete(DailyStateRecord).where(DailyStateRecord.date < states_before)
+            else:
+                stmt = (
+                    delete(EntityStateRecord)
+                    .where(EntityStateRecord.entity_id == scope)
+                    .where(EntityStateRecord.date < states_before)
+                )
+            return session.execute(stmt).rowcount or 0
+
+    def earliest_chunk_ts(
+        self,
+        before: datetime,
+        ref_types: Sequence[str],
+        *,
+        after: Optional[datetime] = None,
+    ) -> Optional[datetime]:
+        self.ensure_schema()
+        with self.session() as session:
+            stmt = select(func.min(ChunkRecord.ts)).where(ChunkRecord.ts < before).where(ChunkRecord.ref_type.in_(list(ref_types)))
+            if after is not None:
+                stmt = stmt.where(ChunkRecord.ts >= after)
+            return session.execute(stmt).scalar()
+
+    def get_chunks_between(self, start: datetime, end: datetime, ref_types: Sequence[str]) -> List[ChunkRecord]:
+        """Chunks of ``ref_types`` with ``start <= ts < end``, oldest first."""
+        self.ensure_schema()
+        with self.session() as session:
+            stmt = (
+                select(ChunkRecord)
+                .where(ChunkRecord.ts >= start)
+                .where(ChunkRecord.ts < end)
+                .where(ChunkRecord.ref_type.in_(list(ref_types)))
+                .order_by(ChunkRecord.ts, ChunkRecord.id)
+            )
+            return list(session.execute(stmt).scalars())
+
+    def delete_chunks(self, chunk_ids: Sequence[int]) -> int:
+        """Delete chunks; embeddings and provenance rows go with them via ``ON DELETE CASCADE``."""
+        if not chunk_ids:
+            return 0
+        self.ensure_schema()
+        with self.write_session() as session:
+            return session.execute(delete(ChunkRecord).where(ChunkRecord.id.in_(list(chunk_ids)))).rowcount or 0
+
     # --- Helpers ----------------------------------------------------------
 
     def _normalize_vector(self, vector: Sequence[float], dim: int) -> List[float]:
@@ -355,11 +1035,63 @@ class MemoryStore:
         padding = [0.0] * (dim - len(values))
         return values + padding
 
+    def _dialect_insert(self, model):
+        """Dialect-specific ``INSERT`` supporting ``ON CONFLICT`` clauses and ``excluded`` columns."""
+        dialect = postgresql if self.config.is_postgres else sqlite
+        return dialect.insert(model)
+
+    def _insert_ignore(self, model):
+        """Dialect-specific ``INSERT ... ON CONFLICT DO NOTHING`` for idempotent bulk writes."""
+        return self._dialect_insert(model).on_conflict_do_nothing()
+
     def _count(self, model) -> int:
-        with self.session() as session:
+        with self.read_session() as session:
             return session.query(func.count()).select_from(model).scalar() or 0
 
 
+def _cosine_top_k(matrix: np.ndarray, query: np.ndarray, ids: Sequence[int], limit: int) -> List[Tuple[int, float]]:
+    query_norm = float(np.linalg.norm(query)) or 1.0
+    row_norms = np.linalg.norm(matrix, axis=1)
+    row_norms[row_norms == 0] = 1.0
+    scores = (matrix @ query) / (row_norms * query_norm)
+    best: Dict[int, float] = {}
+    for position in np.argsort(-scores, kind="stable"):
+        chunk_id = ids[position]
+        if chunk_id in best:
+            continue
+        best[chunk_id] = float(scores[position])
+        if len(best) >= limit:
+            break
+    return list(best.items())
+
+
+def chunk_content_hash(chunk: ChunkInput) -> str:
+    """Identity of a chunk's content: its source type/id plus whitespace-normalised text."""
+    normalised = " ".join(chunk.text.split())
+    return hashlib.sha256(f"{chunk.ref_type or ''}\x1f{chunk.ref_id or ''}\x1f{normalised}".encode("utf-8")).hexdigest()
+
+
+def numeric_metrics(state: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    """Numeric (non-bool) top-level keys of a state snapshot."""
+    return {
+        key: value
+        for key, value in (state or {}).items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+
+
+def _bucket_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
 def as_event_response(record: EventRecord) -> EventResponse:
     return EventResponse(
         id=record.id,
@@ -371,4 +1103,4 @@ def as_event_response(record: EventRecord) -> EventResponse:
     )
 
 
-__all__ = ["MemoryStore", "as_event_response"]
+__all__ = ["METRIC_BUCKETS", "MemoryStore", "as_event_response", "chunk_content_hash", "numeric_metrics"]
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from datetime import date
-from typing import Iterable, List
-
-import httpx
+from typing import Iterable, List, Optional, Sequence
 
+from .cache import LRUCache
 from .config import MemoryConfig
+from .http_pool import get_http_client
 from .schema import EventResponse
 
 logger = logging.getLogger(__name__)
@@ -19,9 +23,29 @@ SYSTEM_PROMPT = (
 )
 
 
+@dataclass
+class EntityDay:
+    """One ``summarize_entity_day`` call, for :meth:`Summarizer.summarize_entities`."""
+
+    entity_id: str
+    state: dict
+    day: date
+    recent_events: List[EventResponse] = field(default_factory=list)
+
+
 class Summarizer:
+    """LLM summaries with a local template fallback.
+
+    Remote results are cached by ``sha256(model, subject, day, payload)`` so retried ticks and
+    unchanged states are free, and :meth:`summarize_entities` fans a tick's entities out over
+    ``summarizer_concurrency`` threads sharing the pooled HTTP client.
+    """
+
     def __init__(self, config: MemoryConfig) -> None:
         self.config = config
+        self.cache: LRUCache[str, str] = LRUCache(config.summary_cache_size)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
 
     def summarize_entity_day(
         self,
@@ -33,8 +57,7 @@ class Summarizer:
         events_list = list(recent_events)
         if self.config.llm_enabled:
             try:
-                return _llm_summarise(
-                    config=self.config,
+                return self._remote(
                     subject=f"Entity {entity_id}",
                     day=day,
                     payload={"state": state, "events": [_event_payload(ev) for ev in events_list]},
@@ -43,12 +66,34 @@ class Summarizer:
                 logger.warning("memory.summarizer.remote_failed", exc_info=exc)
         return _local_entity_summary(entity_id, state, events_list, day)
 
+    def summarize_entities(self, items: Sequence[EntityDay]) -> List[str]:
+        """Summaries for ``items`` in order; entities still pending at the deadline get the local template."""
+        if not items:
+            return []
+        if not self.config.llm_enabled or len(items) == 1 or self.config.summarizer_concurrency <= 1:
+            return [self.summarize_entity_day(item.entity_id, item.state, item.recent_events, item.day) for item in items]
+
+        executor = self._get_executor()
+        futures = [
+            executor.submit(self.summarize_entity_day, item.entity_id, item.state, item.recent_events, item.day)
+            for item in items
+        ]
+        wait(futures, timeout=self.config.summarizer_timeout)
+        summaries: List[str] = []
+        for item, future in zip(items, futures):
+            if future.done() and future.exception() is None:
+                summaries.append(future.result())
+                continue
+            future.cancel()
+            logger.warning("memory.summarizer.timeout", extra={"entity_id": item.entity_id, "date": item.day.isoformat()})
+            summaries.append(_local_entity_summary(item.entity_id, item.state, item.recent_events, item.day))
+        return summaries
+
     def summarize_daily(self, global_state: dict, headlines: Iterable[str], day: date) -> str:
         headlines_list = [h for h in headlines if h]
         if self.config.llm_enabled:
             try:
-                return _llm_summarise(
-                    config=self.config,
+                return self._remote(
                     subject="Daily overview",
                     day=day,
                     payload={"global_state": global_state, "headlines": headlines_list},
@@ -65,6 +110,36 @@ class Summarizer:
         body = " ".join(collected[-5:])
         return _truncate_words(f"{intro}: {body}", 750)
 
+    def close(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _remote(self, *, subject: str, day: date, payload: dict) -> str:
+        # Only remote results are cached: a fallback must not stop the next attempt reaching the LLM.
+        key = summary_cache_key(self.config.llm_model, subject, day, payload)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        summary = _llm_summarise(config=self.config, subject=subject, day=day, payload=payload)
+        self.cache.put(key, summary)
+        return summary
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.config.summarizer_concurrency,
+                    thread_name_prefix="memory-summarize",
+                )
+            return self._executor
+
+
+def summary_cache_key(model: str, subject: str, day: date, payload: dict) -> str:
+    raw = json.dumps([model, subject, day.isoformat(), payload], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
 
 def _llm_summarise(*, config: MemoryConfig, subject: str, day: date, payload: dict) -> str:
     base = config.llm_api_base.rstrip("/")
@@ -88,10 +163,10 @@ def _llm_summarise(*, config: MemoryConfig, subject: str, day: date, payload: di
         "temperature": 0.1,
         "max_tokens": 600,
     }
-    with httpx.Client(timeout=config.http_timeout) as client:
-        response = client.post(endpoint, headers=headers, json=request_body)
-        response.raise_for_status()
-        data = response.json()
+    client = get_http_client(config)
+    response = client.post(endpoint, headers=headers, json=request_body, timeout=config.summarizer_timeout)
+    response.raise_for_status()
+    data = response.json()
     try:
         return data["choices"][0]["message"]["content"].strip()
     except (KeyError, IndexError) as exc:  # pragma: no cover - defensive
@@ -158,4 +233,4 @@ def _truncate_words(text: str, max_words: int) -> str:
     return " ".join(words[:max_words]) + " …"
 
 
-__all__ = ["Summarizer"]
+__all__ = ["EntityDay", "Summarizer", "summary_cache_key"]
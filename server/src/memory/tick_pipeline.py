@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional
 
+from .arcs import WEEKLY_ARC_DAYS, arc_summaries, is_monthly_arc_day, is_weekly_arc_day, sample_summaries
+
 from .chunker import Chunker
 from .config import MemoryConfig
-from .embeddings import embed_batch
+from .embedding_worker import embed_chunks
+from .lazy_summaries import SummaryMaterializer
 from .schema import (
     ChunkInput,
     DailyStateWrite,
@@ -15,7 +18,7 @@ from .schema import (
     TickRunRequest,
 )
 from .store import MemoryStore, as_event_response
-from .summarizer import Summarizer
+from .summarizer import EntityDay, Summarizer
 
 
 class TickPipeline:
@@ -24,6 +27,7 @@ class TickPipeline:
         self.config = config
         self.chunker = Chunker(config)
         self.summarizer = Summarizer(config)
+        self.materializer = SummaryMaterializer(store, config, self.summarizer)
 
     def run(self, request: TickRunRequest, correlation_id: Optional[str] = None) -> Dict[str, object]:
         self.store.ensure_schema()
@@ -32,28 +36,36 @@ class TickPipeline:
             record = self.store.append_event(event_payload, correlation_id)
             recorded_events.append(as_event_response(record))
 
+        # Missing summaries are generated together so the LLM calls run concurrently. In lazy mode they
+        # stay NULL until a reader needs them (see SummaryMaterializer).
+        lazy = self.config.summaries_lazy
+        pending = [] if lazy else [entity_state for entity_state in request.entities if not entity_state.summary]
+        generated = self.summarizer.summarize_entities(
+            [
+                EntityDay(
+                    entity_id=entity_state.entity_id,
+                    state=entity_state.state,
+                    day=entity_state.date,
+                    recent_events=[ev for ev in recorded_events if entity_state.entity_id in ev.links],
+                )
+                for entity_state in pending
+            ]
+        )
+        summaries = {id(entity_state): summary for entity_state, summary in zip(pending, generated)}
+
         entity_states_written: List[EntityStateWrite] = []
         for entity_state in request.entities:
-            summary = entity_state.summary
-            if not summary:
-                recent_events = [ev for ev in recorded_events if entity_state.entity_id in ev.links]
-                summary = self.summarizer.summarize_entity_day(
-                    entity_state.entity_id,
-                    entity_state.state,
-                    recent_events,
-                    entity_state.date,
-                )
             payload = EntityStateWrite(
                 date=entity_state.date,
                 entity_id=entity_state.entity_id,
                 state=entity_state.state,
-                summary=summary,
+                summary=entity_state.summary or summaries.get(id(entity_state)),
             )
             self.store.write_entity_state(payload, correlation_id)
             entity_states_written.append(payload)
 
         daily_payload = request.global_state
-        if not daily_payload.summary:
+        if not daily_payload.summary and not lazy:
             headlines = [event.type or "event" for event in recorded_events]
             daily_payload = DailyStateWrite(
                 date=daily_payload.date,
@@ -68,62 +80,79 @@ class TickPipeline:
 
         chunk_inputs: List[ChunkInput] = []
         for state in entity_states_written:
+            if not state.summary:
+                continue
             ts = datetime.combine(state.date, datetime.min.time())
             chunk_inputs.extend(
                 self.chunker.chunk_entity_summary(state.entity_id, state.summary or "", ts)
             )
 
         for event in recorded_events:
-            ts = event.ts
-            payload_text = ", ".join(f"{k}={v}" for k, v in (event.payload or {}).items())
-            event_text = f"Event {event.id} ({event.type or 'event'}): {payload_text}".strip()
             chunk_inputs.extend(
-                self.chunker.chunk_event(event.id, event_text, ts, event.links)
+                self.chunker.chunk_event(event.id, event_chunk_text(event.id, event.type, event.payload), event.ts, event.links)
             )
 
         chunk_inputs = _deduplicate_chunks(chunk_inputs)
         chunk_records = self.store.add_chunks(chunk_inputs, correlation_id)
 
-        if request.date.weekday() == 6:
-            arc_chunks: List[ChunkInput] = []
-            for state in entity_states_written:
-                history = self.store.get_recent_entity_states([state.entity_id], days=28)
-                summaries = [record.summary for record in history if record.summary]
-                arc_text = self.summarizer.summarize_arc(
-                    state.entity_id,
-                    summaries,
-                    label=f"Weekly arc ending {request.date.isoformat()}",
-                )
-                ts = datetime.combine(request.date, datetime.min.time())
-                arc_chunks.extend(
-                    self.chunker.chunk_text(
-                        arc_text,
-                        ref_type="arc",
-                        ref_id=state.entity_id,
-                        ts=ts,
-                        meta={"entity_id": state.entity_id, "date": request.date.isoformat()},
-                    )
-                )
-            if arc_chunks:
-                arc_chunks = _deduplicate_chunks(arc_chunks)
-                arc_records = self.store.add_chunks(arc_chunks, correlation_id)
-                chunk_records.extend(arc_records)
-
-        embeddings_created = 0
-        if chunk_records and self.config.vector_dim:
-            vectors = embed_batch((record.text for record in chunk_records), self.config)
-            vector_pairs = list(zip([record.id for record in chunk_records], vectors))
-            self.store.prune_chunk_embeddings([record.id for record in chunk_records])
-            self.store.add_embeddings(vector_pairs, correlation_id)
-            embeddings_created = len(vector_pairs)
-
+        accumulators = self.store.update_arc_accumulators(
+            request.date, {state.entity_id: state.summary for state in entity_states_written if state.summary}
+        )
+        if lazy and (is_weekly_arc_day(request.date) or is_monthly_arc_day(request.date)):
+            # Pending summaries only reach the accumulators once generated, so make the ones this
+            # tick's arcs cover before emitting them.
+            self.materializer.warm(days=max(WEEKLY_ARC_DAYS, request.date.day), as_of=request.date)
+            accumulators = self.store.get_arc_accumulators([state.entity_id for state in entity_states_written])
+        arc_chunks = self.arc_chunks(request.date, accumulators)
+        if arc_chunks:
+            arc_chunks = _deduplicate_chunks(arc_chunks)
+            arc_records = self.store.add_chunks(arc_chunks, correlation_id)
+            chunk_records.extend(arc_records)
+
+        # Chunks reused from earlier ticks already carry an embedding; with EMBEDDINGS_DEFERRED the rest
+        # are queued for the embedding worker so the tick commits without waiting on the embedder.
+        embeddings_created, embeddings_queued = embed_chunks(self.store, self.config, chunk_records, correlation_id)
+
+        # Every write already bumps the version; bumping once more after the whole tick lands
+        # invalidates prompt packs cached from a half-written tick.
+        data_version = self.store.bump_data_version()
         return {
             "events": len(recorded_events),
             "entity_states": len(entity_states_written),
+            "summaries_pending": sum(1 for state in entity_states_written if not state.summary),
             "chunks": len(chunk_records),
             "embeddings": embeddings_created,
+            "embeddings_queued": embeddings_queued,
+            "data_version": data_version,
         }
 
+    def arc_chunks(self, day: date, accumulators: Dict[str, List[List[str]]]) -> List[ChunkInput]:
+        """Weekly (Sunday) and monthly (last day of month) arcs straight from the rolling accumulators."""
+        periods = []
+        if is_weekly_arc_day(day):
+            periods.append(("weekly", day - timedelta(days=WEEKLY_ARC_DAYS - 1), f"Weekly arc ending {day.isoformat()}"))
+        if is_monthly_arc_day(day):
+            periods.append(("monthly", day.replace(day=1), f"Monthly arc for {day.strftime('%Y-%m')}"))
+        if not periods:
+            return []
+
+        ts = datetime.combine(day, datetime.min.time())
+        chunks: List[ChunkInput] = []
+        for entity_id, entries in accumulators.items():
+            for period, start, label in periods:
+                summaries = sample_summaries(arc_summaries(entries, start, day))
+                arc_text = self.summarizer.summarize_arc(entity_id, summaries, label=label)
+                meta = {"entity_id": entity_id, "date": day.isoformat()}
+                if period == "monthly":
+                    meta["period"] = period
+                chunks.extend(self.chunker.chunk_text(arc_text, ref_type="arc", ref_id=entity_id, ts=ts, meta=meta))
+        return chunks
+
+
+def event_chunk_text(event_id: int, event_type: Optional[str], payload: Optional[Dict[str, object]]) -> str:
+    payload_text = ", ".join(f"{k}={v}" for k, v in (payload or {}).items())
+    return f"Event {event_id} ({event_type or 'event'}): {payload_text}".strip()
+
 
 def _deduplicate_chunks(chunks: List[ChunkInput]) -> List[ChunkInput]:
     seen = set()
@@ -137,4 +166,4 @@ def _deduplicate_chunks(chunks: List[ChunkInput]) -> List[ChunkInput]:
     return deduped
 
 
-__all__ = ["TickPipeline"]
+__all__ = ["TickPipeline", "event_chunk_text"]
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from sim.time import SimClock
+
+from .schema import SimulationBatchResults, SimulationBatchStatus
+
+# Parameter columns of a batch summary, ahead of the union of the runs' terminal metrics.
+PARAMETER_COLUMNS = ("run_id", "status", "scenario", "seed", "step", "start", "until", "duration_seconds", "last_day")
+_TERMINAL = frozenset({"completed", "failed", "cancelled"})
+
+
+@dataclass
+class SimulationBatch:
+    batch_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    submitted_at: datetime = field(default_factory=datetime.utcnow)
+    size: int = 0
+    metadata: Optional[Dict[str, Any]] = None
+    run_ids: List[str] = field(default_factory=list)
+
+
+class BatchRunRow(NamedTuple):
+    """The slice of a run a batch summary needs; the queue reads it without decoding whole records."""
+
+    run_id: str
+    status: str
+    scenario: str
+    seed: int
+    step: str
+    start: str
+    until: str
+    duration_seconds: Optional[float]
+    day_index: Optional[int]
+    last_day: Optional[str]
+    metrics: Optional[Dict[str, Any]]
+
+    @classmethod
+    def from_run(cls, run: Any) -> "BatchRunRow":
+        payload = run.payload
+        result = run.result or {}
+        return cls(
+            run_id=run.run_id,
+            status=run.status,
+            scenario=payload.scenario,
+            seed=payload.seed,
+            step=payload.step,
+            start=payload.start.isoformat(),
+            until=payload.until.isoformat(),
+            duration_seconds=run.duration_seconds,
+            day_index=(run.progress or {}).get("day_index"),
+            last_day=result.get("last_day"),
+            metrics=result.get("metrics"),
+        )
+
+    @property
+    def total_days(self) -> int:
+        return _total_days(self.start, self.until, self.step)
+
+
+@lru_cache(maxsize=1024)
+def _total_days(start: str, until: str, step: str) -> int:
+    # Sweeps repeat a handful of ranges across thousands of runs.
+    return SimClock(date.fromisoformat(start), date.fromisoformat(until), step=step).total_steps
+
+
+def summarise_batch(batch: SimulationBatch, rows: Iterable[BatchRunRow]) -> SimulationBatchStatus:
+    counts: Dict[str, int] = {}
+    days_completed = days_total = 0
+    for row in rows:
+        counts[row.status] = counts.get(row.status, 0) + 1
+        total = row.total_days
+        days_total += total
+        # Cache hits finish without ever publishing progress.
+        days_completed += total if row.status == "completed" else min(row.day_index or 0, total)
+    return SimulationBatchStatus(
+        batch_id=batch.batch_id,
+        submitted_at=batch.submitted_at,
+        total=batch.size,
+        counts=counts,
+        finished=sum(counts.get(status, 0) for status in _TERMINAL) == batch.size,
+        days_completed=days_completed,
+        days_total=days_total,
+        fraction_complete=round(days_completed / days_total, 4) if days_total else 1.0,
+        metadata=batch.metadata,
+    )
+
+
+def collate_results(batch_id: str, rows: Iterable[BatchRunRow]) -> SimulationBatchResults:
+    """One list per column, in run submission order; runs lacking a metric get ``None``."""
+    rows = list(rows)
+    columns: Dict[str, List[Any]] = {name: [getattr(row, name) for row in rows] for name in PARAMETER_COLUMNS}
+    metric_names = sorted({name for row in rows for name in (row.metrics or {})})
+    for name in metric_names:
+        columns[name] = [(row.metrics or {}).get(name) for row in rows]
+    return SimulationBatchResults(batch_id=batch_id, count=len(rows), columns=columns)
+
+
+__all__ = ["BatchRunRow", "PARAMETER_COLUMNS", "SimulationBatch", "collate_results", "summarise_batch"]
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import SimulationConfig
+from .schema import SimulationLaunchRequest
+
+
+logger = logging.getLogger(__name__)
+
+_REPO_ROOT = Path(__file__).resolve().parents[3]
+# Inputs a run's output depends on besides its parameters: world data, simulation code, and the
+# service module that shapes the cached result (its keys and terminal metrics).
+_FINGERPRINT_GLOBS = ("sim/data/*", "sim/**/*.py", "events/**/*.py", "server/src/simulations/service.py")
+# Launch fields that do not change the artifacts a run writes.
+_UNKEYED_FIELDS = {"metadata", "fast"}
+ENTRY_FILENAME = "entry.json"
+
+
+def _fingerprint_paths() -> List[Path]:
+    return sorted({path for pattern in _FINGERPRINT_GLOBS for path in _REPO_ROOT.glob(pattern) if path.is_file()})
+
+
+@lru_cache(maxsize=1)
+def world_fingerprint() -> str:
+    """Digest of the world data files and simulation sources, computed once per process."""
+    digest = hashlib.sha256()
+    for path in _fingerprint_paths():
+        digest.update(path.relative_to(_REPO_ROOT).as_posix().encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _key(fields: Dict[str, Any]) -> str:
+    canonical = json.dumps({"params": fields, "world": world_fingerprint()}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def run_cache_key(payload: SimulationLaunchRequest) -> str:
+    return _key(payload.model_dump(mode="json", exclude=_UNKEYED_FIELDS))
+
+
+def run_prefix_key(payload: SimulationLaunchRequest) -> str:
+    """Key shared by every run that differs only in ``until``; a shorter one is a prefix of a longer one."""
+    return _key(payload.model_dump(mode="json", exclude=_UNKEYED_FIELDS | {"until"}))
+
+
+@dataclass
+class CachedRun:
+    key: str
+    prefix_key: str
+    path: Path
+    until: date
+    result: Dict[str, Any]
+    size_bytes: int
+    created_at: float
+
+    @property
+    def checkpoint(self) -> Path:
+        return Path(self.result["checkpoint"])
+
+
+class RunCache:
+    """Content-addressed store of completed run artifacts under ``root/<key>/``.
+
+    Entries are keyed by the launch parameters plus ``world_fingerprint()``, so any change to data
+    files, simulation code or result shaping invalidates them. Eviction keeps at most ``max_entries`` entries and
+    ``max_bytes`` of artifacts, least recently used first, and drops entries older than ``max_age_seconds``.
+    """
+
+    def __init__(self, root: Path, *, max_entries: int = 64, max_age_seconds: float = 30 * 86400, max_bytes: int = 2 << 30) -> None:
+        self.root = Path(root)
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: SimulationConfig) -> "RunCache":
+        return cls(
+            config.run_cache_root,
+            max_entries=config.run_cache_max_entries,
+            max_age_seconds=config.run_cache_max_age_days * 86400,
+            max_bytes=config.run_cache_max_mb << 20,
+        )
+
+    def lookup(self, payload: SimulationLaunchRequest) -> Optional[CachedRun]:
+        entry = self._load(self.root / run_cache_key(payload))
+        if entry is not None:
+            os.utime(entry.path / ENTRY_FILENAME)  # mtime doubles as the LRU timestamp
+        return entry
+
+    def lookup_prefix(self, payload: SimulationLaunchRequest) -> Optional[CachedRun]:
+        """Longest cached run that ``payload`` extends (same parameters, earlier ``until``)."""
+        prefix = run_prefix_key(payload)
+        best: Optional[CachedRun] = None
+        for entry in self._entries():
+            if entry.prefix_key != prefix or entry.until >= payload.until:
+                continue
+            if entry.checkpoint.exists() and (best is None or entry.until > best.until):
+                best = entry
+        return best
+
+    def restore_into(self, entry: CachedRun, workdir: Path) -> Path:
+        """Copy ``entry``'s artifacts into ``workdir`` and return the checkpoint to resume from.
+
+        A real copy, not links: the resumed run appends to the CSVs and must not touch the cache.
+        """
+        shutil.copytree(entry.path, workdir, dirs_exist_ok=True, ignore=shutil.ignore_patterns(ENTRY_FILENAME))
+        return Path(workdir) / ".sim_saves" / entry.checkpoint.name
+
+    def link_into(self, entry: CachedRun, workdir: Path) -> Dict[str, Any]:
+        """Give a cache hit its own copy of ``entry`` in ``workdir`` and return the result pointing there.
+
+        Hard links, like ``store``: neither side changes again, and the run's artifacts outlive eviction.
+        """
+        shutil.copytree(
+            entry.path, workdir, copy_function=_link_or_copy, dirs_exist_ok=True, ignore=shutil.ignore_patterns(ENTRY_FILENAME)
+        )
+        return _result_in(entry.result, Path(workdir))
+
+    def seed(self, payload: SimulationLaunchRequest, workdir: Path) -> Optional[Path]:
+        """Restore the longest cached prefix of ``payload`` into ``workdir``; returns its checkpoint, if any."""
+        prefix = self.lookup_prefix(payload)
+        if prefix is None:
+            return None
+        logger.info("simulation.cache.prefix", extra={"key": prefix.key, "resume_after": prefix.until.isoformat()})
+        return self.restore_into(prefix, workdir)
+
+    def store(self, payload: SimulationLaunchRequest, workdir: Path, result: Dict[str, Any]) -> Optional[CachedRun]:
+        """Add a completed run's artifacts; returns ``None`` if eviction immediately dropped it (too large)."""
+        key = run_cache_key(payload)
+        target = self.root / key
+        staging = self.root / f".staging-{uuid.uuid4().hex}"
+        # Completed runs never change again, so hard links make storing nearly free where supported.
+        shutil.copytree(workdir, staging, copy_function=_link_or_copy)
+        size = sum(path.stat().st_size for path in staging.rglob("*") if path.is_file())
+        stored_result = _result_in(result, target)
+        entry = {
+            "key": key,
+            "prefix_key": run_prefix_key(payload),
+            "until": payload.until.isoformat(),
+            "size_bytes": size,
+            "created_at": time.time(),
+            "result": stored_result,
+        }
+        (staging / ENTRY_FILENAME).write_text(json.dumps(entry), encoding="utf-8")
+        try:
+            os.rename(staging, target)
+        except OSError:
+            # An identical run finished first; its artifacts are equivalent.
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+        return self._load(target)
+
+    def evict(self) -> int:
+        with self._lock:
+            now = time.time()
+            entries = sorted(self._entries(), key=lambda entry: (entry.path / ENTRY_FILENAME).stat().st_mtime, reverse=True)
+            keep: List[CachedRun] = []
+            total = 0
+            removed = 0
+            for entry in entries:
+                expired = now - entry.created_at > self.max_age_seconds
+                if expired or len(keep) >= self.max_entries or total + entry.size_bytes > self.max_bytes:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                    removed += 1
+                    continue
+                keep.append(entry)
+                total += entry.size_bytes
+            if removed:
+                logger.info("simulation.cache.evicted", extra={"removed": removed, "kept": len(keep), "bytes": total})
+            return removed
+
+    def _entries(self) -> List[CachedRun]:
+        if not self.root.exists():
+            return []
+        return [entry for entry in (self._load(path) for path in self.root.iterdir() if not path.name.startswith(".")) if entry]
+
+    def _load(self, path: Path) -> Optional[CachedRun]:
+        try:
+            raw = json.loads((path / ENTRY_FILENAME).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return CachedRun(
+            key=raw["key"],
+            prefix_key=raw["prefix_key"],
+            path=path,
+            until=date.fromisoformat(raw["until"]),
+            result=raw["result"],
+            size_bytes=int(raw["size_bytes"]),
+            created_at=float(raw["created_at"]),
+        )
+
+
+def _result_in(result: Dict[str, Any], root: Path) -> Dict[str, Any]:
+    """``result`` with its artifact paths moved under ``root``, which holds a copy of the run's directory."""
+    moved = dict(result, output_dir=str(root / "output"), saves_dir=str(root / ".sim_saves"))
+    for key, folder in (("checkpoint", ".sim_saves"), ("state_hashes", "output")):
+        if result.get(key):
+            moved[key] = str(root / folder / Path(result[key]).name)
+    return moved
+
+
+def _link_or_copy(source: str, destination: str) -> None:
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+__all__ = ["CachedRun", "RunCache", "run_cache_key", "run_prefix_key", "world_fingerprint"]
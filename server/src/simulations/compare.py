@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .schema import HolderComparison, SimulationComparison
+
+if TYPE_CHECKING:
+    from .manager import SimulationRun
+
+_FINANCE_FIELDS = ("price", "token_quantity", "value", "cash")
+# Sidecar entry holding the CSVs' (size, mtime) pairs the cached arrays were parsed from.
+_STAMP = "__stamp__"
+
+
+@dataclass
+class RunSeries:
+    """A run's finance and social CSVs as flat column arrays, one element per row.
+
+    Day, holder and pair columns are integer codes into the matching ``*_labels`` list; ISO dates
+    sort as strings, so label order is all alignment needs.
+    """
+
+    label: str
+    day_labels: List[str]
+    days: np.ndarray
+    holder_labels: List[str]
+    holders: np.ndarray
+    finance: Dict[str, np.ndarray]
+    social_day_labels: List[str]
+    social_days: np.ndarray
+    pair_labels: List[str]
+    pairs: np.ndarray
+    social_delta: np.ndarray
+
+
+def locate_finance_csv(path: Path, run_tag: Optional[str] = None) -> Path:
+    """Find a run's finance CSV given the CSV itself, an ``output/`` directory or a run working directory.
+
+    ``run_tag`` (``run_<seed>_<start>``) picks one run out of a shared output directory.
+    """
+    path = Path(path)
+    if path.is_file():
+        return path
+    output_dir = path / "output" if (path / "output").is_dir() else path
+    if run_tag is not None:
+        candidate = output_dir / f"finance_{run_tag}.csv"
+        if candidate.exists():
+            return candidate
+        raise FileNotFoundError(f"No {candidate.name} in {output_dir}")
+    matches = sorted(output_dir.glob("finance_run_*.csv"))
+    if len(matches) != 1:
+        found = ", ".join(match.name for match in matches) or "none"
+        raise FileNotFoundError(f"Expected one finance_run_*.csv in {output_dir} (found {found}); pass the CSV path")
+    return matches[0]
+
+
+def _read_columns(path: Path, numeric: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Columns of a renderer CSV: ``numeric`` ones as float64 (NaN for empty cells), the rest as strings."""
+    with path.open(newline="", encoding="utf-8") as handle:
+        reader = csv.reader(handle)
+        names = next(reader, [])
+        columns = list(zip(*reader)) or [()] * len(names)
+    return {
+        name: _floats(values) if name in numeric else np.asarray(values, dtype=str)
+        for name, values in zip(names, columns)
+    }
+
+
+def _codes(values: np.ndarray) -> Tuple[List[str], np.ndarray]:
+    """Label list and per-row integer codes; ``values`` already in order (dates) take a linear path."""
+    if values.size and (values[1:] >= values[:-1]).all():
+        changes = np.flatnonzero(values[1:] != values[:-1]) + 1
+        labels = values[np.concatenate(([0], changes))]
+        codes = np.zeros(values.size, dtype=np.int64)
+        codes[changes] = 1
+        codes = np.cumsum(codes)
+    else:
+        labels, codes = np.unique(values, return_inverse=True)
+    return [label.decode("utf-8") if isinstance(label, bytes) else str(label) for label in labels], codes.ravel()
+
+
+def _floats(values: Sequence[str]) -> np.ndarray:
+    # The renderer writes an empty cell for a missing figure.
+    return np.fromiter((float(value) if value else np.nan for value in values), dtype=np.float64, count=len(values))
+
+
+def load_run_series(path: Path, *, label: Optional[str] = None, run_tag: Optional[str] = None) -> RunSeries:
+    """Load a run's series, memoised in a ``<finance csv>.npz`` sidecar until either CSV changes."""
+    finance_path = locate_finance_csv(path, run_tag)
+    social_path = finance_path.with_name("social_" + finance_path.name[len("finance_"):])
+    stamp = np.asarray(
+        [value for csv_path in (finance_path, social_path) for value in _file_stamp(csv_path)], dtype=np.int64
+    )
+    sidecar = finance_path.with_name(finance_path.name + ".npz")
+    arrays: Optional[Dict[str, np.ndarray]] = None
+    try:
+        with np.load(sidecar, allow_pickle=False) as cached:
+            if np.array_equal(cached[_STAMP], stamp):
+                arrays = {name: cached[name] for name in cached.files}
+    except (OSError, ValueError, KeyError):
+        pass
+    if arrays is None:
+        arrays = _parse_series(finance_path, social_path)
+        arrays[_STAMP] = stamp
+        try:
+            with sidecar.open("wb") as handle:
+                np.savez(handle, **arrays)
+        except OSError:  # pragma: no cover - read-only artifacts are still comparable, just not memoised
+            pass
+    return RunSeries(
+        label=label or str(path),
+        day_labels=arrays["day_labels"].tolist(),
+        days=arrays["days"],
+        holder_labels=arrays["holder_labels"].tolist(),
+        holders=arrays["holders"],
+        finance={field: arrays[field] for field in _FINANCE_FIELDS},
+        social_day_labels=arrays["social_day_labels"].tolist(),
+        social_days=arrays["social_days"],
+        pair_labels=arrays["pair_labels"].tolist(),
+        pairs=arrays["pairs"],
+        social_delta=arrays["delta"],
+    )
+
+
+def _file_stamp(path: Path) -> Tuple[int, int]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return (-1, -1)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _parse_series(finance_path: Path, social_path: Path) -> Dict[str, np.ndarray]:
+    finance = _read_columns(finance_path, _FINANCE_FIELDS)
+    social = _read_columns(social_path, ("delta",)) if social_path.exists() else {}
+    empty = np.zeros(0)
+    arrays = {field: finance.get(field, empty) for field in _FINANCE_FIELDS}
+    arrays["delta"] = social.get("delta", empty)
+    for prefix, column, source in (
+        ("day", "date", finance),
+        ("holder", "holder", finance),
+        ("social_day", "date", social),
+        ("pair", "pair", social),
+    ):
+        labels, codes = _codes(source.get(column, empty))
+        arrays[f"{prefix}_labels"] = np.asarray(labels, dtype=str)
+        arrays[f"{prefix}s"] = codes
+    return arrays
+
+
+def _axis(
+    labels_a: List[str], codes_a: np.ndarray, labels_b: List[str], codes_b: np.ndarray
+) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Sorted union of two label sets, and each run's codes remapped onto it."""
+    union = sorted(set(labels_a) | set(labels_b))
+    position = {label: index for index, label in enumerate(union)}
+    remap_a = np.asarray([position[label] for label in labels_a], dtype=np.int64)
+    remap_b = np.asarray([position[label] for label in labels_b], dtype=np.int64)
+    return union, remap_a[codes_a], remap_b[codes_b]
+
+
+def _scatter(shape: Tuple[int, int], cell: Tuple[np.ndarray, np.ndarray], values: np.ndarray) -> np.ndarray:
+    matrix = np.full(shape, np.nan)
+    matrix[cell] = values  # a repeated (day, holder) row keeps its last value, as the CSV reader would
+    return matrix
+
+
+def _social_totals(
+    shape: Tuple[int, int], cell: Tuple[np.ndarray, np.ndarray], deltas: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Interaction counts and summed deltas per (day, pair); a day may log a pair several times."""
+    flat = np.ravel_multi_index(cell, shape) if cell[0].size else np.zeros(0, dtype=np.int64)
+    size = shape[0] * shape[1]
+    counts = np.bincount(flat, minlength=size).reshape(shape)
+    sums = np.bincount(flat, weights=np.nan_to_num(deltas), minlength=size).reshape(shape)
+    return counts, sums
+
+
+def _differs(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return ~((a == b) | (np.isnan(a) & np.isnan(b)))
+
+
+def _first_day(days: List[str], mask: np.ndarray) -> Optional[str]:
+    hits = np.flatnonzero(mask)
+    return days[hits[0]] if hits.size else None
+
+
+def _last_valid(matrix: np.ndarray) -> np.ndarray:
+    """Each column's last non-NaN value (NaN if the column is empty)."""
+    if not matrix.size:
+        return np.full(matrix.shape[1], np.nan)
+    valid = ~np.isnan(matrix)
+    rows = matrix.shape[0] - 1 - np.argmax(valid[::-1], axis=0)
+    last = matrix[rows, np.arange(matrix.shape[1])]
+    return np.where(valid.any(axis=0), last, np.nan)
+
+
+def _number(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+def compare_series(a: RunSeries, b: RunSeries) -> SimulationComparison:
+    """Align both runs on (day, holder) and (day, pair) grids and summarise where and how they diverge.
+
+    Every step is a whole-array NumPy operation, so cost grows with the number of CSV rows
+    rather than with days times holders in Python.
+    """
+    days, days_a, days_b = _axis(a.day_labels, a.days, b.day_labels, b.days)
+    holders, holders_a, holders_b = _axis(a.holder_labels, a.holders, b.holder_labels, b.holders)
+    shape = (len(days), len(holders))
+    diverged = np.zeros(shape, dtype=bool)
+    matrices: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    for field in _FINANCE_FIELDS:
+        left = _scatter(shape, (days_a, holders_a), a.finance[field])
+        right = _scatter(shape, (days_b, holders_b), b.finance[field])
+        matrices[field] = (left, right)
+        diverged |= _differs(left, right)
+
+    social_days, social_a, social_b = _axis(a.social_day_labels, a.social_days, b.social_day_labels, b.social_days)
+    pairs, pairs_a, pairs_b = _axis(a.pair_labels, a.pairs, b.pair_labels, b.pairs)
+    social_shape = (len(social_days), len(pairs))
+    counts_a, deltas_a = _social_totals(social_shape, (social_a, pairs_a), a.social_delta)
+    counts_b, deltas_b = _social_totals(social_shape, (social_b, pairs_b), b.social_delta)
+    social_diverged = ((counts_a != counts_b) | (deltas_a != deltas_b)).any(axis=1)
+
+    value_a, value_b = matrices["value"]
+    cash_a, cash_b = matrices["cash"]
+    value_delta = value_b - value_a
+    cash_delta = cash_b - cash_a
+    abs_value = np.abs(np.nan_to_num(value_delta))
+    abs_cash = np.abs(np.nan_to_num(cash_delta))
+    final_value = _last_valid(value_b) - _last_valid(value_a)
+    final_cash = _last_valid(cash_b) - _last_valid(cash_a)
+    compared = (~np.isnan(value_delta)).sum(axis=0)
+    mean_value = np.where(compared > 0, np.nansum(value_delta, axis=0) / np.maximum(compared, 1), np.nan)
+    max_value = abs_value.max(axis=0, initial=0.0)
+    max_cash = abs_cash.max(axis=0, initial=0.0)
+    holder_diverged = diverged.any(axis=0)
+    holder_first = diverged.argmax(axis=0) if diverged.size else np.zeros(len(holders), dtype=np.int64)
+    divergent_rows = diverged.any(axis=1)
+
+    per_holder = [
+        HolderComparison(
+            holder=holder,
+            first_divergent_day=days[holder_first[column]] if holder_diverged[column] else None,
+            final_value_delta=_number(final_value[column]),
+            final_cash_delta=_number(final_cash[column]),
+            max_abs_value_delta=round(float(max_value[column]), 2),
+            max_abs_cash_delta=round(float(max_cash[column]), 2),
+            mean_value_delta=_number(mean_value[column]),
+        )
+        for column, holder in enumerate(holders)
+    ]
+    finance_first = _first_day(days, divergent_rows)
+    social_first = _first_day(social_days, social_diverged)
+    candidates = [day for day in (finance_first, social_first) if day is not None]
+    return SimulationComparison(
+        run_a=a.label,
+        run_b=b.label,
+        identical=not candidates,
+        first_divergent_day=min(candidates) if candidates else None,
+        finance_first_divergent_day=finance_first,
+        social_first_divergent_day=social_first,
+        days=len(days),
+        holders=len(holders),
+        divergent_days=int(divergent_rows.sum()),
+        social_divergent_days=int(social_diverged.sum()),
+        final_total_value_delta=round(float(np.nansum(final_value)), 2),
+        final_total_cash_delta=round(float(np.nansum(final_cash)), 2),
+        max_abs_value_delta=round(float(abs_value.max(initial=0.0)), 2),
+        max_abs_cash_delta=round(float(abs_cash.max(initial=0.0)), 2),
+        per_holder=per_holder,
+    )
+
+
+def run_output_location(run: "SimulationRun") -> Tuple[Path, str]:
+    """Output directory and renderer run tag of a managed run; raises ``ValueError`` before it has output."""
+    output_dir = (run.result or {}).get("output_dir") or (run.workdir / "output" if run.workdir else None)
+    if output_dir is None or not Path(output_dir).is_dir():
+        raise ValueError(f"Simulation run {run.run_id} has no output yet")
+    return Path(output_dir), f"run_{run.payload.seed}_{run.payload.start.isoformat()}"
+
+
+def compare_runs(
+    path_a: Path,
+    path_b: Path,
+    *,
+    labels: Tuple[Optional[str], Optional[str]] = (None, None),
+    run_tags: Tuple[Optional[str], Optional[str]] = (None, None),
+) -> SimulationComparison:
+    return compare_series(
+        load_run_series(path_a, label=labels[0], run_tag=run_tags[0]),
+        load_run_series(path_b, label=labels[1], run_tag=run_tags[1]),
+    )
+
+
+__all__ = [
+    "RunSeries",
+    "compare_runs",
+    "compare_series",
+    "load_run_series",
+    "locate_finance_csv",
+    "run_output_location",
+]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+
+WORKER_MODES = ("thread", "process", "queue")
+
+
+@dataclass
+class SimulationConfig:
+    worker_mode: str = "thread"
+    max_workers: int = 1
+    runs_root: Path = Path(".sim_runs")
+    start_method: str = "spawn"
+    progress_interval: float = 0.5
+    run_cache_enabled: bool = False
+    run_cache_root: Path = Path(".sim_cache")
+    run_cache_max_entries: int = 64
+    run_cache_max_age_days: float = 30.0
+    run_cache_max_mb: int = 2048
+    queue_path: Path = Path(".sim_queue.db")
+    lease_seconds: float = 30.0
+    max_attempts: int = 3
+    queue_poll_interval: float = 1.0
+
+    @property
+    def isolated(self) -> bool:
+        return self.worker_mode == "process"
+
+    @property
+    def queued(self) -> bool:
+        return self.worker_mode == "queue"
+
+    @property
+    def per_run_workdirs(self) -> bool:
+        # Cached artifacts must belong to exactly one run, so caching also implies per-run directories.
+        return self.isolated or self.queued or self.run_cache_enabled
+
+
+def load_simulation_config(env: Dict[str, str] | None = None) -> SimulationConfig:
+    env = env if env is not None else os.environ
+    worker_mode = env.get("SIM_WORKER_MODE", "thread").strip().lower()
+    if worker_mode not in WORKER_MODES:
+        raise ValueError(f"SIM_WORKER_MODE must be one of {', '.join(WORKER_MODES)}, got {worker_mode!r}")
+    return SimulationConfig(
+        worker_mode=worker_mode,
+        max_workers=max(1, int(env.get("SIM_WORKERS", "1"))),
+        runs_root=Path(env.get("SIM_RUNS_ROOT", ".sim_runs")),
+        start_method=env.get("SIM_START_METHOD", "spawn").strip().lower(),
+        progress_interval=float(env.get("SIM_PROGRESS_INTERVAL", "0.5")),
+        run_cache_enabled=env.get("SIM_RUN_CACHE", "false").strip().lower() in {"1", "true", "yes", "on"},
+        run_cache_root=Path(env.get("SIM_RUN_CACHE_ROOT", ".sim_cache")),
+        run_cache_max_entries=int(env.get("SIM_RUN_CACHE_MAX_ENTRIES", "64")),
+        run_cache_max_age_days=float(env.get("SIM_RUN_CACHE_MAX_AGE_DAYS", "30")),
+        run_cache_max_mb=int(env.get("SIM_RUN_CACHE_MAX_MB", "2048")),
+        queue_path=Path(env.get("SIM_QUEUE_DB", ".sim_queue.db")),
+        lease_seconds=float(env.get("SIM_LEASE_SECONDS", "30")),
+        max_attempts=int(env.get("SIM_MAX_ATTEMPTS", "3")),
+        queue_poll_interval=float(env.get("SIM_QUEUE_POLL_INTERVAL", "1")),
+    )
+
+
+__all__ = ["SimulationConfig", "WORKER_MODES", "load_simulation_config"]
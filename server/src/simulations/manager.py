@@ -1,19 +1,41 @@
 from __future__ import annotations
 
 import logging
+import shutil
 import threading
 import uuid
 from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Dict, Optional
+from datetime import date, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-from .schema import SimulationLaunchRequest, SimulationRunStatus
+from sim.engines.scheduler import SimulationCancelled
+
+from .batch import BatchRunRow, SimulationBatch, collate_results, summarise_batch
+from .cache import CachedRun, RunCache
+from .compare import compare_runs, run_output_location
+from .config import SimulationConfig, load_simulation_config
+from .schema import (
+    SimulationBatchRequest,
+    SimulationBatchResults,
+    SimulationBatchStatus,
+    SimulationComparison,
+    SimulationLaunchRequest,
+    SimulationProgress,
+    SimulationRunStatus,
+)
 from .service import run_simulation
+from .worker import cancel_event_factory, run_in_process
+
+if TYPE_CHECKING:
+    from .queue import RunQueue
 
 
 logger = logging.getLogger(__name__)
 
+TERMINAL_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
 
 @dataclass
 class SimulationRun:
@@ -27,7 +49,17 @@ class SimulationRun:
     duration_seconds: Optional[float] = None
     message: Optional[str] = None
     result: Optional[dict] = None
+    workdir: Optional[Path] = None
+    pid: Optional[int] = None
+    progress: Optional[Dict[str, Any]] = None
+    checkpoint: Optional[str] = None
+    cancel_requested: bool = False
+    cache: Optional[str] = None
+    batch_id: Optional[str] = None
     _future: Optional[Future] = field(default=None, repr=False, compare=False)
+    _cancel_event: Any = field(default=None, repr=False, compare=False)
+    _resume_from: Optional[Path] = field(default=None, repr=False, compare=False)
+    _lease_token: Optional[str] = field(default=None, repr=False, compare=False)
 
     def to_status(self) -> SimulationRunStatus:
         return SimulationRunStatus(
@@ -42,40 +74,226 @@ class SimulationRun:
             metadata=self.payload.metadata,
             parameters=self.payload,
             result=self.result,
+            workdir=str(self.workdir) if self.workdir else None,
+            progress=SimulationProgress(**self.progress) if self.progress else None,
+            cancel_requested=self.cancel_requested,
+            checkpoint=self.checkpoint,
+            cache=self.cache,  # type: ignore[arg-type]
+            batch_id=self.batch_id,
         )
 
 
 class SimulationRunManager:
-    """Coordinates background simulation execution and exposes status lookups."""
+    """Coordinates background simulation execution and exposes status lookups.
+
+    In ``thread`` mode runs execute in-process on the executor. In ``process`` mode
+    (``SIM_WORKER_MODE=process``) each executor thread only dispatches: the run itself executes in
+    its own worker process rooted at ``<runs_root>/<run_id>`` and reports back over a pipe, so
+    ``max_workers`` runs proceed in parallel without holding the API's GIL or sharing artifacts.
+
+    Cancellation is cooperative: the scheduler checks the run's cancel event at each day boundary,
+    writes a checkpoint and stops; ``resume`` re-queues the run from that checkpoint.
+
+    In ``queue`` mode runs are durable rows in ``SIM_QUEUE_DB`` and execute in separate
+    ``cli.py worker`` processes; this manager only enqueues, reads status and flags cancellation.
 
-    def __init__(self, *, max_workers: int = 1) -> None:
-        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+    With ``SIM_RUN_CACHE`` enabled, a launch identical to a cached run completes immediately with the
+    cached artifacts, and a launch extending a cached run's range resumes from its final checkpoint.
+
+    ``start_batch`` expands a parameter sweep into ordinary runs sharing a ``batch_id``; each gets
+    its own working directory whatever the mode, since they execute side by side.
+    """
+
+    def __init__(self, *, max_workers: Optional[int] = None, config: Optional[SimulationConfig] = None) -> None:
+        self.config = config or load_simulation_config()
+        workers = max_workers or self.config.max_workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="simulation")
+        # Process-mode workers can only observe events created in their own multiprocessing context.
+        self._new_cancel_event = (
+            cancel_event_factory(self.config.start_method) if self.config.isolated else threading.Event
+        )
+        self.cache: Optional[RunCache] = RunCache.from_config(self.config) if self.config.run_cache_enabled else None
+        self.queue: Optional["RunQueue"] = None
+        if self.config.queued:
+            from .queue import RunQueue  # queue.py builds on SimulationRun
+
+            self.queue = RunQueue(
+                self.config.queue_path, lease_seconds=self.config.lease_seconds, max_attempts=self.config.max_attempts
+            )
         self._runs: Dict[str, SimulationRun] = {}
+        self._batches: Dict[str, SimulationBatch] = {}
         self._lock = threading.Lock()
 
     def start(self, payload: SimulationLaunchRequest) -> SimulationRun:
-        run_id = uuid.uuid4().hex
-        run = SimulationRun(run_id=run_id, scenario=payload.scenario, payload=payload)
-        logger.info("simulation.run.queued", extra={"run_id": run_id, "scenario": payload.scenario})
+        run = self._prepare(payload)
+        if self.queue is not None:
+            self.queue.add(run)
+            return run
         with self._lock:
-            self._runs[run_id] = run
+            self._runs[run.run_id] = run
+        if run.status == "queued":
+            logger.info("simulation.run.queued", extra={"run_id": run.run_id, "scenario": payload.scenario})
+            self._submit(run)
+        return run
 
-        future = self._executor.submit(self._execute_run, run_id, payload)
-        run._future = future
-        future.add_done_callback(lambda _: self._finalise_run(run_id))
+    def start_batch(self, request: SimulationBatchRequest) -> SimulationBatch:
+        """Queue every run of a sweep; they share the worker pool with individual launches."""
+        batch = SimulationBatch(metadata=request.metadata)
+        runs = [self._prepare(payload, batch_id=batch.batch_id) for payload in request.expand()]
+        batch.size = len(runs)
+        batch.run_ids = [run.run_id for run in runs]
+        logger.info("simulation.batch.queued", extra={"batch_id": batch.batch_id, "runs": batch.size})
+        if self.queue is not None:
+            self.queue.add_batch(batch, runs)
+            return batch
+        with self._lock:
+            self._batches[batch.batch_id] = batch
+            self._runs.update((run.run_id, run) for run in runs)
+        for run in runs:
+            if run.status == "queued":
+                self._submit(run)
+        return batch
+
+    def batch_status(self, batch_id: str) -> Optional[SimulationBatchStatus]:
+        found = self._batch_rows(batch_id)
+        return summarise_batch(*found) if found else None
+
+    def batch_results(self, batch_id: str) -> Optional[SimulationBatchResults]:
+        found = self._batch_rows(batch_id)
+        return collate_results(batch_id, found[1]) if found else None
+
+    def compare(self, run_a: str, run_b: str) -> Optional[SimulationComparison]:
+        """Diff two runs' finance and social series; ``None`` if either is unknown, ``ValueError`` if one has no output."""
+        runs = [self.get(run_id) for run_id in (run_a, run_b)]
+        if None in runs:
+            return None
+        (path_a, tag_a), (path_b, tag_b) = (run_output_location(run) for run in runs)
+        return compare_runs(path_a, path_b, labels=(run_a, run_b), run_tags=(tag_a, tag_b))
+
+    def cancel(self, run_id: str) -> Optional[SimulationRun]:
+        """Request cancellation; queued runs stop immediately, running ones at the next day boundary."""
+        if self.queue is not None:
+            return self.queue.request_cancel(run_id)
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                return None
+            if run.status in TERMINAL_STATUSES:
+                raise ValueError(f"Simulation run is already {run.status}")
+            run.cancel_requested = True
+            run._cancel_event.set()
+            future = run._future
+        # Outside the lock: cancelling a pending future runs its done callbacks synchronously.
+        if future is not None and future.cancel():
+            with self._lock:
+                run.status = "cancelled"
+                run.finished_at = datetime.utcnow()
+                run.message = "Cancelled before starting."
+        logger.info("simulation.run.cancel_requested", extra={"run_id": run_id, "status": run.status})
+        return run
+
+    def resume(self, run_id: str) -> Optional[SimulationRun]:
+        """Re-queue a cancelled run from its checkpoint, keeping its run id and working directory."""
+        if self.queue is not None:
+            return self.queue.requeue(run_id)
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                return None
+            if run.status != "cancelled" or not run.checkpoint:
+                raise ValueError("Only cancelled runs with a checkpoint can be resumed")
+            run._resume_from = Path(run.checkpoint)
+            run.status = "queued"
+            run.cancel_requested = False
+            run.message = None
+            run.finished_at = None
+            run.duration_seconds = None
+        logger.info("simulation.run.resumed", extra={"run_id": run_id, "checkpoint": run.checkpoint})
+        self._submit(run)
         return run
 
     def get(self, run_id: str) -> Optional[SimulationRun]:
+        if self.queue is not None:
+            return self.queue.get(run_id)
         with self._lock:
             return self._runs.get(run_id)
 
     def list(self) -> Dict[str, SimulationRunStatus]:
+        if self.queue is not None:
+            return {run.run_id: run.to_status() for run in self.queue.list()}
         with self._lock:
             return {run_id: run.to_status() for run_id, run in self._runs.items()}
 
+    def _batch_rows(self, batch_id: str) -> Optional[Tuple[SimulationBatch, List[BatchRunRow]]]:
+        if self.queue is not None:
+            batch = self.queue.get_batch(batch_id)
+            return (batch, self.queue.batch_rows(batch_id)) if batch else None
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None:
+                return None
+            return batch, [BatchRunRow.from_run(self._runs[run_id]) for run_id in batch.run_ids]
+
+    def close(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _prepare(self, payload: SimulationLaunchRequest, batch_id: Optional[str] = None) -> SimulationRun:
+        run = SimulationRun(run_id=uuid.uuid4().hex, scenario=payload.scenario, payload=payload, batch_id=batch_id)
+        if self.config.per_run_workdirs or batch_id is not None:
+            run.workdir = (self.config.runs_root / run.run_id).resolve()
+        cached = self.cache.lookup(payload) if self._cacheable(payload) else None
+        if cached is not None:
+            self._complete_from_cache(run, cached)
+        return run
+
+    def _cacheable(self, payload: SimulationLaunchRequest) -> bool:
+        # Interactive runs depend on the choices typed in, not just their parameters.
+        return self.cache is not None and not payload.interactive
+
+    def _complete_from_cache(self, run: SimulationRun, cached: CachedRun) -> None:
+        # The run gets its own linked copy, so evicting the entry later leaves its artifacts in place.
+        workdir = run.workdir or (self.config.runs_root / run.run_id).resolve()
+        try:
+            result = self.cache.link_into(cached, workdir)
+        except OSError:
+            # Evicted since the lookup: drop the partial copy (its files are links into the cache) and run.
+            logger.warning("simulation.cache.hit_lost", extra={"run_id": run.run_id, "key": cached.key})
+            shutil.rmtree(workdir, ignore_errors=True)
+            return
+        now = datetime.utcnow()
+        run.status = "completed"
+        run.cache = "hit"
+        run.started_at = run.finished_at = now
+        run.duration_seconds = 0.0
+        run.workdir = workdir
+        run.result = result
+        run.checkpoint = result.get("checkpoint")
+        run.message = "Served from the run cache."
+        logger.info("simulation.run.cache_hit", extra={"run_id": run.run_id, "key": cached.key})
+
+    def _seed_from_prefix(self, run: SimulationRun, payload: SimulationLaunchRequest) -> None:
+        if not self._cacheable(payload) or run.workdir is None:
+            return
+        run._resume_from = self.cache.seed(payload, run.workdir)
+        run.cache = "prefix" if run._resume_from else "miss"
+
+    def _store_in_cache(self, run: SimulationRun, payload: SimulationLaunchRequest, result: Dict[str, Any]) -> None:
+        if not self._cacheable(payload) or run.workdir is None:
+            return
+        try:
+            self.cache.store(payload, run.workdir, result)
+        except OSError:  # pragma: no cover - the run itself succeeded
+            logger.exception("simulation.cache.store_failed", extra={"run_id": run.run_id})
+
+    def _submit(self, run: SimulationRun) -> None:
+        run._cancel_event = self._new_cancel_event()
+        future = self._executor.submit(self._execute_run, run.run_id, run.payload)
+        run._future = future
+        future.add_done_callback(lambda _: self._finalise_run(run.run_id))
+
     def _execute_run(self, run_id: str, payload: SimulationLaunchRequest) -> None:
         run = self.get(run_id)
-        if not run:
+        if not run or run.status == "cancelled":
             return
 
         run.started_at = datetime.utcnow()
@@ -85,14 +303,33 @@ class SimulationRunManager:
 
         start_time = datetime.utcnow()
         try:
-            result = run_simulation(payload)
+            if run._resume_from is None:
+                self._seed_from_prefix(run, payload)
+            if self.config.isolated:
+                result = self._run_isolated(run, payload)
+            else:
+                result = run_simulation(
+                    payload,
+                    workdir=run.workdir,
+                    on_progress=lambda progress: setattr(run, "progress", progress.to_dict()),
+                    progress_interval=self.config.progress_interval,
+                    should_stop=run._cancel_event.is_set,
+                    resume_from=run._resume_from,
+                )
             run.result = result
+            run.checkpoint = result.get("checkpoint") if isinstance(result, dict) else None
+            self._store_in_cache(run, payload, result)
             run.status = "completed"
             run.message = result.get("message") if isinstance(result, dict) else None
             logger.info(
                 "simulation.run.completed",
                 extra={"run_id": run_id, "scenario": payload.scenario, "result": result},
             )
+        except SimulationCancelled as exc:
+            run.status = "cancelled"
+            run.checkpoint = str(exc.checkpoint) if exc.checkpoint else None
+            run.message = f"Cancelled after {exc.last_day.isoformat()}; resumable from checkpoint."
+            logger.info("simulation.run.cancelled", extra={"run_id": run_id, "last_day": exc.last_day.isoformat()})
         except Exception as exc:  # pragma: no cover - defensive logging
             run.status = "failed"
             run.message = str(exc)
@@ -106,6 +343,31 @@ class SimulationRunManager:
             with self._lock:
                 self._runs[run_id] = run
 
+    def _run_isolated(self, run: SimulationRun, payload: SimulationLaunchRequest) -> Dict[str, Any]:
+        def on_message(kind: str, body: Any) -> None:
+            if kind == "progress":
+                run.progress = body
+            elif kind == "started":
+                run.pid = body.get("pid")
+                logger.info("simulation.run.worker_started", extra={"run_id": run.run_id, "pid": run.pid})
+
+        assert run.workdir is not None
+        kind, body = run_in_process(
+            payload,
+            run.workdir,
+            on_message=on_message,
+            start_method=self.config.start_method,
+            name=f"simulation-{run.run_id[:8]}",
+            cancel_event=run._cancel_event,
+            progress_interval=self.config.progress_interval,
+            resume_from=run._resume_from,
+        )
+        if kind == "cancelled":
+            raise SimulationCancelled(date.fromisoformat(body["last_day"]), Path(body["checkpoint"]))
+        if kind != "completed":
+            raise RuntimeError(body)
+        return body
+
     def _finalise_run(self, run_id: str) -> None:
         run = self.get(run_id)
         if not run:
@@ -0,0 +1,473 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing, contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from sim.engines.scheduler import SimulationCancelled
+
+from .batch import BatchRunRow, SimulationBatch
+from .cache import RunCache
+from .config import SimulationConfig
+from .manager import SimulationRun
+from .schema import SimulationLaunchRequest
+from .service import run_simulation
+
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS simulation_runs (
+    run_id TEXT PRIMARY KEY,
+    scenario TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    submitted_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    duration_seconds REAL,
+    message TEXT,
+    result TEXT,
+    workdir TEXT,
+    pid INTEGER,
+    progress TEXT,
+    checkpoint TEXT,
+    resume_from TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    cache TEXT,
+    worker_id TEXT,
+    lease_expires_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    batch_id TEXT,
+    lease_token TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_simulation_runs_status ON simulation_runs (status, submitted_at);
+CREATE TABLE IF NOT EXISTS simulation_batches (
+    batch_id TEXT PRIMARY KEY,
+    submitted_at TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    metadata TEXT
+);
+"""
+# Columns added after the queue's first release, for databases created before them.
+_ADDED_COLUMNS = {"batch_id": "TEXT", "lease_token": "TEXT"}
+_ATTEMPT_PREFIX = "attempt-"
+_INSERT_COLUMNS = (
+    "run_id", "scenario", "status", "payload", "submitted_at", "started_at", "finished_at", "duration_seconds",
+    "message", "result", "workdir", "checkpoint", "cache", "batch_id",
+)
+_INSERT_RUN = (
+    f"INSERT INTO simulation_runs ({', '.join(_INSERT_COLUMNS)}) VALUES ({', '.join('?' * len(_INSERT_COLUMNS))})"
+)
+# Reads only what a batch summary needs and lets SQLite pick fields out of the JSON columns.
+_BATCH_ROWS = """
+SELECT run_id, status, scenario, json_extract(payload, '$.seed'), json_extract(payload, '$.step'),
+    json_extract(payload, '$.start'), json_extract(payload, '$.until'), duration_seconds,
+    json_extract(progress, '$.day_index'), json_extract(result, '$.last_day'), json_extract(result, '$.metrics')
+FROM simulation_runs WHERE batch_id = ? ORDER BY rowid
+"""
+
+_JSON_COLUMNS = ("result", "progress")
+_DATETIME_COLUMNS = ("submitted_at", "started_at", "finished_at")
+
+
+def _dumps(value: Any) -> Optional[str]:
+    return json.dumps(value) if value is not None else None
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _insert_values(run: SimulationRun) -> tuple:
+    return (
+        run.run_id,
+        run.scenario,
+        run.status,
+        run.payload.model_dump_json(),
+        _isoformat(run.submitted_at),
+        _isoformat(run.started_at),
+        _isoformat(run.finished_at),
+        run.duration_seconds,
+        run.message,
+        _dumps(run.result),
+        str(run.workdir) if run.workdir else None,
+        run.checkpoint,
+        run.cache,
+        run.batch_id,
+    )
+
+
+def run_from_row(row: sqlite3.Row) -> SimulationRun:
+    values = dict(row)
+    for column in _JSON_COLUMNS:
+        values[column] = json.loads(values[column]) if values[column] else None
+    for column in _DATETIME_COLUMNS:
+        values[column] = datetime.fromisoformat(values[column]) if values[column] else None
+    run = SimulationRun(
+        run_id=values["run_id"],
+        scenario=values["scenario"],
+        payload=SimulationLaunchRequest.model_validate_json(values["payload"]),
+        status=values["status"],
+        submitted_at=values["submitted_at"],
+        started_at=values["started_at"],
+        finished_at=values["finished_at"],
+        duration_seconds=values["duration_seconds"],
+        message=values["message"],
+        result=values["result"],
+        workdir=Path(values["workdir"]) if values["workdir"] else None,
+        pid=values["pid"],
+        progress=values["progress"],
+        checkpoint=values["checkpoint"],
+        cancel_requested=bool(values["cancel_requested"]),
+        cache=values["cache"],
+        batch_id=values["batch_id"],
+    )
+    run._resume_from = Path(values["resume_from"]) if values["resume_from"] else None
+    run._lease_token = values["lease_token"]
+    return run
+
+
+class RunQueue:
+    """Durable run records and job queue in a local SQLite file, shared by the API and ``cli.py worker``.
+
+    Workers claim the oldest queued run under a lease and must heartbeat before it expires; a run
+    whose lease lapses (crashed or killed worker) is claimed again, up to ``max_attempts`` times.
+    """
+
+    def __init__(self, path: Path, *, lease_seconds: float = 30.0, max_attempts: int = 3) -> None:
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.path, timeout=30, isolation_level=None)) as connection:
+            # WAL lets the API read run status while workers write progress.
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            # The API and workers may open a fresh file at once; the write lock makes check-then-alter safe.
+            connection.execute("BEGIN IMMEDIATE")
+            existing = {row[1] for row in connection.execute("PRAGMA table_info(simulation_runs)")}
+            for column, kind in _ADDED_COLUMNS.items():
+                if column not in existing:
+                    connection.execute(f"ALTER TABLE simulation_runs ADD COLUMN {column} {kind}")
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_simulation_runs_batch ON simulation_runs (batch_id)")
+            connection.execute("COMMIT")
+
+    @contextmanager
+    def _connect(self, *, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        # One short-lived connection per operation: cheap for SQLite and safe across threads/processes.
+        with closing(sqlite3.connect(self.path, timeout=30, isolation_level=None)) as connection:
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA busy_timeout=30000")
+            connection.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def add(self, run: SimulationRun) -> None:
+        with self._connect() as connection:
+            connection.execute(_INSERT_RUN, _insert_values(run))
+
+    def add_batch(self, batch: SimulationBatch, runs: List[SimulationRun]) -> None:
+        """Record a batch and all of its runs in one transaction, so workers never see half a sweep."""
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO simulation_batches (batch_id, submitted_at, size, metadata) VALUES (?, ?, ?, ?)",
+                (batch.batch_id, _isoformat(batch.submitted_at), batch.size, _dumps(batch.metadata)),
+            )
+            connection.executemany(_INSERT_RUN, (_insert_values(run) for run in runs))
+
+    def get_batch(self, batch_id: str) -> Optional[SimulationBatch]:
+        with self._connect() as connection:
+            row = connection.execute("SELECT * FROM simulation_batches WHERE batch_id = ?", (batch_id,)).fetchone()
+        if row is None:
+            return None
+        return SimulationBatch(
+            batch_id=row["batch_id"],
+            submitted_at=datetime.fromisoformat(row["submitted_at"]),
+            size=row["size"],
+            metadata=json.loads(row["metadata"]) if row["metadata"] else None,
+        )
+
+    def batch_rows(self, batch_id: str) -> List[BatchRunRow]:
+        with self._connect() as connection:
+            rows = connection.execute(_BATCH_ROWS, (batch_id,)).fetchall()
+        return [
+            BatchRunRow(*row[:10], metrics=json.loads(row[10]) if row[10] else None)  # type: ignore[call-arg]
+            for row in rows
+        ]
+
+    def get(self, run_id: str) -> Optional[SimulationRun]:
+        with self._connect() as connection:
+            row = connection.execute("SELECT * FROM simulation_runs WHERE run_id = ?", (run_id,)).fetchone()
+        return run_from_row(row) if row else None
+
+    def list(self, limit: int = 500) -> List[SimulationRun]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT * FROM simulation_runs ORDER BY submitted_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [run_from_row(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._connect() as connection:
+            rows = connection.execute("SELECT status, COUNT(*) FROM simulation_runs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def claim(self, worker_id: str) -> Optional[SimulationRun]:
+        """Lease the oldest runnable run to ``worker_id``; expired leases count as runnable.
+
+        Each claim gets a fresh lease token; heartbeats and ``finish`` must present it, so a worker
+        whose lease was taken over can no longer touch the run.
+        """
+        now = time.time()
+        with self._connect(immediate=True) as connection:
+            connection.execute(
+                """
+                UPDATE simulation_runs
+                SET status = 'failed', finished_at = ?, worker_id = NULL, lease_token = NULL,
+                    message = 'Worker lease expired ' || attempts || ' time(s); giving up.'
+                WHERE status = 'running' AND lease_expires_at < ? AND attempts >= ?
+                """,
+                (datetime.utcnow().isoformat(), now, self.max_attempts),
+            )
+            row = connection.execute(
+                """
+                SELECT run_id FROM simulation_runs
+                WHERE status = 'queued' OR (status = 'running' AND lease_expires_at < ?)
+                ORDER BY submitted_at LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                """
+                UPDATE simulation_runs
+                SET status = 'running', worker_id = ?, lease_token = ?, lease_expires_at = ?, attempts = attempts + 1,
+                    started_at = ?, finished_at = NULL, duration_seconds = NULL, message = NULL, pid = ?
+                WHERE run_id = ?
+                """,
+                (
+                    worker_id,
+                    uuid.uuid4().hex,
+                    now + self.lease_seconds,
+                    datetime.utcnow().isoformat(),
+                    os.getpid(),
+                    row["run_id"],
+                ),
+            )
+            claimed = connection.execute("SELECT * FROM simulation_runs WHERE run_id = ?", (row["run_id"],)).fetchone()
+        return run_from_row(claimed)
+
+    def heartbeat(self, run_id: str, lease_token: str, progress: Optional[Dict[str, Any]] = None) -> Optional[bool]:
+        """Extend the lease and publish progress; returns whether cancellation was requested, or ``None`` if the lease was lost."""
+        with self._connect() as connection:
+            updated = connection.execute(
+                """
+                UPDATE simulation_runs SET lease_expires_at = ?, progress = COALESCE(?, progress)
+                WHERE run_id = ? AND lease_token = ? AND status = 'running'
+                """,
+                (time.time() + self.lease_seconds, _dumps(progress), run_id, lease_token),
+            ).rowcount
+            if not updated:
+                return None
+            row = connection.execute("SELECT cancel_requested FROM simulation_runs WHERE run_id = ?", (run_id,)).fetchone()
+        return bool(row["cancel_requested"])
+
+    def finish(self, run: SimulationRun, lease_token: str) -> bool:
+        """Record a claimed run's outcome; ignored (returns False) if another worker has since taken it over."""
+        with self._connect() as connection:
+            return bool(
+                connection.execute(
+                    """
+                    UPDATE simulation_runs
+                    SET status = ?, finished_at = ?, duration_seconds = ?, message = ?, result = ?, progress = ?,
+                        checkpoint = ?, cache = ?, worker_id = NULL, lease_token = NULL, lease_expires_at = NULL
+                    WHERE run_id = ? AND lease_token = ?
+                    """,
+                    (
+                        run.status,
+                        _isoformat(run.finished_at),
+                        run.duration_seconds,
+                        run.message,
+                        _dumps(run.result),
+                        _dumps(run.progress),
+                        run.checkpoint,
+                        run.cache,
+                        run.run_id,
+                        lease_token,
+                    ),
+                ).rowcount
+            )
+
+    def request_cancel(self, run_id: str) -> Optional[SimulationRun]:
+        with self._connect(immediate=True) as connection:
+            row = connection.execute("SELECT status FROM simulation_runs WHERE run_id = ?", (run_id,)).fetchone()
+            if row is None:
+                return None
+            if row["status"] not in {"queued", "running"}:
+                raise ValueError(f"Simulation run is already {row['status']}")
+            if row["status"] == "queued":
+                connection.execute(
+                    """
+                    UPDATE simulation_runs SET status = 'cancelled', cancel_requested = 1, finished_at = ?,
+                        message = 'Cancelled before starting.'
+                    WHERE run_id = ?
+                    """,
+                    (datetime.utcnow().isoformat(), run_id),
+                )
+            else:
+                # The owning worker sees this on its next heartbeat and stops at a day boundary.
+                connection.execute("UPDATE simulation_runs SET cancel_requested = 1 WHERE run_id = ?", (run_id,))
+        return self.get(run_id)
+
+    def requeue(self, run_id: str) -> Optional[SimulationRun]:
+        """Queue a cancelled run again so a worker resumes it from its checkpoint."""
+        with self._connect(immediate=True) as connection:
+            row = connection.execute("SELECT status, checkpoint FROM simulation_runs WHERE run_id = ?", (run_id,)).fetchone()
+            if row is None:
+                return None
+            if row["status"] != "cancelled" or not row["checkpoint"]:
+                raise ValueError("Only cancelled runs with a checkpoint can be resumed")
+            connection.execute(
+                """
+                UPDATE simulation_runs
+                SET status = 'queued', resume_from = checkpoint, cancel_requested = 0, message = NULL,
+                    finished_at = NULL, duration_seconds = NULL, attempts = 0
+                WHERE run_id = ?
+                """,
+                (run_id,),
+            )
+        return self.get(run_id)
+
+
+def _restore_attempt(checkpoint: Path, attempt_dir: Path) -> Path:
+    """Copy the directory that wrote ``checkpoint`` into a fresh ``attempt_dir``; returns the copied checkpoint.
+
+    The copy holds exactly what the checkpointed attempt wrote up to its last day, so the resumed run
+    appends to clean CSVs and logs.
+    """
+    source = checkpoint.parent.parent
+    shutil.rmtree(attempt_dir, ignore_errors=True)
+    shutil.copytree(source, attempt_dir, ignore=shutil.ignore_patterns(f"{_ATTEMPT_PREFIX}*"))
+    return attempt_dir / checkpoint.relative_to(source)
+
+
+class QueueWorker:
+    """Claims runs from a ``RunQueue`` and executes them in this process (``cli.py worker``).
+
+    A heartbeat thread renews the lease about once a second, publishes the latest progress and
+    relays cancellation requests to the scheduler.
+    """
+
+    def __init__(self, queue: RunQueue, config: SimulationConfig, worker_id: Optional[str] = None) -> None:
+        self.queue = queue
+        self.config = config
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.cache: Optional[RunCache] = RunCache.from_config(config) if config.run_cache_enabled else None
+
+    def run_once(self) -> Optional[str]:
+        run = self.queue.claim(self.worker_id)
+        if run is None:
+            return None
+        self._execute(run)
+        return run.run_id
+
+    def drain(self) -> int:
+        processed = 0
+        while self.run_once() is not None:
+            processed += 1
+        return processed
+
+    def run_forever(self, stop: threading.Event, poll_interval: Optional[float] = None) -> None:
+        interval = self.config.queue_poll_interval if poll_interval is None else poll_interval
+        logger.info("simulation.worker.started", extra={"worker_id": self.worker_id, "queue": str(self.queue.path)})
+        while not stop.is_set():
+            if self.run_once() is None:
+                stop.wait(interval)
+
+    def _execute(self, run: SimulationRun) -> None:
+        payload = run.payload
+        assert run.workdir is not None and run._lease_token is not None
+        lease_token = run._lease_token
+        # Every attempt writes into its own directory, so a worker that lost its lease (and may still
+        # be running, or cancelling with a checkpoint) never appends to the files its successor uses.
+        attempt_dir = run.workdir / f"{_ATTEMPT_PREFIX}{lease_token}"
+        cancel = threading.Event()
+        lost = threading.Event()
+        latest: Dict[str, Any] = {}
+        done = threading.Event()
+
+        def heartbeat() -> None:
+            while not done.wait(min(self.queue.lease_seconds / 3, 1.0)):
+                cancelled = self.queue.heartbeat(run.run_id, lease_token, latest.get("progress"))
+                if cancelled is None:
+                    lost.set()
+                    cancel.set()
+                elif cancelled:
+                    cancel.set()
+
+        beat = threading.Thread(target=heartbeat, name=f"simulation-heartbeat-{run.run_id[:8]}", daemon=True)
+        beat.start()
+        logger.info("simulation.worker.claimed", extra={"run_id": run.run_id, "worker_id": self.worker_id})
+        start_time = datetime.utcnow()
+        try:
+            resume_from = run._resume_from
+            if resume_from is not None:
+                resume_from = _restore_attempt(resume_from, attempt_dir)
+            elif self.cache is not None and not payload.interactive:
+                resume_from = self.cache.seed(payload, attempt_dir)
+                run.cache = "prefix" if resume_from else "miss"
+            result = run_simulation(
+                payload,
+                workdir=attempt_dir,
+                on_progress=lambda progress: latest.__setitem__("progress", progress.to_dict()),
+                progress_interval=self.config.progress_interval,
+                should_stop=cancel.is_set,
+                resume_from=resume_from,
+            )
+            if self.cache is not None and not payload.interactive:
+                self.cache.store(payload, attempt_dir, result)
+            run.status = "completed"
+            run.result = result
+            run.checkpoint = result.get("checkpoint")
+            run.message = result.get("message")
+        except SimulationCancelled as exc:
+            run.status = "cancelled"
+            run.checkpoint = str(exc.checkpoint) if exc.checkpoint else None
+            run.message = f"Cancelled after {exc.last_day.isoformat()}; resumable from checkpoint."
+        except Exception as exc:
+            run.status = "failed"
+            run.message = str(exc)
+            logger.exception("simulation.worker.failed", extra={"run_id": run.run_id})
+        finally:
+            done.set()
+            beat.join()
+            run.progress = latest.get("progress", run.progress)
+            run.finished_at = datetime.utcnow()
+            run.duration_seconds = (run.finished_at - start_time).total_seconds()
+        if lost.is_set() or not self.queue.finish(run, lease_token):
+            logger.warning("simulation.worker.lease_lost", extra={"run_id": run.run_id, "worker_id": self.worker_id})
+            return
+        # Earlier attempts are superseded: resumed ones were copied into this attempt's directory.
+        for stale in run.workdir.glob(f"{_ATTEMPT_PREFIX}*"):
+            if stale != attempt_dir:
+                shutil.rmtree(stale, ignore_errors=True)
+        logger.info("simulation.worker.finished", extra={"run_id": run.run_id, "status": run.status})
+
+
+__all__ = ["QueueWorker", "RunQueue", "run_from_row"]
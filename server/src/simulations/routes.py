@@ -3,7 +3,14 @@ from __future__ import annotations
 from fastapi import APIRouter, HTTPException, status
 
 from .manager import SimulationRunManager
-from .schema import SimulationLaunchRequest, SimulationRunStatus
+from .schema import (
+    SimulationBatchRequest,
+    SimulationBatchResults,
+    SimulationBatchStatus,
+    SimulationComparison,
+    SimulationLaunchRequest,
+    SimulationRunStatus,
+)
 
 
 def build_simulation_router(manager: SimulationRunManager | None = None) -> APIRouter:
@@ -15,6 +22,40 @@ def build_simulation_router(manager: SimulationRunManager | None = None) -> APIR
         run = sim_manager.start(payload)
         return run.to_status()
 
+    @router.post("/batch", response_model=SimulationBatchStatus, status_code=status.HTTP_202_ACCEPTED)
+    def launch_batch(payload: SimulationBatchRequest) -> SimulationBatchStatus:
+        try:
+            batch = sim_manager.start_batch(payload)
+        except ValueError as exc:  # an explicit run override failed validation
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+        return sim_manager.batch_status(batch.batch_id)
+
+    @router.get("/batch/{batch_id}", response_model=SimulationBatchStatus)
+    def get_batch(batch_id: str) -> SimulationBatchStatus:
+        batch = sim_manager.batch_status(batch_id)
+        if not batch:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Simulation batch not found")
+        return batch
+
+    @router.get("/batch/{batch_id}/results", response_model=SimulationBatchResults)
+    def get_batch_results(batch_id: str) -> SimulationBatchResults:
+        results = sim_manager.batch_results(batch_id)
+        if not results:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Simulation batch not found")
+        return results
+
+    @router.get("/compare", response_model=SimulationComparison)
+    def compare_simulations(run_a: str, run_b: str) -> SimulationComparison:
+        try:
+            comparison = sim_manager.compare(run_a, run_b)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+        except FileNotFoundError as exc:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+        if not comparison:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Simulation run not found")
+        return comparison
+
     @router.get("/{run_id}", response_model=SimulationRunStatus)
     def get_simulation(run_id: str) -> SimulationRunStatus:
         run = sim_manager.get(run_id)
@@ -22,6 +63,26 @@ def build_simulation_router(manager: SimulationRunManager | None = None) -> APIR
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Simulation run not found")
         return run.to_status()
 
+    @router.post("/{run_id}/cancel", response_model=SimulationRunStatus, status_code=status.HTTP_202_ACCEPTED)
+    def cancel_simulation(run_id: str) -> SimulationRunStatus:
+        try:
+            run = sim_manager.cancel(run_id)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+        if not run:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Simulation run not found")
+        return run.to_status()
+
+    @router.post("/{run_id}/resume", response_model=SimulationRunStatus, status_code=status.HTTP_202_ACCEPTED)
+    def resume_simulation(run_id: str) -> SimulationRunStatus:
+        try:
+            run = sim_manager.resume(run_id)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+        if not run:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Simulation run not found")
+        return run.to_status()
+
     @router.get("/", response_model=list[SimulationRunStatus])
     def list_simulations() -> list[SimulationRunStatus]:
         return [run.to_status() for run in sim_manager.list().values()]
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import itertools
 from datetime import date, datetime
-from typing import Any, Dict, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
@@ -35,12 +36,24 @@ class SimulationLaunchRequest(BaseModel):
         return int(value)
 
 
+class SimulationProgress(BaseModel):
+    """Throttled progress published by the scheduler at day boundaries."""
+
+    day: date
+    day_index: int
+    total_days: int
+    elapsed_seconds: float
+    days_per_second: float
+    eta_seconds: Optional[float] = None
+    phase_ms: Dict[str, float] = Field(default_factory=dict, description="Mean milliseconds per day spent in each phase")
+
+
 class SimulationRunStatus(BaseModel):
     """Represents the lifecycle state of a simulation run."""
 
     run_id: str
     scenario: str
-    status: Literal["queued", "running", "completed", "failed"]
+    status: Literal["queued", "running", "completed", "failed", "cancelled"]
     submitted_at: datetime
     started_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
@@ -49,6 +62,135 @@ class SimulationRunStatus(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
     parameters: SimulationLaunchRequest
     result: Optional[Dict[str, Any]] = None
+    workdir: Optional[str] = None
+    progress: Optional[SimulationProgress] = None
+    cancel_requested: bool = False
+    checkpoint: Optional[str] = Field(default=None, description="Checkpoint a cancelled run resumes from")
+    cache: Optional[Literal["hit", "prefix", "miss"]] = Field(
+        default=None, description="Run cache outcome: served whole, resumed from a cached shorter range, or computed"
+    )
+    batch_id: Optional[str] = None
+
+
+BATCH_MAX_RUNS = 10_000
+
+
+class DateRange(BaseModel):
+    start: date
+    until: date
+
+
+class SimulationBatchRequest(BaseModel):
+    """A parameter sweep: the cartesian product of the grid axes over ``base``, plus explicit ``runs``."""
+
+    base: SimulationLaunchRequest = Field(default_factory=SimulationLaunchRequest)
+    seeds: Optional[List[int]] = None
+    steps: Optional[List[Literal["day", "week"]]] = None
+    ranges: Optional[List[DateRange]] = None
+    scenarios: Optional[List[str]] = None
+    runs: Optional[List[Dict[str, Any]]] = Field(default=None, description="Explicit parameter sets, each overriding base")
+    metadata: Optional[Dict[str, Any]] = None
+
+    @model_validator(mode="after")
+    def _validate_size(self) -> "SimulationBatchRequest":
+        size = self.grid_size + len(self.runs or [])
+        if size > BATCH_MAX_RUNS:
+            raise ValueError(f"batch expands to {size} runs; the limit is {BATCH_MAX_RUNS}")
+        return self
+
+    @property
+    def grid_size(self) -> int:
+        axes = (self.seeds, self.steps, self.ranges, self.scenarios)
+        if all(axis is None for axis in axes) and self.runs:
+            return 0
+        size = 1
+        for axis in axes:
+            size *= len(axis) if axis is not None else 1
+        return size
+
+    def expand(self) -> List[SimulationLaunchRequest]:
+        base = self.base.model_dump()
+        payloads: List[SimulationLaunchRequest] = []
+        if self.grid_size:
+            ranges = self.ranges or [DateRange(start=self.base.start, until=self.base.until)]
+            for seed, step, span, scenario in itertools.product(
+                self.seeds or [self.base.seed],
+                self.steps or [self.base.step],
+                ranges,
+                self.scenarios or [self.base.scenario],
+            ):
+                payloads.append(
+                    SimulationLaunchRequest.model_validate(
+                        dict(base, seed=seed, step=step, start=span.start, until=span.until, scenario=scenario)
+                    )
+                )
+        payloads.extend(SimulationLaunchRequest.model_validate(dict(base, **overrides)) for overrides in self.runs or [])
+        return payloads
+
+
+class SimulationBatchStatus(BaseModel):
+    """Aggregate progress of a batch; ``days_*`` count simulated timesteps across all of its runs."""
+
+    batch_id: str
+    submitted_at: datetime
+    total: int
+    counts: Dict[str, int]
+    finished: bool
+    days_completed: int
+    days_total: int
+    fraction_complete: float
+    metadata: Optional[Dict[str, Any]] = None
+
+
+class SimulationBatchResults(BaseModel):
+    """Per-run parameters and terminal metrics, one list per column (``None`` where a run has no value)."""
+
+    batch_id: str
+    count: int
+    columns: Dict[str, List[Any]]
+
+
+class HolderComparison(BaseModel):
+    """How one holder's finance series differs between two runs (deltas are run B minus run A)."""
+
+    holder: str
+    first_divergent_day: Optional[date] = None
+    final_value_delta: Optional[float] = None
+    final_cash_delta: Optional[float] = None
+    max_abs_value_delta: float = 0.0
+    max_abs_cash_delta: float = 0.0
+    mean_value_delta: Optional[float] = None
+
+
+class SimulationComparison(BaseModel):
+    """Summary of two runs' finance and social series aligned by day."""
+
+    run_a: str
+    run_b: str
+    identical: bool
+    first_divergent_day: Optional[date] = None
+    finance_first_divergent_day: Optional[date] = None
+    social_first_divergent_day: Optional[date] = None
+    days: int
+    holders: int
+    divergent_days: int
+    social_divergent_days: int
+    final_total_value_delta: float
+    final_total_cash_delta: float
+    max_abs_value_delta: float
+    max_abs_cash_delta: float
+    per_holder: List[HolderComparison]
 
 
-__all__ = ["SimulationLaunchRequest", "SimulationRunStatus"]
+__all__ = [
+    "BATCH_MAX_RUNS",
+    "DateRange",
+    "HolderComparison",
+    "SimulationBatchRequest",
+    "SimulationBatchResults",
+    "SimulationBatchStatus",
+    "SimulationComparison",
+    "SimulationLaunchRequest",
+    "SimulationProgress",
+    "SimulationRunStatus",
+]
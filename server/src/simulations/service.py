@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import logging
+from datetime import date
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
 
 from sim.engines.rng import RNG
-from sim.engines.scheduler import SimulationScheduler
+from sim.engines.checkpoint import load_checkpoint
+from sim.engines.scheduler import SchedulerProgress, SimulationScheduler
+from sim.engines.statehash import StateHasher
 from sim.output.render import DailyRenderer
 from sim.time import SimClock
 from sim.world.state import WorldState
@@ -33,8 +36,24 @@ def _resolve_memory_bridge() -> Any | None:
     return None
 
 
-def run_simulation(payload: SimulationLaunchRequest) -> Dict[str, Any]:
-    """Run the world simulation synchronously based on the supplied payload."""
+def run_simulation(
+    payload: SimulationLaunchRequest,
+    *,
+    workdir: Optional[Path] = None,
+    on_progress: Optional[Callable[[SchedulerProgress], None]] = None,
+    progress_interval: float = 0.5,
+    should_stop: Optional[Callable[[], bool]] = None,
+    resume_from: Optional[Path] = None,
+    expected_hashes: Optional[Dict[date, str]] = None,
+) -> Dict[str, Any]:
+    """Run the world simulation synchronously based on the supplied payload.
+
+    ``workdir`` roots the run's ``output/``, ``.sim_logs/`` and ``.sim_saves/``; it defaults to the CWD.
+    ``should_stop`` is polled at each day boundary and raises ``SimulationCancelled`` after writing a
+    checkpoint; passing that checkpoint back as ``resume_from`` continues the run on the following day.
+    ``expected_hashes`` makes the run a determinism check: it raises ``StateHashMismatch`` on the first
+    day whose state hash differs from the recorded one.
+    """
 
     logger.info(
         "simulation.run.start",
@@ -44,11 +63,11 @@ def run_simulation(payload: SimulationLaunchRequest) -> Dict[str, Any]:
             "until": payload.until.isoformat(),
             "step": payload.step,
             "seed": payload.seed,
+            "resume_from": str(resume_from) if resume_from else None,
         },
     )
 
     memory_bridge = _resolve_memory_bridge()
-    clock = SimClock(payload.start, payload.until, step=payload.step)
     state = WorldState.from_files(seed=payload.seed)
     rng = RNG(payload.seed)
     renderer = DailyRenderer(
@@ -61,20 +80,45 @@ def run_simulation(payload: SimulationLaunchRequest) -> Dict[str, Any]:
         start=payload.start,
         story_length=payload.story_length,
         story_tone=payload.story_tone,
+        base_dir=workdir,
     )
 
-    scheduler = SimulationScheduler(
-        state=state,
-        clock=clock,
-        renderer=renderer,
-        rng=rng,
-        interactive=payload.interactive,
-        memory_bridge=memory_bridge,
-    )
-    scheduler.run()
-
-    output_dir = Path("output").resolve()
-    saves_dir = Path(".sim_saves").resolve()
+    first_day, start_index = payload.start, 1
+    hasher = StateHasher()
+    if resume_from is not None:
+        checkpoint = load_checkpoint(resume_from)
+        if (checkpoint.seed, checkpoint.start, checkpoint.step) != (payload.seed, payload.start, payload.step):
+            raise ValueError(f"Checkpoint {resume_from} was written by a run with a different seed, start or step")
+        state = checkpoint.state
+        rng.setstate(checkpoint.rng_state)
+        renderer.restore_checkpoint_state(checkpoint.renderer_state)
+        first_day = SimClock(payload.start, payload.until, step=payload.step).next_after(checkpoint.last_day)
+        start_index = checkpoint.index + 1
+        hasher = checkpoint.state_hasher or hasher
+
+    checkpoint_path = renderer.checkpoint_path
+    last_day = checkpoint.last_day if resume_from is not None else None
+    if first_day <= payload.until:
+        scheduler = SimulationScheduler(
+            state=state,
+            clock=SimClock(first_day, payload.until, step=payload.step),
+            renderer=renderer,
+            rng=rng,
+            interactive=payload.interactive,
+            memory_bridge=memory_bridge,
+            on_progress=on_progress,
+            progress_interval=progress_interval,
+            should_stop=should_stop,
+            checkpoint_path=checkpoint_path,
+            start_index=start_index,
+            hasher=hasher,
+            expected_hashes=expected_hashes,
+        )
+        scheduler.run()
+        last_day = scheduler.last_day
+
+    output_dir = renderer.output_dir.resolve()
+    saves_dir = renderer.saves_dir.resolve()
     message = (
         "Simulation completed successfully."
         if payload.fast
@@ -86,8 +130,30 @@ def run_simulation(payload: SimulationLaunchRequest) -> Dict[str, Any]:
         "message": message,
         "output_dir": str(output_dir),
         "saves_dir": str(saves_dir),
+        "checkpoint": str(checkpoint_path.resolve()),
+        "state_hashes": str(renderer.state_hashes_path.resolve()),
+        "state_hash": hasher.chain.hex() if hasher.chain else None,
         "fast": payload.fast,
+        "last_day": last_day.isoformat() if last_day else None,
+        "metrics": terminal_metrics(state, last_day) if last_day else {},
+    }
+
+
+def terminal_metrics(state: WorldState, day: date) -> Dict[str, float]:
+    """World totals at the end of a run; stored on the result so batch summaries never reread artifacts."""
+    price = state.price_for(day)
+    cash = sum(person.holdings.cash_usd for person in state.people.values())
+    equities = sum(person.holdings.equities_usd for person in state.people.values())
+    tokens = state.total_token_quantity()
+    metrics = {
+        "price": price,
+        "total_cash_usd": round(cash, 2),
+        "total_equities_usd": round(equities, 2),
+        "total_tokens": tokens,
+        "portfolio_value_usd": round(cash + equities + tokens * price, 2),
     }
+    metrics.update({f"metric_{key}": value for key, value in sorted(state.metrics.items())})
+    return metrics
 
 
-__all__ = ["run_simulation"]
+__all__ = ["run_simulation", "terminal_metrics"]
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+from sim.engines.scheduler import SimulationCancelled
+
+from .schema import SimulationLaunchRequest
+from .service import run_simulation
+
+
+logger = logging.getLogger(__name__)
+
+# Messages sent child -> parent are ``(kind, body)`` tuples; these kinds end a run.
+TERMINAL_MESSAGES = frozenset({"completed", "failed", "cancelled"})
+
+MessageHandler = Callable[[str, Any], None]
+
+
+def _child_main(
+    payload_json: str,
+    workdir: str,
+    conn: Any,
+    cancel_event: Any,
+    progress_interval: float,
+    resume_from: Optional[str],
+) -> None:
+    """Entry point of a worker process: runs one simulation inside ``workdir`` and reports over ``conn``."""
+    root = Path(workdir)
+    root.mkdir(parents=True, exist_ok=True)
+    # Fast-mode headers would otherwise interleave on the API's stdout.
+    with (root / "console.log").open("a", encoding="utf-8") as console, redirect_stdout(console):
+        try:
+            conn.send(("started", {"pid": os.getpid()}))
+            payload = SimulationLaunchRequest.model_validate_json(payload_json)
+            result = run_simulation(
+                payload,
+                workdir=root,
+                on_progress=lambda progress: conn.send(("progress", progress.to_dict())),
+                progress_interval=progress_interval,
+                should_stop=cancel_event.is_set if cancel_event is not None else None,
+                resume_from=Path(resume_from) if resume_from else None,
+            )
+            conn.send(("completed", result))
+        except SimulationCancelled as exc:
+            conn.send(("cancelled", {"last_day": exc.last_day.isoformat(), "checkpoint": str(exc.checkpoint)}))
+        except BaseException as exc:  # noqa: BLE001 - everything is reported to the parent
+            conn.send(("failed", f"{type(exc).__name__}: {exc}"))
+        finally:
+            conn.close()
+
+
+def run_in_process(
+    payload: SimulationLaunchRequest,
+    workdir: Path,
+    *,
+    on_message: MessageHandler,
+    start_method: str = "spawn",
+    name: str | None = None,
+    cancel_event: Any = None,
+    progress_interval: float = 0.5,
+    resume_from: Optional[Path] = None,
+) -> Tuple[str, Any]:
+    """Run ``payload`` in a fresh process rooted at ``workdir``, forwarding each message to ``on_message``.
+
+    Blocks the calling (dispatcher) thread on the pipe only, so the API process never executes
+    simulation code itself. ``cancel_event`` must come from the same multiprocessing context
+    (``cancel_event_factory``). Returns the terminal ``(kind, body)`` message.
+    """
+    context = multiprocessing.get_context(start_method)
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_child_main,
+        args=(
+            payload.model_dump_json(),
+            str(Path(workdir).resolve()),
+            sender,
+            cancel_event,
+            progress_interval,
+            str(resume_from) if resume_from else None,
+        ),
+        name=name,
+        daemon=True,
+    )
+    process.start()
+    sender.close()
+
+    terminal: Tuple[str, Any] | None = None
+    try:
+        while terminal is None:
+            try:
+                kind, body = receiver.recv()
+            except EOFError:
+                break
+            on_message(kind, body)
+            if kind in TERMINAL_MESSAGES:
+                terminal = (kind, body)
+    finally:
+        receiver.close()
+        process.join()
+
+    if terminal is None:
+        # The child died without reporting (killed, segfault, os._exit).
+        terminal = ("failed", f"Worker process exited with code {process.exitcode} before reporting a result")
+        on_message(*terminal)
+    return terminal
+
+
+def cancel_event_factory(start_method: str = "spawn") -> Callable[[], Any]:
+    return multiprocessing.get_context(start_method).Event
+
+
+__all__ = ["TERMINAL_MESSAGES", "cancel_event_factory", "run_in_process"]
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterator, List
 
 import pytest
 
@@ -31,3 +35,76 @@ def memory_store(memory_config: MemoryConfig) -> MemoryStore:
     store = MemoryStore(engine, memory_config)
     store.ensure_schema()
     return store
+
+
+class _StubOpenAI:
+    """Local OpenAI-compatible stub recording every request body it receives."""
+
+    def __init__(self) -> None:
+        self.requests: List[dict] = []
+        self.fail_next = 0
+        self.reverse_order = True
+        self.chat_delay = 0.0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:  # silence test output
+                return
+
+            def do_POST(self) -> None:  # noqa: N802 - http.server API
+                length = int(self.headers.get("Content-Length", "0"))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                stub.requests.append({"path": self.path, "body": body})
+                if stub.fail_next > 0:
+                    stub.fail_next -= 1
+                    self._send(500, {"error": "stub failure"})
+                    return
+                if self.path.endswith("/embeddings"):
+                    inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+                    data = [
+                        {"index": index, "embedding": [float(len(text)), float(index + 1), 1.0]}
+                        for index, text in enumerate(inputs)
+                    ]
+                    if stub.reverse_order:
+                        data.reverse()
+                    self._send(200, {"data": data})
+                    return
+                if self.path.endswith("/chat/completions"):
+                    if "SLOW" in json.dumps(body):
+                        time.sleep(stub.chat_delay)
+                    subject = body["messages"][1]["content"]
+                    self._send(200, {"choices": [{"message": {"content": f"stub summary: {subject[:40]}"}}]})
+                    return
+                self._send(404, {"error": "unknown path"})
+
+            def _send(self, status: int, payload: dict) -> None:
+                raw = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        return Handler
+
+
+@pytest.fixture()
+def stub_openai() -> Iterator[_StubOpenAI]:
+    stub = _StubOpenAI()
+    stub.thread.start()
+    try:
+        yield stub
+    finally:
+        stub.server.shutdown()
+        stub.server.server_close()
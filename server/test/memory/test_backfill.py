@@ -0,0 +1,113 @@
+import csv
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from server.src.memory.backfill import BulkBackfill, _fingerprint, iter_backfill_days, write_checkpoint
+from server.src.memory.config import create_engine_from_config, load_memory_config
+from server.src.memory.store import MemoryStore
+
+START = date(2025, 1, 1)
+
+
+def _write_csv(path, days, *, offset=0):
+    with path.open("w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["date", "entity_id", "metric", "value", "actor_id", "type"])
+        for index in range(offset, offset + days):
+            day = (START + timedelta(days=index)).isoformat()
+            writer.writerow([day, "entity:a", "cash", index, "actor:bank", "txn"])
+            writer.writerow([day, "entity:b", "cash", index * 2, "", "txn"])
+    return path
+
+
+def _counts(store):
+    with store.engine.connect() as connection:
+        return {
+            table: connection.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+            for table in ("events", "event_links", "entity_state", "daily_state", "chunks", "embeddings")
+        }
+
+
+def test_iter_backfill_days_streams_and_rejects_unsorted(tmp_path):
+    source = _write_csv(tmp_path / "rows.csv", 3)
+    days = list(iter_backfill_days(source, after=START))
+    assert [day.day for day in days] == [START + timedelta(days=1), START + timedelta(days=2)]
+    assert days[0].states == {"entity:a": {"cash": 1.0}, "entity:b": {"cash": 2.0}}
+    assert days[0].events[1].actor_id is None
+
+    lines = source.read_text().splitlines()
+    (tmp_path / "bad.csv").write_text("\n".join([lines[0], lines[3], lines[1]]) + "\n")
+    with pytest.raises(ValueError, match="sort the CSV"):
+        list(iter_backfill_days(tmp_path / "bad.csv"))
+
+
+def test_backfill_batches_and_checkpoints(memory_store, memory_config, tmp_path):
+    source = _write_csv(tmp_path / "rows.csv", 10)
+    checkpoint = tmp_path / "rows.checkpoint.json"
+
+    totals = BulkBackfill(memory_store, memory_config, batch_days=4, workers=2).run(source, checkpoint=checkpoint)
+
+    assert totals["days"] == 10 and totals["events"] == 20
+    assert json.loads(checkpoint.read_text())["last_day"] == (START + timedelta(days=9)).isoformat()
+    counts = _counts(memory_store)
+    assert counts["events"] == 20 and counts["event_links"] == 20
+    assert counts["entity_state"] == 20 and counts["daily_state"] == 10
+    assert counts["embeddings"] == counts["chunks"]
+    recent = memory_store.get_recent_events(["entity:a"], window_days=36500, limit=2)
+    assert [event.payload["value"] for event in recent] == [9.0, 8.0]
+    accumulators = memory_store.get_arc_accumulators(["entity:a"])
+    assert len(accumulators["entity:a"]) == 10
+
+    # Re-running is a no-op: everything up to the checkpoint is skipped.
+    again = BulkBackfill(memory_store, memory_config, batch_days=4).run(source, checkpoint=checkpoint)
+    assert again["days"] == 0
+    assert _counts(memory_store) == counts
+
+
+def test_backfill_resumes_after_lost_checkpoint_without_duplicates(memory_store, memory_config, tmp_path):
+    source = _write_csv(tmp_path / "rows.csv", 6)
+    checkpoint = tmp_path / "rows.checkpoint.json"
+    BulkBackfill(memory_store, memory_config, batch_days=3).run(source, checkpoint=checkpoint)
+    expected = _counts(memory_store)
+
+    # Simulate a crash between the second batch's commit and its checkpoint write.
+    write_checkpoint(checkpoint, source, START + timedelta(days=2), days=3, rows=6)
+    resumed = BulkBackfill(memory_store, memory_config, batch_days=3).run(source, checkpoint=checkpoint)
+
+    assert resumed["days"] == 3 and resumed["events"] == 0
+    assert _counts(memory_store) == expected
+
+
+def test_resume_matches_events_recorded_with_an_offset(memory_store, memory_config, tmp_path):
+    source = tmp_path / "offset.csv"
+    with source.open("w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["date", "entity_id", "metric", "value", "ts"])
+        for index in range(4):
+            day = START + timedelta(days=index)
+            writer.writerow([day.isoformat(), "entity:a", "cash", index, f"{day.isoformat()}T08:00:00+10:00"])
+    checkpoint = tmp_path / "offset.checkpoint.json"
+    BulkBackfill(memory_store, memory_config, batch_days=2).run(source, checkpoint=checkpoint)
+    expected = _counts(memory_store)
+
+    write_checkpoint(checkpoint, source, START + timedelta(days=1), days=2, rows=2)
+    resumed = BulkBackfill(memory_store, memory_config, batch_days=2).run(source, checkpoint=checkpoint)
+    assert resumed["events"] == 0 and _counts(memory_store) == expected
+
+    # Postgres hands stored events back in UTC; the same instant must match however it is written.
+    local = datetime(2025, 1, 2, 8, tzinfo=timezone(timedelta(hours=10)))
+    stored = datetime(2025, 1, 1, 22, tzinfo=timezone.utc)
+    assert _fingerprint(local, None, "txn", {}, []) == _fingerprint(stored, None, "txn", {}, [])
+    assert _fingerprint(local, None, "txn", {}, []) == _fingerprint(stored.replace(tzinfo=None), None, "txn", {}, [])
+
+
+def test_checkpoint_is_bound_to_its_source(memory_store, memory_config, tmp_path):
+    source = _write_csv(tmp_path / "rows.csv", 2)
+    other = _write_csv(tmp_path / "other.csv", 2)
+    checkpoint = tmp_path / "shared.checkpoint.json"
+    BulkBackfill(memory_store, memory_config).run(source, checkpoint=checkpoint)
+    with pytest.raises(ValueError, match="--restart"):
+        BulkBackfill(memory_store, memory_config).run(other, checkpoint=checkpoint)
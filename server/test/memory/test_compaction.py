@@ -0,0 +1,96 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import text
+
+from server.src.memory.compaction import Compactor, fold_metrics, merge_metrics
+from server.src.memory.jobs import MemoryJobManager
+from server.src.memory.schema import DailyStateWrite, EntityStateWrite, EntityUpsert, TickRunRequest
+from server.src.memory.tick_pipeline import TickPipeline
+
+START = date(2025, 1, 1)
+
+
+def _run_days(pipeline, days, offset=0):
+    for index in range(offset, offset + days):
+        day = START + timedelta(days=index)
+        pipeline.run(
+            TickRunRequest(
+                date=day,
+                entities=[
+                    EntityStateWrite(date=day, entity_id="entity:old", state={"cash": index, "mood": "ok"}, summary=f"Old day {index}")
+                ],
+                global_state=DailyStateWrite(date=day, global_state={"total": index * 2}, summary=f"Overview {index}"),
+            )
+        )
+
+
+def _rollup_days(store, scope):
+    return {(record.period, record.period_start): record.days for record in store.get_state_rollups(scope)}
+
+
+def test_metrics_merge_is_order_independent():
+    early, late = {}, {}
+    fold_metrics(early, {"cash": 5, "flag": True, "name": "x"}, date(2025, 1, 1))
+    fold_metrics(early, {"cash": 1}, date(2025, 1, 2))
+    fold_metrics(late, {"cash": 9}, date(2025, 1, 3))
+    forward = merge_metrics(early, late)
+    backward = merge_metrics(late, early)
+    assert forward == backward
+    assert forward["cash"] == {"min": 1, "max": 9, "mean": 5, "count": 3, "last": 9, "last_date": "2025-01-03"}
+    assert set(forward) == {"cash"}
+
+
+def test_compaction_rolls_up_and_deletes_originals(memory_store, memory_config):
+    pipeline = TickPipeline(memory_store, memory_config)
+    memory_store.upsert_entity(EntityUpsert(id="entity:old", kind="person", name="Old"))
+    _run_days(pipeline, 120)
+    as_of = START + timedelta(days=119)
+    hot_cutoff = as_of - timedelta(days=30)
+
+    stats = Compactor(memory_store, memory_config).compact(hot_days=30, monthly_after_days=60)
+
+    assert stats["states_deleted"] == 2 * (hot_cutoff - START).days
+    with memory_store.engine.connect() as connection:
+        remaining = connection.execute(text("SELECT COUNT(*) FROM entity_state")).scalar()
+        old_chunks = connection.execute(
+            text("SELECT COUNT(*) FROM chunks WHERE ref_type = 'entity_state' AND ts < :cutoff"),
+            {"cutoff": datetime.combine(hot_cutoff, datetime.min.time())},
+        ).scalar()
+        rollup_ids = connection.execute(text("SELECT id FROM chunks WHERE ref_type = 'arc_rollup'")).scalars().all()
+    assert remaining == 31
+    assert old_chunks == 0
+    assert rollup_ids and memory_store.chunks_missing_embeddings(rollup_ids) == []
+
+    entity_rollups = _rollup_days(memory_store, "entity:old")
+    assert sum(entity_rollups.values()) == (hot_cutoff - START).days
+    assert {period for period, _ in entity_rollups} == {"weekly", "monthly"}
+    january = next(record for record in memory_store.get_state_rollups("entity:old") if record.period_start == START)
+    assert january.period == "monthly" and january.days == 31
+    assert january.metrics["cash"]["min"] == 0 and january.metrics["cash"]["max"] == 30
+    assert january.metrics["cash"]["last"] == 30 and january.metrics["cash"]["mean"] == 15
+    assert "mood" not in january.metrics
+    assert sum(_rollup_days(memory_store, "__global__").values()) == (hot_cutoff - START).days
+
+    again = Compactor(memory_store, memory_config).compact(hot_days=30, monthly_after_days=60)
+    assert again["states_deleted"] == 0 and again["chunks_deleted"] == 0
+    assert _rollup_days(memory_store, "entity:old") == entity_rollups
+
+
+def test_weekly_rollups_age_into_months(memory_store, memory_config):
+    pipeline = TickPipeline(memory_store, memory_config)
+    memory_store.upsert_entity(EntityUpsert(id="entity:old", kind="person", name="Old"))
+    _run_days(pipeline, 90)
+    jobs = MemoryJobManager(pipeline)
+    jobs.compactor.compact(hot_days=20, monthly_after_days=40)
+    first = _rollup_days(memory_store, "entity:old")
+
+    _run_days(pipeline, 45, offset=90)
+    assert jobs.trigger_compaction()["states_deleted"] == 0  # default 90-day hot window is already compacted
+    jobs.compactor.compact(hot_days=20, monthly_after_days=40)
+    second = _rollup_days(memory_store, "entity:old")
+
+    as_of = START + timedelta(days=134)
+    monthly_cutoff = as_of - timedelta(days=40)
+    assert all(start >= monthly_cutoff for period, start in second if period == "weekly")
+    assert sum(second.values()) == (as_of - timedelta(days=20) - START).days
+    assert sum(first.values()) < sum(second.values())
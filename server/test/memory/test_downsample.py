@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from server.src.memory.downsample import downsample, lttb, minmax
+
+
+def test_lttb_and_minmax_keep_endpoints_and_extremes():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.sin(x / 25.0)
+    y[613] = 5.0
+
+    keep = lttb(x, y, 50)
+    assert len(keep) == 50 and keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0) and 613 in keep
+
+    keep = minmax(y, 50)
+    assert len(keep) <= 50 and np.all(np.diff(keep) > 0)
+    assert 613 in keep and y[keep].min() == y.min()
+
+    assert list(lttb(x[:5], y[:5], 10)) == [0, 1, 2, 3, 4]
+    with pytest.raises(ValueError):
+        downsample(x, y, 10, "mean")
@@ -0,0 +1,104 @@
+from datetime import date, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from server.src.memory.config import create_engine_from_config, load_memory_config
+from server.src.memory.embedding_worker import EmbeddingWorker
+from server.src.memory.routes import build_memory_router
+from server.src.memory.schema import DailyStateWrite, EntityStateWrite, EntityUpsert, EventCreate, TickRunRequest
+from server.src.memory.store import MemoryStore
+from server.src.memory.tick_pipeline import TickPipeline
+
+DAY = date(2025, 2, 3)
+
+
+def _deferred(memory_env):
+    config = load_memory_config(dict(memory_env, EMBEDDINGS_DEFERRED="true", EMBEDDINGS_WORKER_BATCH="2"))
+    store = MemoryStore(create_engine_from_config(config), config)
+    store.ensure_schema()
+    store.upsert_entity(EntityUpsert(id="entity:queued", kind="person", name="Keeper"))
+    return store, config
+
+
+def _request(summary):
+    return TickRunRequest(
+        date=DAY,
+        entities=[EntityStateWrite(date=DAY, entity_id="entity:queued", state={"cash": 3}, summary=summary)],
+        global_state=DailyStateWrite(date=DAY, global_state={}, summary="Quiet day"),
+        events=[EventCreate(ts=f"{DAY.isoformat()}T09:00:00", type="note", payload={"text": "lighthouse"}, links=["entity:queued"])],
+    )
+
+
+def test_deferred_tick_queues_then_worker_drains(memory_env):
+    store, config = _deferred(memory_env)
+    result = TickPipeline(store, config).run(_request("Keeper polished the lighthouse lens"))
+
+    assert result["embeddings"] == 0 and result["embeddings_queued"] == result["chunks"] > 0
+    backlog = store.embedding_backlog()
+    assert backlog["depth"] == result["chunks"] and backlog["lag_seconds"] >= 0
+    # Keyword retrieval does not wait for the worker.
+    assert store.keyword_search_chunks("lighthouse", limit=5)
+
+    worker = EmbeddingWorker(store, config)
+    assert worker.run_once() == 2
+    assert worker.drain() == result["chunks"] - 2
+    assert store.embedding_backlog() == {"depth": 0, "lag_seconds": 0.0}
+    with store.engine.connect() as connection:
+        chunk_ids = connection.execute(text("SELECT id FROM chunks")).scalars().all()
+    assert store.chunks_missing_embeddings(chunk_ids) == []
+
+
+def test_reused_chunks_are_not_requeued(memory_env):
+    store, config = _deferred(memory_env)
+    pipeline = TickPipeline(store, config)
+    pipeline.run(_request("Same summary"))
+    EmbeddingWorker(store, config).drain()
+
+    again = pipeline.run(_request("Same summary"))
+    # Only the newly appended event's chunk needs an embedding.
+    assert again["embeddings_queued"] == 1
+    assert store.embedding_backlog()["depth"] == 1
+
+
+def test_status_reports_embedding_backlog(memory_env):
+    env = dict(memory_env, EMBEDDINGS_DEFERRED="true")
+    app = FastAPI()
+    app.include_router(build_memory_router(config=load_memory_config(env)))
+    client = TestClient(app)
+    assert client.post("/api/memory/entity", json={"id": "entity:queued", "kind": "person"}).status_code == 200
+    assert client.post("/api/memory/tick/run", json=_request("Queued for later").model_dump(mode="json")).status_code == 200
+
+    backlog = client.get("/api/memory/status").json()["embedding_backlog"]
+    assert backlog["depth"] > 0
+
+
+
+def test_workers_in_separate_processes_claim_disjoint_batches(memory_env):
+    store, config = _deferred(memory_env)
+    queued = TickPipeline(store, config).run(_request("Keeper trimmed the wick"))["embeddings_queued"]
+    # A second store on the same database stands in for `memory embed-worker` running beside the API.
+    other = MemoryStore(create_engine_from_config(config), config)
+    lease = timedelta(minutes=5)
+
+    # A claim that lapses (a crashed worker) is handed out again.
+    lapsed = store.claim_embeddings(1, timedelta(seconds=-1))
+    assert [record.id for record in other.claim_embeddings(1, lease)] == [record.id for record in lapsed]
+
+    first = store.claim_embeddings(2, lease)
+    rest = other.claim_embeddings(10, lease)
+    claimed = [lapsed[0].id, *(record.id for record in first), *(record.id for record in rest)]
+    assert len(set(claimed)) == len(claimed) == queued
+    assert store.claim_embeddings(10, lease) == []
+
+    # Two workers embedding the same chunk leave a single embedding.
+    vector = [0.3] * config.vector_dim
+    assert len(store.add_embeddings([(first[0].id, vector)])) == 1
+    assert other.add_embeddings([(first[0].id, vector)]) == []
+    with store.engine.connect() as connection:
+        count = connection.execute(text("SELECT COUNT(*) FROM embeddings WHERE chunk_id = :id"), {"id": first[0].id}).scalar()
+    assert count == 1
+
+    assert store.enqueue_embeddings([first[0].id, first[0].id]) == 1
+    assert store.enqueue_embeddings([first[0].id]) == 0
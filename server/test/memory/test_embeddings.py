@@ -0,0 +1,155 @@
+import numpy as np
+import pytest
+
+from server.src.memory import embeddings
+from server.src.memory.config import create_engine_from_config, load_memory_config
+from server.src.memory.embeddings import (
+    EmbeddingCache,
+    EmbeddingClient,
+    embed_batch,
+    embed_text,
+    embedding_cache_key,
+    plan_batches,
+)
+from server.src.memory.local_embedder import hash_embed_batch
+from server.src.memory.schema import ChunkInput
+from server.src.memory.store import MemoryStore
+
+
+def test_cache_key_normalises_whitespace(memory_config):
+    first = embedding_cache_key("model", 64, "No linked  events\nin the recent window.")
+    second = embedding_cache_key("model", 64, "No linked events in the recent window. ")
+    assert first == second
+    assert first != embedding_cache_key("model", 32, "No linked events in the recent window.")
+    assert first != embedding_cache_key("other", 64, "No linked events in the recent window.")
+
+
+def test_embed_batch_uses_cache(memory_store, memory_config, monkeypatch):
+    calls = []
+    original = embeddings._local_embed_many
+
+    def counting(texts, config):
+        calls.extend(texts)
+        return original(texts, config)
+
+    monkeypatch.setattr(embeddings, "_local_embed_many", counting)
+    cache = memory_store.embedding_cache
+
+    first = embed_batch(["alpha", "beta", "alpha"], memory_config, cache=cache)
+    assert calls == ["alpha", "beta"]
+    assert first[0] == first[2]
+
+    second = embed_batch(["beta", "alpha"], memory_config, cache=cache)
+    assert calls == ["alpha", "beta"]
+    assert second == [first[1], first[0]]
+    assert cache.stats()["hits"] >= 2
+
+
+def test_embedding_cache_persists_across_processes(memory_env, stub_openai):
+    config = _remote_config(memory_env, stub_openai)
+    store = MemoryStore(create_engine_from_config(config), config)
+    vector = embed_text("repeated daily summary", config, cache=store.embedding_cache)
+    assert len(stub_openai.requests) == 1
+
+    fresh_store = MemoryStore(create_engine_from_config(config), config)
+    cached = embed_text("repeated  daily summary", config, cache=fresh_store.embedding_cache)
+    assert cached == pytest.approx(vector, abs=1e-6)
+    assert len(stub_openai.requests) == 1
+
+
+def test_cache_without_store_is_memory_only(memory_config):
+    cache = EmbeddingCache(memory_config)
+    embed_text("in memory", memory_config, cache=cache)
+    assert len(cache.lru) == 1
+
+
+def _remote_config(memory_env, stub, **overrides):
+    env = dict(memory_env, EMBEDDINGS_API_KEY="test-key", EMBEDDINGS_API_BASE=stub.base_url)
+    env.update(overrides)
+    return load_memory_config(env)
+
+
+def test_plan_batches_respects_inputs_and_tokens():
+    texts = ["a" * 40] * 5
+    assert plan_batches(texts, max_inputs=2, max_tokens=1000) == [[0, 1], [2, 3], [4]]
+    assert plan_batches(texts, max_inputs=10, max_tokens=25) == [[0, 1], [2, 3], [4]]
+    assert plan_batches(["x" * 400], max_inputs=10, max_tokens=5) == [[0]]
+
+
+def test_remote_client_batches_and_preserves_order(memory_env, stub_openai):
+    config = _remote_config(memory_env, stub_openai, EMBEDDINGS_BATCH_SIZE="4", EMBEDDINGS_CONCURRENCY="3")
+    texts = [f"text {'x' * index}" for index in range(10)]
+
+    vectors = EmbeddingClient(config).embed(texts)
+
+    assert len(stub_openai.requests) == 3
+    assert all(isinstance(req["body"]["input"], list) for req in stub_openai.requests)
+    for text, vector in zip(texts, vectors):
+        assert vector is not None and len(vector) == config.vector_dim
+        # Stub encodes len(text) in the first component; order must survive reversed responses.
+        ratio = vector[0] / vector[2]
+        assert ratio == pytest.approx(len(text))
+
+
+def test_remote_client_retries_failed_batch(memory_env, stub_openai):
+    config = _remote_config(memory_env, stub_openai, EMBEDDINGS_BATCH_SIZE="8")
+    stub_openai.fail_next = 1
+
+    vectors = EmbeddingClient(config).embed(["one", "two"])
+
+    assert all(vector is not None for vector in vectors)
+    assert len(stub_openai.requests) == 2
+
+
+def test_embed_batch_falls_back_per_batch(memory_env, stub_openai):
+    config = _remote_config(memory_env, stub_openai, EMBEDDINGS_BATCH_SIZE="2", EMBEDDINGS_MAX_RETRIES="1", EMBEDDINGS_CONCURRENCY="1")
+    stub_openai.fail_next = 1
+
+    vectors = embed_batch(["first", "second", "third"], config)
+
+    assert len(vectors) == 3
+    assert vectors[2][0] / vectors[2][2] == pytest.approx(len("third"))
+    assert vectors[0] == pytest.approx(hash_embed_batch(["first"], config.vector_dim)[0].tolist(), abs=1e-6)
+
+
+def test_hashing_embedder_is_meaningful(memory_config):
+    vectors = np.asarray(
+        embed_batch(
+            [
+                "Thomas sold ORIGIN tokens for cash",
+                "Thomas sells some ORIGIN tokens to raise cash",
+                "Jordy prepares ATO legal briefs",
+            ],
+            memory_config,
+        )
+    )
+    assert vectors.shape == (3, memory_config.vector_dim)
+    assert np.linalg.norm(vectors, axis=1) == pytest.approx([1.0, 1.0, 1.0], abs=1e-5)
+    related = float(vectors[0] @ vectors[1])
+    unrelated = float(vectors[0] @ vectors[2])
+    assert related > unrelated + 0.3
+    assert hash_embed_batch(["same text"], 64).tolist() == hash_embed_batch(["same text"], 64).tolist()
+
+
+def test_backend_selection(memory_env):
+    random_config = load_memory_config(dict(memory_env, EMBEDDINGS_BACKEND="random"))
+    hashing_config = load_memory_config(memory_env)
+    assert random_config.local_embeddings_backend == "random"
+    assert embed_text("x", random_config) != pytest.approx(embed_text("x", hashing_config))
+    offline = load_memory_config(dict(memory_env, EMBEDDINGS_BACKEND="hashing", EMBEDDINGS_API_KEY="key"))
+    assert not offline.remote_embeddings_enabled
+    with pytest.raises(ValueError, match="EMBEDDINGS_BACKEND"):
+        load_memory_config(dict(memory_env, EMBEDDINGS_BACKEND="hash"))
+
+
+def test_sqlite_vector_search_ranks_by_similarity(memory_store, memory_config):
+    texts = ["ORIGIN token price rally", "romance dinner with Ella", "ORIGIN tokens rally again"]
+    chunks = memory_store.add_chunks([ChunkInput(text=text) for text in texts])
+    vectors = embed_batch(texts, memory_config)
+    memory_store.add_embeddings(list(zip([chunk.id for chunk in chunks], vectors)))
+
+    query = embed_text("ORIGIN rally", memory_config)
+    results = memory_store.vector_search_chunks(query, 2)
+
+    assert {chunk.text for chunk, _ in results} == {texts[0], texts[2]}
+    assert results[0][1] >= results[1][1] > 0
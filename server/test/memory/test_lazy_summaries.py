@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+from server.src.memory.arcs import is_monthly_arc_day, is_weekly_arc_day
+from server.src.memory.config import create_engine_from_config, load_memory_config
+from server.src.memory.jobs import MemoryJobManager
+from server.src.memory.lazy_summaries import SummaryMaterializer
+from server.src.memory.retriever import Retriever
+from server.src.memory.schema import DailyStateWrite, EntityStateWrite, EntityUpsert, EventCreate, RetrieveRequest, TickRunRequest
+from server.src.memory.store import MemoryStore
+from server.src.memory.tick_pipeline import TickPipeline
+
+
+def _lazy_store(memory_env):
+    config = load_memory_config(dict(memory_env, MEMORY_LAZY_SUMMARIES="true"))
+    store = MemoryStore(create_engine_from_config(config), config)
+    store.ensure_schema()
+    store.upsert_entity(EntityUpsert(id="entity:lazy", kind="person", name="Lazy"))
+    return store, config
+
+
+def _tick(pipeline, day):
+    return pipeline.run(
+        TickRunRequest(
+            date=day,
+            entities=[EntityStateWrite(date=day, entity_id="entity:lazy", state={"cash": day.day})],
+            global_state=DailyStateWrite(date=day, global_state={"entities": 1}),
+            events=[EventCreate(ts=f"{day.isoformat()}T08:00:00", type="txn", payload={"amount": 5}, links=["entity:lazy"])],
+        )
+    )
+
+
+def _summary_chunks(store):
+    with store.engine.connect() as connection:
+        return connection.execute(text("SELECT COUNT(*) FROM chunks WHERE ref_type = 'entity_state'")).scalar()
+
+
+def test_lazy_tick_defers_summaries_until_retrieval(memory_env, monkeypatch):
+    store, config = _lazy_store(memory_env)
+    pipeline = TickPipeline(store, config)
+    today = date.today()
+    while is_weekly_arc_day(today) or is_monthly_arc_day(today):  # arc days generate what their arcs cover
+        today -= timedelta(days=1)
+
+    result = _tick(pipeline, today)
+    assert result["summaries_pending"] == 1
+    assert store.get_latest_entity_state("entity:lazy").summary is None
+    assert store.get_daily_state(today).summary is None
+    assert _summary_chunks(store) == 0
+
+    retriever = Retriever(store, config)
+    calls = []
+    original = retriever.materializer.summarizer.summarize_entity_day
+    monkeypatch.setattr(
+        retriever.materializer.summarizer,
+        "summarize_entity_day",
+        lambda *args: calls.append(args[0]) or original(*args),
+    )
+    pack = retriever.retrieve(RetrieveRequest(question="cash", entity_scope=["entity:lazy"]))
+
+    assert pack.states[0].summary.startswith(f"Entity entity:lazy snapshot for {today.isoformat()}")
+    assert "txn (amount=5)" in pack.states[0].summary
+    assert pack.daily.summary.startswith("Daily overview")
+    assert calls == ["entity:lazy"]
+    assert store.get_latest_entity_state("entity:lazy").summary == pack.states[0].summary
+    assert _summary_chunks(store) == 1
+
+    retriever.cache.clear()
+    retriever.retrieve(RetrieveRequest(question="cash", entity_scope=["entity:lazy"]))
+    assert calls == ["entity:lazy"]
+    retriever.close()
+
+
+def test_warmer_fills_recent_days_only(memory_env):
+    store, config = _lazy_store(memory_env)
+    pipeline = TickPipeline(store, config)
+    start = date(2025, 5, 5)  # Monday to Friday: no arc day
+    for offset in range(5):
+        _tick(pipeline, start + timedelta(days=offset))
+
+    generated = MemoryJobManager(pipeline).trigger_summary_warm(days=2)
+
+    assert generated == 4  # two entity and two daily summaries
+    entity_pending, daily_pending = store.pending_summary_states(start)
+    assert [record.date for record in entity_pending] == [start + timedelta(days=offset) for offset in range(3)]
+    assert len(daily_pending) == 3
+
+
+def _arc_chunks(store):
+    with store.engine.connect() as connection:
+        return connection.execute(text("SELECT text FROM chunks WHERE ref_type = 'arc' ORDER BY id")).scalars().all()
+
+
+def test_lazy_ticks_still_emit_arcs(memory_env):
+    store, config = _lazy_store(memory_env)
+    pipeline = TickPipeline(store, config)
+    start = date(2025, 6, 1)  # a Sunday
+    for offset in range(9):
+        _tick(pipeline, start + timedelta(days=offset))
+
+    arcs = _arc_chunks(store)
+    assert [arc.split(":")[0] for arc in arcs] == ["Weekly arc ending 2025-06-01", "Weekly arc ending 2025-06-08"]
+    assert "snapshot for 2025-06-08" in arcs[1]
+    entries = store.get_arc_accumulators(["entity:lazy"])["entity:lazy"]
+    assert [entry[0] for entry in entries] == [(start + timedelta(days=offset)).isoformat() for offset in range(8)]
+
+    # Summaries generated on read reach the accumulator too.
+    SummaryMaterializer(store, config).warm(days=1, as_of=start + timedelta(days=8))
+    assert store.get_arc_accumulators(["entity:lazy"])["entity:lazy"][-1][0] == "2025-06-09"
@@ -1,5 +1,11 @@
+import os
+import subprocess
+import sys
+import threading
+import time
 from datetime import date, datetime, timedelta, timezone
 
+from server.src.memory.config import load_memory_config
 from server.src.memory.embeddings import embed_text
 from server.src.memory.retriever import Retriever
 from server.src.memory.schema import ChunkInput, DailyStateWrite, EntityStateWrite, EntityUpsert, EventCreate, RetrieveRequest
@@ -66,3 +72,116 @@ def test_retriever_scores_recent_chunks(memory_store, memory_config):
     assert pack.chunks, "Expected chunks in prompt pack"
     assert pack.chunks[0].id == recent_chunk.id
     assert pack.chunks[0].score >= pack.chunks[-1].score
+
+
+def _slow(delay, result):
+    def stage(*args, **kwargs):
+        time.sleep(delay)
+        return result
+
+    return stage
+
+
+def test_retriever_runs_stages_concurrently(memory_store, memory_config, monkeypatch):
+    stages = ("get_recent_entity_states", "get_recent_events", "keyword_search_chunks", "vector_search_chunks")
+    # Each stage waits until all four are in flight, which only happens if they run side by side.
+    barrier = threading.Barrier(len(stages), timeout=5)
+
+    def stage(*args, **kwargs):
+        barrier.wait()
+        return []
+
+    for name in stages:
+        monkeypatch.setattr(memory_store, name, stage)
+    retriever = Retriever(memory_store, memory_config)
+
+    pack = retriever.retrieve(RetrieveRequest(question="Where is the historian now?", keywords=["historian"]))
+
+    assert set(pack.meta["timings_ms"]) == {"states", "events", "keyword", "semantic", "total"}
+    assert not barrier.broken
+    assert pack.meta["degraded"] == []
+
+
+def test_retriever_degrades_slow_and_failing_stages(memory_env, memory_store, monkeypatch):
+    config = load_memory_config(dict(memory_env, RETRIEVER_STAGE_TIMEOUT="0.1"))
+    event = memory_store.append_event(
+        EventCreate(ts=datetime.now(timezone.utc), type="note", payload={"ok": True}, links=["person:a"])
+    )
+    monkeypatch.setattr(memory_store, "keyword_search_chunks", _slow(1.0, []))
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("vector index offline")
+
+    monkeypatch.setattr(memory_store, "vector_search_chunks", broken)
+
+    pack = Retriever(memory_store, config).retrieve(
+        RetrieveRequest(question="What did person a do?", entity_scope=["person:a"])
+    )
+
+    assert [item.id for item in pack.events] == [event.id]
+    assert sorted(pack.meta["degraded"]) == ["keyword", "semantic"]
+    assert pack.meta["timings_ms"]["total"] < 1000
+
+
+def test_retriever_caches_until_data_version_changes(memory_store, memory_config, monkeypatch):
+    retriever = Retriever(memory_store, memory_config)
+    calls = []
+    original = memory_store.get_recent_events
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(memory_store, "get_recent_events", counting)
+    request = RetrieveRequest(question="Status of person b?", entity_scope=["person:b"])
+
+    first = retriever.retrieve(request)
+    second = retriever.retrieve(request)
+    assert len(calls) == 1
+    assert first.meta["cache"] == "miss" and second.meta["cache"] == "hit"
+    assert second.events == first.events == []
+
+    memory_store.append_event(
+        EventCreate(ts=datetime.now(timezone.utc), type="note", payload={"n": 1}, links=["person:b"])
+    )
+    third = retriever.retrieve(request)
+    assert len(calls) == 2
+    assert third.meta["cache"] == "miss" and len(third.events) == 1
+
+    other_scope = retriever.retrieve(RetrieveRequest(question="Status of person b?", entity_scope=["person:c"]))
+    assert other_scope.meta["cache"] == "miss"
+    stats = retriever.cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 3
+
+
+def test_writes_from_another_process_invalidate_cached_packs(memory_env, memory_store, memory_config):
+    retriever = Retriever(memory_store, memory_config)
+    request = RetrieveRequest(question="Status of person d?", entity_scope=["person:d"])
+    assert retriever.retrieve(request).meta["cache"] == "miss"
+    version = memory_store.data_version
+
+    # A simulation worker or `cli.py worker` writing to the same database.
+    script = (
+        "from datetime import datetime, timezone\n"
+        "from server.src.memory.config import create_engine_from_config, load_memory_config\n"
+        "from server.src.memory.schema import EventCreate\n"
+        "from server.src.memory.store import MemoryStore\n"
+        "config = load_memory_config()\n"
+        "store = MemoryStore(create_engine_from_config(config), config)\n"
+        "store.append_event(EventCreate(ts=datetime.now(timezone.utc), type='note', payload={}, links=['person:d']))\n"
+    )
+    subprocess.run([sys.executable, "-c", script], env=dict(os.environ, **memory_env), check=True)
+
+    assert memory_store.data_version > version
+    pack = retriever.retrieve(request)
+    assert pack.meta["cache"] == "miss" and len(pack.events) == 1
+
+
+def test_retriever_cache_expires_after_ttl(memory_env, memory_store, monkeypatch):
+    config = load_memory_config(dict(memory_env, RETRIEVAL_CACHE_TTL="0.05"))
+    retriever = Retriever(memory_store, config)
+    request = RetrieveRequest(question="Anything new?")
+    retriever.retrieve(request)
+    assert retriever.retrieve(request).meta["cache"] == "hit"
+    time.sleep(0.1)
+    assert retriever.retrieve(request).meta["cache"] == "miss"
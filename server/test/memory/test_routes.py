@@ -1,11 +1,12 @@
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from server.src.memory.config import load_memory_config
+from server.src.memory.config import create_engine_from_config, load_memory_config
 from server.src.memory.routes import build_memory_router
-from server.src.memory.schema import DailyStateWrite, EntityStateWrite, EventCreate, TickRunRequest
+from server.src.memory.schema import DailyStateWrite, EntityStateWrite, EntityUpsert, EventCreate, TickRunRequest
+from server.src.memory.store import MemoryStore
 
 
 def build_app(memory_env):
@@ -80,3 +81,38 @@ def test_memory_routes_flow(memory_env):
 
     daily_response = client.get(f"/api/memory/daily/{today.isoformat()}")
     assert daily_response.status_code == 200
+
+
+
+def test_entity_series_endpoint_downsamples(memory_env):
+    client = TestClient(build_app(memory_env))
+    config = load_memory_config(memory_env)
+    store = MemoryStore(create_engine_from_config(config), config)
+    store.ensure_schema()
+    store.upsert_entity(EntityUpsert(id="person:chart", kind="person", name="Chart"))
+    start = date(2020, 1, 1)
+    for offset in range(1000):
+        day = start + timedelta(days=offset)
+        store.write_entity_state(EntityStateWrite(date=day, entity_id="person:chart", state={"cash": float(offset % 97)}))
+
+    response = client.get("/api/memory/entity/person:chart/series", params={"key": "cash", "points": 100})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 1000 and body["method"] == "lttb"
+    assert len(body["dates"]) == len(body["values"]) == 100
+    assert body["dates"][0] == "2020-01-01" and body["dates"][-1] == (start + timedelta(days=999)).isoformat()
+    assert max(body["values"]) == 96.0
+
+    window = client.get(
+        "/api/memory/entity/person:chart/series",
+        params={"key": "cash", "from": "2020-01-10", "to": "2020-01-19", "points": 500},
+    ).json()
+    assert window["total"] == 10 and window["values"] == [float(offset) for offset in range(9, 19)]
+
+    minmax = client.get(
+        "/api/memory/entity/person:chart/series", params={"key": "cash", "points": 40, "method": "minmax"}
+    ).json()
+    assert len(minmax["values"]) <= 40 and min(minmax["values"]) == 0.0 and max(minmax["values"]) == 96.0
+
+    assert client.get("/api/memory/entity/person:chart/series", params={"key": "nope"}).status_code == 404
+    assert client.get("/api/memory/entity/person:chart/series", params={"key": "cash", "method": "avg"}).status_code == 422
@@ -1,7 +1,25 @@
-from datetime import date, datetime, timezone
+import threading
+from datetime import date, datetime, timedelta, timezone
 
+import numpy as np
+import pytest
+from sqlalchemy import text
+
+from server.src.memory.config import create_engine_from_config, load_memory_config
+from server.src.memory.embeddings import embed_batch, embed_text
 from server.src.memory.ids import person_id
-from server.src.memory.schema import AttributeSet, ChunkInput, DailyStateWrite, EntityStateWrite, EntityUpsert, EventCreate, RelationSet
+from server.src.memory.schema import (
+    AttributeSet,
+    ChunkInput,
+    DailyStateWrite,
+    EntityStateWrite,
+    EntityUpsert,
+    EventCreate,
+    RelationSet,
+    decode_vector_array,
+    encode_vector,
+    vector_precision,
+)
 from server.src.memory.store import MemoryStore
 
 
@@ -65,3 +83,239 @@ def test_store_round_trip(memory_store: MemoryStore):
     latest_state = memory_store.get_latest_entity_state(entity.id)
     assert latest_state is not None
     assert latest_state.summary == "Tester has $1000"
+
+
+@pytest.mark.parametrize("precision,max_error", [("float32", 1e-7), ("float16", 1e-3), ("int8", 1e-2)])
+def test_vector_precision_round_trip(precision, max_error):
+    rng = np.random.default_rng(7)
+    vector = rng.normal(size=256).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+
+    blob = encode_vector(vector, precision)
+    restored = decode_vector_array(blob)
+
+    assert vector_precision(blob) == precision
+    assert np.max(np.abs(restored - vector)) < max_error
+    if precision != "float32":
+        assert len(blob) < len(encode_vector(vector, "float32")) // 1.9
+
+
+def test_quantised_store_and_requantize(memory_env):
+    config = load_memory_config(dict(memory_env, VECTOR_PRECISION="int8"))
+    store = MemoryStore(create_engine_from_config(config), config)
+    texts = ["ORIGIN rally continues", "quiet dinner plans"]
+    chunks = store.add_chunks([ChunkInput(text=text) for text in texts])
+    store.add_embeddings(list(zip([chunk.id for chunk in chunks], embed_batch(texts, config))))
+
+    results = store.vector_search_chunks(embed_text("ORIGIN rally", config), 1)
+    assert results[0][0].text == texts[0]
+
+    assert store.requantize_embeddings("float16") == {"scanned": 2, "rewritten": 2}
+    assert store.requantize_embeddings("float16") == {"scanned": 2, "rewritten": 0}
+    with store.session() as session:
+        blobs = session.execute(text("SELECT embedding FROM embeddings")).scalars().all()
+    assert all(vector_precision(blob) == "float16" for blob in blobs)
+    assert all(len(blob) == 4 + 2 * config.vector_dim for blob in blobs)
+    assert store.vector_search_chunks(embed_text("ORIGIN rally", config), 1)[0][0].text == texts[0]
+
+
+def test_unknown_vector_precision_is_rejected_at_load(memory_env):
+    with pytest.raises(ValueError, match="VECTOR_PRECISION"):
+        load_memory_config(dict(memory_env, VECTOR_PRECISION="float8"))
+
+
+def test_recent_events_are_scoped_before_limit(memory_store: MemoryStore):
+    now = datetime.now(timezone.utc)
+    for offset in range(3):
+        memory_store.append_event(
+            EventCreate(ts=now - timedelta(hours=10 + offset), type="note", payload={"n": offset}, links=["person:quiet"])
+        )
+    for offset in range(20):
+        memory_store.append_event(
+            EventCreate(ts=now - timedelta(minutes=offset), type="note", payload={"n": offset}, links=["person:busy"])
+        )
+
+    events = memory_store.get_recent_events(["person:quiet"], window_days=2, limit=5)
+
+    assert [event.payload["n"] for event in events] == [0, 1, 2]
+    assert memory_store.get_recent_events(["person:quiet", "person:busy"], window_days=2, limit=4)[0].payload["n"] == 0
+
+
+def test_event_links_migration_backfills_and_runs_once(memory_env):
+    config = load_memory_config(memory_env)
+    engine = create_engine_from_config(config)
+    store = MemoryStore(engine, config)
+    store.ensure_schema()
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO events (ts, type, payload, links) VALUES (:ts, 'legacy', '{}', :links)"),
+            {"ts": datetime.now(timezone.utc).isoformat(sep=" "), "links": '["person:legacy"]'},
+        )
+        connection.execute(text("DELETE FROM schema_migrations WHERE name = '0005_event_links.sql'"))
+
+    MemoryStore(create_engine_from_config(config), config).ensure_schema()
+
+    with engine.connect() as connection:
+        linked = connection.execute(text("SELECT entity_id FROM event_links")).scalars().all()
+        applied = connection.execute(text("SELECT name FROM schema_migrations")).scalars().all()
+    assert linked == ["person:legacy"]
+    assert "0005_event_links.sql" in applied and len(applied) == len(set(applied))
+
+
+def test_concurrent_sqlite_migrations_apply_each_file_once(memory_env):
+    config = load_memory_config(memory_env)
+    errors = []
+
+    def migrate() -> None:
+        try:
+            MemoryStore(create_engine_from_config(config), config).ensure_schema()
+        except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=migrate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+    # A column added by an earlier, unrecorded attempt does not fail the re-run.
+    engine = create_engine_from_config(config)
+    with engine.begin() as connection:
+        connection.execute(text("DELETE FROM schema_migrations WHERE name = '0007_chunk_dedup.sql'"))
+    MemoryStore(engine, config).ensure_schema()
+    with engine.connect() as connection:
+        applied = connection.execute(text("SELECT name FROM schema_migrations")).scalars().all()
+    assert "0007_chunk_dedup.sql" in applied and len(applied) == len(set(applied))
+
+
+def test_add_chunks_reuses_identical_content(memory_store: MemoryStore):
+    first_day = datetime(2025, 5, 1, tzinfo=timezone.utc)
+    second_day = datetime(2025, 5, 2, tzinfo=timezone.utc)
+    repeated = "No linked events in the recent window."
+
+    first = memory_store.add_chunks([ChunkInput(ref_type="entity_state", ref_id="person:x", ts=first_day, text=repeated)])
+    memory_store.add_embeddings([(first[0].id, [0.2] * memory_store.config.vector_dim)])
+    second = memory_store.add_chunks(
+        [
+            ChunkInput(ref_type="entity_state", ref_id="person:x", ts=second_day, text=repeated + "  "),
+            ChunkInput(ref_type="entity_state", ref_id="person:y", ts=second_day, text=repeated),
+        ]
+    )
+
+    assert second[0].id == first[0].id
+    assert second[1].id != first[0].id
+    assert memory_store.chunks_missing_embeddings([chunk.id for chunk in second]) == [second[1].id]
+    with memory_store.engine.connect() as connection:
+        chunk_count = connection.execute(text("SELECT COUNT(*) FROM chunks")).scalar()
+        refs = connection.execute(
+            text("SELECT ts FROM chunk_refs WHERE chunk_id = :id ORDER BY ts"), {"id": first[0].id}
+        ).scalars().all()
+        newest = connection.execute(text("SELECT ts FROM chunks WHERE id = :id"), {"id": first[0].id}).scalar()
+    assert chunk_count == 2
+    assert refs == [first_day.isoformat(), second_day.isoformat()]
+    assert str(newest).startswith("2025-05-02")
+    assert [chunk.id for chunk in memory_store.keyword_search_chunks("linked", 10)].count(first[0].id) == 1
+
+
+def test_concurrent_writers_share_identical_chunks(memory_env):
+    config = load_memory_config(memory_env)
+    MemoryStore(create_engine_from_config(config), config).ensure_schema()
+    stores = [MemoryStore(create_engine_from_config(config), config) for _ in range(4)]
+    chunks = [ChunkInput(ref_type="event", ref_id=str(index), text=f"Shared line {index}") for index in range(20)]
+    barrier = threading.Barrier(len(stores))
+    results, errors = [], []
+
+    def write(store: MemoryStore) -> None:
+        barrier.wait()
+        try:
+            results.append([record.id for record in store.add_chunks(chunks)])
+        except Exception as exc:  # pragma: no cover - surfaced by the assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write, args=(store,)) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(results) == len(stores) and all(ids == results[0] for ids in results)
+
+
+def test_sqlite_performance_profile_uses_wal_and_read_only_reader(memory_env):
+    config = load_memory_config(memory_env)
+    store = MemoryStore(create_engine_from_config(config), config)
+    store.ensure_schema()
+    assert store.read_engine is not store.engine
+    with store.engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == config.sqlite_busy_timeout_ms
+    with store.read_engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA query_only").scalar() == 1
+
+    # Readers see committed writes from the writer engine.
+    store.upsert_entity(EntityUpsert(id="person:wal", kind="person", name="Wal"))
+    assert store.get_entity("person:wal").name == "Wal"
+    # Stores on the same database share one reader pool instead of each opening their own.
+    assert MemoryStore(create_engine_from_config(config), config).read_engine is store.read_engine
+
+    compat = load_memory_config(dict(memory_env, MEMORY_SQLITE_PROFILE="compat"))
+    compat_store = MemoryStore(create_engine_from_config(compat), compat)
+    assert compat_store.read_engine is compat_store.engine
+
+
+def test_entity_metrics_series_aggregates_and_buckets(memory_store: MemoryStore):
+    memory_store.upsert_entity(EntityUpsert(id="person:chart", kind="person", name="Chart"))
+    start = date(2025, 1, 1)
+    for offset in range(40):
+        day = start + timedelta(days=offset)
+        memory_store.write_entity_state(
+            EntityStateWrite(date=day, entity_id="person:chart", state={"cash": offset * 10, "flag": True, "mood": "ok"})
+        )
+    memory_store.write_daily_state(DailyStateWrite(date=start, global_state={"origin_price": 1.5}))
+
+    dates, values = memory_store.metric_series("person:chart", "cash", start + timedelta(days=5), start + timedelta(days=9))
+    assert dates == [start + timedelta(days=offset) for offset in range(5, 10)]
+    assert values == [50.0, 60.0, 70.0, 80.0, 90.0]
+    assert memory_store.metric_keys("person:chart") == ["cash"]
+    assert memory_store.metric_series("__global__", "origin_price") == ([start], [1.5])
+
+    stats = memory_store.metric_aggregate("person:chart", "cash")
+    assert stats["count"] == 40 and stats["min"] == 0.0 and stats["max"] == 390.0
+    assert stats["first_date"] == start and stats["last"] == 390.0 and stats["mean"] == pytest.approx(195.0)
+
+    months = memory_store.metric_buckets("person:chart", "cash", "month")
+    assert [(bucket["start"], bucket["count"], bucket["last"]) for bucket in months] == [
+        (date(2025, 1, 1), 31, 300.0),
+        (date(2025, 2, 1), 9, 390.0),
+    ]
+    assert months[0]["mean"] == pytest.approx(150.0) and months[1]["min"] == 310.0
+    weeks = memory_store.metric_buckets("person:chart", "cash", "week")
+    assert weeks[0]["start"] == date(2024, 12, 30) and weeks[0]["count"] == 5
+    with pytest.raises(ValueError):
+        memory_store.metric_buckets("person:chart", "cash", "fortnight")
+
+    # Rewriting a day replaces its metrics, dropping keys that disappeared.
+    memory_store.write_entity_state(EntityStateWrite(date=start, entity_id="person:chart", state={"debt": 3}))
+    assert memory_store.metric_series("person:chart", "cash", end=start) == ([], [])
+    assert memory_store.metric_series("person:chart", "debt") == ([start], [3.0])
+
+
+def test_entity_metric_migration_backfills_numeric_keys(memory_env):
+    config = load_memory_config(memory_env)
+    engine = create_engine_from_config(config)
+    store = MemoryStore(engine, config)
+    store.ensure_schema()
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO entities (id, kind) VALUES ('person:old', 'person')"))
+        connection.execute(
+            text("INSERT INTO entity_state (date, entity_id, state) VALUES ('2024-06-01', 'person:old', :state)"),
+            {"state": '{"cash": 12, "ratio": 0.5, "alive": true, "name": "x"}'},
+        )
+        connection.execute(text("DELETE FROM schema_migrations WHERE name = '0010_entity_metrics.sql'"))
+
+    MemoryStore(create_engine_from_config(config), config).ensure_schema()
+
+    assert store.metric_keys("person:old") == ["cash", "ratio"]
+    assert store.metric_series("person:old", "cash") == ([date(2024, 6, 1)], [12.0])
@@ -0,0 +1,67 @@
+import threading
+import time
+from datetime import date
+
+from server.src.memory.config import load_memory_config
+from server.src.memory.summarizer import EntityDay, Summarizer, summary_cache_key
+
+DAY = date(2025, 3, 1)
+
+
+def _llm_config(memory_env, stub, **overrides):
+    env = dict(memory_env, LLM_API_KEY="test-key", LLM_API_BASE=stub.base_url, **overrides)
+    return load_memory_config(env)
+
+
+def test_cache_key_covers_subject_day_and_payload():
+    key = summary_cache_key("model", "Entity a", DAY, {"state": {"cash": 1, "debt": 2}})
+    assert key == summary_cache_key("model", "Entity a", DAY, {"state": {"debt": 2, "cash": 1}})
+    assert key != summary_cache_key("model", "Entity a", DAY, {"state": {"cash": 2, "debt": 2}})
+    assert key != summary_cache_key("model", "Entity b", DAY, {"state": {"cash": 1, "debt": 2}})
+    assert key != summary_cache_key("model", "Entity a", date(2025, 3, 2), {"state": {"cash": 1, "debt": 2}})
+
+
+def test_entities_are_summarised_concurrently_and_cached(memory_env, stub_openai, monkeypatch):
+    summarizer = Summarizer(_llm_config(memory_env, stub_openai, SUMMARIZER_CONCURRENCY="4"))
+    active, peak, lock = [0], [0], threading.Lock()
+    original = summarizer._remote
+
+    def tracking(**kwargs):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        try:
+            return original(**kwargs)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    monkeypatch.setattr(summarizer, "_remote", tracking)
+    items = [EntityDay(entity_id=f"entity:{index}", state={"cash": index}, day=DAY) for index in range(8)]
+
+    first = summarizer.summarize_entities(items)
+    assert len(stub_openai.requests) == 8
+    assert peak[0] > 1
+    assert all(summary.startswith("stub summary") for summary in first)
+
+    # A retried tick with unchanged states pays nothing.
+    assert summarizer.summarize_entities(items) == first
+    assert len(stub_openai.requests) == 8
+    assert summarizer.cache.stats()["hits"] == 8
+    summarizer.close()
+
+
+def test_slow_entities_fall_back_to_local_summary(memory_env, stub_openai):
+    stub_openai.chat_delay = 1.0
+    summarizer = Summarizer(_llm_config(memory_env, stub_openai, SUMMARIZER_TIMEOUT="0.3"))
+    items = [
+        EntityDay(entity_id="entity:fast", state={"cash": 1}, day=DAY),
+        EntityDay(entity_id="entity:SLOW", state={"cash": 2}, day=DAY),
+    ]
+
+    summaries = summarizer.summarize_entities(items)
+
+    assert summaries[0].startswith("stub summary")
+    assert summaries[1].startswith("Entity entity:SLOW snapshot for 2025-03-01.")
+    summarizer.close()
@@ -1,5 +1,6 @@
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 
+from server.src.memory.arcs import ARC_WINDOW_DAYS
 from server.src.memory.schema import DailyStateWrite, EntityStateWrite, EntityUpsert, EventCreate, TickRunRequest
 from server.src.memory.tick_pipeline import TickPipeline
 
@@ -31,3 +32,63 @@ def test_tick_pipeline_creates_summaries(memory_store, memory_config):
     assert state is not None and state.summary
     chunks = memory_store.keyword_search_chunks("tester", 10)
     assert chunks
+
+
+def _tick(entity_id, day, summary):
+    return TickRunRequest(
+        date=day,
+        entities=[EntityStateWrite(date=day, entity_id=entity_id, state={"day": day.day}, summary=summary)],
+        global_state=DailyStateWrite(date=day, global_state={}, summary=f"Overview {day.isoformat()}"),
+    )
+
+
+def test_arcs_come_from_incremental_accumulators(memory_store, memory_config, monkeypatch):
+    pipeline = TickPipeline(memory_store, memory_config)
+    memory_store.upsert_entity(EntityUpsert(id="entity:arc", kind="person", name="Arc"))
+
+    def no_history(*args, **kwargs):
+        raise AssertionError("arc emission must not reread entity history")
+
+    monkeypatch.setattr(memory_store, "get_recent_entity_states", no_history)
+    start = date(2025, 7, 1)
+    for offset in range(62):  # through Sunday 2025-08-31, also the last day of the month
+        day = start + timedelta(days=offset)
+        pipeline.run(_tick("entity:arc", day, f"Arc day {day.isoformat()}"))
+
+    entries = memory_store.get_arc_accumulators(["entity:arc"])["entity:arc"]
+    assert len(entries) == ARC_WINDOW_DAYS
+    assert entries[-1] == ["2025-08-31", "Arc day 2025-08-31"]
+
+    arcs = [chunk for chunk in memory_store.keyword_search_chunks("arc", 200) if chunk.ref_type == "arc"]
+    monthly = [chunk for chunk in arcs if (chunk.meta or {}).get("period") == "monthly"]
+    assert {chunk.text.split(":")[0] for chunk in monthly} == {"Monthly arc for 2025-07", "Monthly arc for 2025-08"}
+    august = next(chunk for chunk in monthly if "2025-08" in chunk.text.split(":")[0])
+    assert "Arc day 2025-08-01" in august.text and "Arc day 2025-08-31" in august.text
+    weekly = [chunk for chunk in arcs if chunk.text.startswith("Weekly arc ending 2025-08-31")]
+    assert len(weekly) == 1 and "Arc day 2025-08-04" in weekly[0].text
+
+
+def test_rebuild_arc_accumulators_matches_incremental(memory_store, memory_config):
+    pipeline = TickPipeline(memory_store, memory_config)
+    memory_store.upsert_entity(EntityUpsert(id="entity:rebuild", kind="person", name="Rebuild"))
+    start = date(2025, 3, 1)
+    for offset in range(40):
+        day = start + timedelta(days=offset)
+        pipeline.run(_tick("entity:rebuild", day, f"Rebuild day {offset}"))
+    incremental = memory_store.get_arc_accumulators(["entity:rebuild"])
+
+    stats = memory_store.rebuild_arc_accumulators()
+
+    assert stats == {"entities": 1, "entries": ARC_WINDOW_DAYS}
+    assert memory_store.get_arc_accumulators(["entity:rebuild"]) == incremental
+
+
+def test_unchanged_days_do_not_grow_chunks(memory_store, memory_config):
+    pipeline = TickPipeline(memory_store, memory_config)
+    memory_store.upsert_entity(EntityUpsert(id="entity:steady", kind="person", name="Steady"))
+    start = date(2025, 6, 2)
+    results = [pipeline.run(_tick("entity:steady", start + timedelta(days=offset), "Nothing changed.")) for offset in range(3)]
+
+    assert [result["embeddings"] for result in results] == [1, 0, 0]
+    counts = memory_store.get_counts()
+    assert counts["chunks"] == 1 and counts["embeddings"] == 1
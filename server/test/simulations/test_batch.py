@@ -0,0 +1,93 @@
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from server.src.simulations import build_simulation_router
+from server.src.simulations.config import SimulationConfig
+from server.src.simulations.manager import SimulationRunManager
+from server.src.simulations.queue import QueueWorker
+from server.src.simulations.schema import BATCH_MAX_RUNS, SimulationBatchRequest, SimulationLaunchRequest
+
+
+def _grid() -> dict:
+    return {
+        "base": {"start": "2025-09-20", "until": "2025-09-22"},
+        "seeds": [1, 2],
+        "ranges": [{"start": "2025-09-20", "until": "2025-09-22"}, {"start": "2025-09-20", "until": "2025-09-25"}],
+        "metadata": {"sweep": "smoke"},
+    }
+
+
+def test_batch_grid_runs_and_collates_results(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_ENABLED", "false")
+    manager = SimulationRunManager(config=SimulationConfig(max_workers=2, runs_root=tmp_path / "runs"))
+    app = FastAPI()
+    app.include_router(build_simulation_router(manager))
+    client = TestClient(app)
+    try:
+        response = client.post("/api/simulations/batch", json=_grid())
+        assert response.status_code == 202
+        batch_id = response.json()["batch_id"]
+        assert response.json()["total"] == 4 and response.json()["days_total"] == 2 * (3 + 6)
+
+        deadline = time.monotonic() + 120
+        while not (status := client.get(f"/api/simulations/batch/{batch_id}").json())["finished"]:
+            assert time.monotonic() < deadline
+            time.sleep(0.1)
+    finally:
+        manager.close()
+
+    assert status["counts"] == {"completed": 4}
+    assert status["fraction_complete"] == 1.0 and status["metadata"] == {"sweep": "smoke"}
+
+    columns = client.get(f"/api/simulations/batch/{batch_id}/results").json()["columns"]
+    assert columns["seed"] == [1, 1, 2, 2]
+    assert columns["until"] == ["2025-09-22", "2025-09-25"] * 2
+    assert columns["last_day"] == columns["until"]
+    assert all(isinstance(value, float) for value in columns["portfolio_value_usd"])
+    # Runs of a batch never share a working directory, even in thread mode.
+    workdirs = {manager.get(run_id).workdir for run_id in columns["run_id"]}
+    assert len(workdirs) == 4 and all(manager.get(run_id).batch_id == batch_id for run_id in columns["run_id"])
+
+    assert client.get("/api/simulations/batch/missing").status_code == 404
+    oversized = {"seeds": list(range(BATCH_MAX_RUNS)), "steps": ["day", "week"]}
+    assert client.post("/api/simulations/batch", json=oversized).status_code == 422
+    invalid_run = {"runs": [{"start": "2025-09-22", "until": "2025-09-20"}]}
+    assert client.post("/api/simulations/batch", json=invalid_run).status_code == 422
+
+
+def test_batch_expands_grid_then_explicit_runs():
+    request = SimulationBatchRequest(
+        base=SimulationLaunchRequest(scenario="base", seed=7),
+        steps=["day", "week"],
+        scenarios=["a", "b"],
+        runs=[{"seed": 99}],
+    )
+    payloads = request.expand()
+    assert [(p.step, p.scenario, p.seed) for p in payloads] == [
+        ("day", "a", 7),
+        ("day", "b", 7),
+        ("week", "a", 7),
+        ("week", "b", 7),
+        ("day", "base", 99),
+    ]
+    assert len(SimulationBatchRequest(runs=[{"seed": 1}]).expand()) == 1
+
+
+def test_queue_batch_is_durable_and_summarised_in_sql(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_ENABLED", "false")
+    config = SimulationConfig(worker_mode="queue", queue_path=tmp_path / "queue.db", runs_root=tmp_path / "runs")
+    batch = SimulationRunManager(config=config).start_batch(SimulationBatchRequest.model_validate(_grid()))
+
+    manager = SimulationRunManager(config=config)
+    queued = manager.batch_status(batch.batch_id)
+    assert queued.counts == {"queued": 4} and queued.days_completed == 0 and not queued.finished
+
+    assert QueueWorker(manager.queue, config).drain() == 4
+    done = manager.batch_status(batch.batch_id)
+    assert done.finished and done.days_completed == done.days_total == 18
+    results = manager.batch_results(batch.batch_id)
+    assert results.count == 4 and results.columns["status"] == ["completed"] * 4
+    assert results.columns["seed"] == [1, 1, 2, 2] and None not in results.columns["total_cash_usd"]
+    assert manager.batch_status("missing") is None
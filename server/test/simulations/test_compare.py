@@ -0,0 +1,128 @@
+import csv
+import json
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import cli
+from server.src.simulations import build_simulation_router
+from server.src.simulations.compare import _read_columns, compare_runs, load_run_series
+from server.src.simulations.config import SimulationConfig
+from server.src.simulations.manager import SimulationRunManager
+from server.src.simulations.schema import SimulationLaunchRequest
+
+FINANCE_HEADER = ["date", "holder", "price", "token_quantity", "value", "cash"]
+
+
+def _write_run(root, finance_rows, social_rows=()):
+    output = root / "output"
+    output.mkdir(parents=True)
+    with (output / "finance_run_1_2025-09-20.csv").open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(FINANCE_HEADER)
+        writer.writerows(finance_rows)
+    with (output / "social_run_1_2025-09-20.csv").open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["date", "pair", "delta", "note"])
+        writer.writerows(social_rows)
+    return root
+
+
+def _finance(days, holders, bump=lambda day, holder: 0.0):
+    start = date(2025, 9, 20)
+    for offset in range(days):
+        day = (start + timedelta(days=offset)).isoformat()
+        for holder in holders:
+            value = 1000.0 + offset + bump(offset, holder)
+            yield [day, holder, "0.05", "2000000.000000", f"{value:.2f}", f"{-500.0 - offset:.2f}"]
+
+
+def test_compare_finds_first_divergence_and_per_holder_deltas(tmp_path):
+    holders = ["Ana", "Ben", "Cy"]
+    run_a = _write_run(tmp_path / "a", _finance(30, holders), [["2025-09-21", "ana|ben", 1, 'Lunch, "as usual"']])
+    run_b = _write_run(
+        tmp_path / "b",
+        _finance(30, holders, bump=lambda day, holder: 2.5 if holder == "Ben" and day >= 10 else 0.0),
+        [["2025-09-21", "ana|ben", 1, 'Lunch, "as usual"'], ["2025-09-25", "ana|cy", -1, "Argument"]],
+    )
+
+    comparison = compare_runs(run_a, run_b, labels=("a", "b"))
+    assert not comparison.identical
+    assert comparison.finance_first_divergent_day == date(2025, 9, 30)
+    assert comparison.social_first_divergent_day == date(2025, 9, 25)
+    assert comparison.first_divergent_day == date(2025, 9, 25)
+    assert (comparison.days, comparison.holders, comparison.divergent_days) == (30, 3, 20)
+    assert comparison.final_total_value_delta == 2.5 and comparison.final_total_cash_delta == 0.0
+    ben = {holder.holder: holder for holder in comparison.per_holder}["Ben"]
+    assert ben.first_divergent_day == date(2025, 9, 30)
+    assert (ben.final_value_delta, ben.max_abs_value_delta, ben.mean_value_delta) == (2.5, 2.5, 1.67)
+    assert compare_runs(run_a, run_a).identical
+
+
+def test_read_columns_parses_cells_exactly(tmp_path):
+    rows = [
+        ["2025-09-20", "Ana", "0.05", "", "-12.50", "3"],
+        ["2025-09-20", "Ben, Jr", "1.25", "0.000001", "7", "-0.01"],
+        ["2025-09-20", "Cy", "86210.00", "12345678901234.567891", "-9007199254740993.25", "0.1"],
+    ]
+    path = _write_run(tmp_path / "run", rows) / "output" / "finance_run_1_2025-09-20.csv"
+    columns = _read_columns(path, ("price", "token_quantity", "value", "cash"))
+    assert np.isnan(columns["token_quantity"][0]) and columns["value"][0] == -12.5
+    assert columns["token_quantity"][2] == float("12345678901234.567891")
+    assert columns["value"][2] == float("-9007199254740993.25")
+    assert columns["holder"].tolist() == ["Ana", "Ben, Jr", "Cy"]
+
+
+def test_series_sidecar_is_reused_until_the_csv_changes(tmp_path):
+    run = _write_run(tmp_path / "run", _finance(5, ["Ana"]))
+    load_run_series(run)
+    sidecar = run / "output" / "finance_run_1_2025-09-20.csv.npz"
+    assert sidecar.exists()
+    with (run / "output" / "finance_run_1_2025-09-20.csv").open("a", newline="") as handle:
+        csv.writer(handle).writerow(["2025-09-25", "Ana", "0.05", "1", "5.00", "1.00"])
+    assert load_run_series(run).day_labels[-1] == "2025-09-25"
+
+
+def test_compare_five_year_many_holder_runs(tmp_path):
+    holders = [f"holder {index:03d}" for index in range(50)]
+    run_a = _write_run(tmp_path / "a", _finance(1826, holders))
+    run_b = _write_run(tmp_path / "b", _finance(1826, holders, bump=lambda day, holder: 1.0 if day > 1000 else 0.0))
+    comparison = compare_runs(run_a, run_b)
+    assert comparison.finance_first_divergent_day == date(2025, 9, 20) + timedelta(days=1001)
+    assert comparison.final_total_value_delta == 50.0
+
+
+def test_compare_route_and_cli(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("MEMORY_ENABLED", "false")
+    manager = SimulationRunManager(config=SimulationConfig(worker_mode="process", runs_root=tmp_path / "runs"))
+    app = FastAPI()
+    app.include_router(build_simulation_router(manager))
+    client = TestClient(app)
+    try:
+        ids = [
+            manager.start(SimulationLaunchRequest(start=date(2025, 9, 20), until=date(2025, 9, 26), seed=seed)).run_id
+            for seed in (1, 2)
+        ]
+        deadline = time.monotonic() + 120
+        while any(manager.get(run_id).status not in {"completed", "failed"} for run_id in ids):
+            assert time.monotonic() < deadline
+            time.sleep(0.1)
+    finally:
+        manager.close()
+    # Runs leave the series sidecar to the first comparison.
+    assert not list((tmp_path / "runs").rglob("*.npz"))
+
+    response = client.get("/api/simulations/compare", params={"run_a": ids[0], "run_b": ids[1]})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["run_a"] == ids[0] and body["days"] == 6 and body["holders"] >= 1
+    assert client.get("/api/simulations/compare", params={"run_a": ids[0], "run_b": "missing"}).status_code == 404
+    assert len(list((tmp_path / "runs").rglob("*.npz"))) == 2
+
+    monkeypatch.setenv("SIM_RUNS_ROOT", str(tmp_path / "runs"))
+    monkeypatch.setenv("SIM_QUEUE_DB", str(tmp_path / "absent.db"))
+    cli.main(["compare", ids[0], ids[1], "--json"])
+    assert json.loads(capsys.readouterr().out)["days"] == body["days"]
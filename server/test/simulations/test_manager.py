@@ -0,0 +1,217 @@
+import json
+import time
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from server.src.simulations import build_simulation_router
+from server.src.simulations import manager as manager_module
+from server.src.simulations import service
+from server.src.simulations.cache import RunCache, _fingerprint_paths
+from server.src.simulations.compare import compare_runs
+from server.src.simulations.config import SimulationConfig, load_simulation_config
+from server.src.simulations.manager import SimulationRunManager
+from server.src.simulations.schema import SimulationLaunchRequest
+from server.src.simulations.service import run_simulation
+from sim.engines.scheduler import SimulationCancelled
+
+
+def _wait(manager: SimulationRunManager, run_ids, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        runs = [manager.get(run_id) for run_id in run_ids]
+        if all(run.status in {"completed", "failed", "cancelled"} for run in runs):
+            return runs
+        time.sleep(0.1)
+    raise AssertionError("simulation runs did not finish in time")
+
+
+def test_process_mode_isolates_parallel_runs(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_ENABLED", "false")
+    config = SimulationConfig(worker_mode="process", max_workers=2, runs_root=tmp_path / "runs")
+    manager = SimulationRunManager(config=config)
+    try:
+        first = manager.start(SimulationLaunchRequest(start=date(2025, 9, 20), until=date(2025, 9, 24), seed=1))
+        second = manager.start(SimulationLaunchRequest(start=date(2025, 9, 20), until=date(2025, 9, 26), seed=2))
+        runs = _wait(manager, [first.run_id, second.run_id])
+    finally:
+        manager.close()
+
+    assert [run.status for run in runs] == ["completed", "completed"], [run.message for run in runs]
+    for run, days in zip(runs, (5, 7)):
+        assert run.workdir == (tmp_path / "runs" / run.run_id).resolve()
+        assert run.pid is not None
+        assert run.result["output_dir"] == str(run.workdir / "output")
+        assert len(list((run.workdir / "output").glob("day_*.json"))) == days
+        assert len(list((run.workdir / ".sim_saves").glob("*.json"))) == days
+        assert "=== 2025-09-20" in (run.workdir / "console.log").read_text(encoding="utf-8")
+        assert run.to_status().workdir == str(run.workdir)
+    assert (runs[0].workdir / "output" / "finance_run_1_2025-09-20.csv").exists()
+    assert json.loads((runs[1].workdir / ".sim_saves" / "2025-09-26.json").read_text())["date"] == "2025-09-26"
+
+
+def test_process_mode_reports_worker_failures(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_ENABLED", "false")
+    manager = SimulationRunManager(config=SimulationConfig(worker_mode="process", runs_root=tmp_path))
+    try:
+        # No coin prices exist this early, so the finance rules raise inside the worker.
+        run = manager.start(SimulationLaunchRequest(start=date(1999, 1, 1), until=date(1999, 1, 2)))
+        (run,) = _wait(manager, [run.run_id])
+    finally:
+        manager.close()
+    assert run.status == "failed"
+    assert "KeyError" in run.message
+
+
+def test_load_simulation_config_validates_mode():
+    config = load_simulation_config({"SIM_WORKER_MODE": "process", "SIM_WORKERS": "3", "SIM_RUNS_ROOT": "/tmp/runs"})
+    assert config.isolated and config.max_workers == 3 and str(config.runs_root) == "/tmp/runs"
+    assert not load_simulation_config({}).isolated
+    with pytest.raises(ValueError):
+        load_simulation_config({"SIM_WORKER_MODE": "fork"})
+
+
+def test_cancelled_run_resumes_to_identical_output(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_ENABLED", "false")
+    payload = SimulationLaunchRequest(start=date(2025, 9, 20), until=date(2025, 11, 5), seed=9)
+    run_simulation(payload, workdir=tmp_path / "straight")
+
+    seen = []
+    with pytest.raises(SimulationCancelled) as cancelled:
+        run_simulation(
+            payload,
+            workdir=tmp_path / "resumed",
+            on_progress=seen.append,
+            progress_interval=0,
+            should_stop=lambda: len(seen) >= 10,
+        )
+    assert cancelled.value.last_day == date(2025, 9, 29)
+    assert [progress.day_index for progress in seen] == list(range(1, 11))
+    assert seen[-1].total_days == 47 and seen[-1].eta_seconds is not None
+    assert {"events", "finance", "render", "hash", "snapshot"} <= set(seen[-1].phase_ms)
+
+    resumed = run_simulation(payload, workdir=tmp_path / "resumed", on_progress=seen.append, resume_from=cancelled.value.checkpoint)
+    assert seen[-1].day_index == 47 and resumed["checkpoint"].endswith("checkpoint_run_9_2025-09-20.pkl")
+    for relative in (
+        ".sim_saves/2025-11-05.json",
+        "output/finance_run_9_2025-09-20.csv",
+        "output/state_hashes_run_9_2025-09-20.csv",
+        ".sim_logs/2025-11-01.log",
+        "output/mutations_run_9_2025-09-20.bin",
+    ):
+        assert (tmp_path / "resumed" / relative).read_bytes() == (tmp_path / "straight" / relative).read_bytes()
+
+
+def test_runs_sharing_a_directory_keep_their_own_checkpoints(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_ENABLED", "false")
+    first = SimulationLaunchRequest(start=date(2025, 9, 20), until=date(2025, 10, 20), seed=5)
+    second = SimulationLaunchRequest(start=date(2025, 9, 25), until=date(2025, 10, 10), seed=5)
+    seen = []
+    with pytest.raises(SimulationCancelled) as cancelled:
+        run_simulation(first, workdir=tmp_path, on_progress=seen.append, progress_interval=0, should_stop=lambda: len(seen) >= 5)
+    other = run_simulation(second, workdir=tmp_path)
+    assert Path(other["checkpoint"]) != cancelled.value.checkpoint
+
+    resumed = run_simulation(first, workdir=tmp_path, on_progress=seen.append, resume_from=cancelled.value.checkpoint)
+    assert seen[-1].day_index == 31 and resumed["last_day"] == "2025-10-20"
+    with pytest.raises(ValueError, match="different seed, start or step"):
+        run_simulation(first, workdir=tmp_path, resume_from=Path(other["checkpoint"]))
+
+
+def test_manager_cancels_running_run_and_resumes(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_ENABLED", "false")
+    monkeypatch.chdir(tmp_path)
+    manager = SimulationRunManager(config=SimulationConfig(progress_interval=0))
+    real_run = manager_module.run_simulation
+
+    def run_and_cancel_midway(payload, **kwargs):
+        publish = kwargs["on_progress"]
+
+        def on_progress(progress):
+            publish(progress)
+            if progress.day_index == 5 and not kwargs.get("resume_from"):
+                manager.cancel(run.run_id)
+
+        return real_run(payload, **dict(kwargs, on_progress=on_progress))
+
+    monkeypatch.setattr(manager_module, "run_simulation", run_and_cancel_midway)
+    try:
+        run = manager.start(SimulationLaunchRequest(start=date(2025, 9, 20), until=date(2025, 10, 20)))
+        (run,) = _wait(manager, [run.run_id])
+        assert run.status == "cancelled" and run.cancel_requested
+        status = run.to_status()
+        assert status.progress.day_index == 5 and status.progress.total_days == 31
+        assert Path(status.checkpoint).exists()
+        with pytest.raises(ValueError):
+            manager.cancel(run.run_id)
+
+        manager.resume(run.run_id)
+        (run,) = _wait(manager, [run.run_id])
+    finally:
+        manager.close()
+    assert run.status == "completed" and run.progress["day_index"] == 31
+    assert len(list((tmp_path / ".sim_saves").glob("2025-*.json"))) == 31
+
+
+def test_cancel_route_status_codes(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_ENABLED", "false")
+    monkeypatch.chdir(tmp_path)
+    manager = SimulationRunManager(config=SimulationConfig())
+    app = FastAPI()
+    app.include_router(build_simulation_router(manager))
+    client = TestClient(app)
+    try:
+        assert client.post("/api/simulations/missing/cancel").status_code == 404
+        run_id = client.post("/api/simulations/launch", json={"start": "2025-09-20", "until": "2025-09-22"}).json()["run_id"]
+        _wait(manager, [run_id])
+        body = client.get(f"/api/simulations/{run_id}").json()
+        assert body["status"] == "completed" and body["progress"]["day_index"] == 3
+        assert client.post(f"/api/simulations/{run_id}/cancel").status_code == 409
+        assert client.post(f"/api/simulations/{run_id}/resume").status_code == 409
+    finally:
+        manager.close()
+
+
+def test_cache_fingerprint_covers_result_shaping():
+    paths = _fingerprint_paths()
+    assert Path(service.__file__).resolve() in paths
+    assert any(path.name == "coin_prices.csv" for path in paths)
+
+
+def test_run_cache_serves_hits_and_resumes_prefixes(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_ENABLED", "false")
+    config = SimulationConfig(runs_root=tmp_path / "runs", run_cache_enabled=True, run_cache_root=tmp_path / "cache")
+    manager = SimulationRunManager(config=config)
+    short = SimulationLaunchRequest(start=date(2025, 9, 20), until=date(2025, 10, 10), seed=5)
+    longer = short.model_copy(update={"until": date(2025, 10, 31)})
+    try:
+        (first,) = _wait(manager, [manager.start(short).run_id])
+        assert first.status == "completed" and first.cache == "miss"
+
+        hit = manager.start(short.model_copy(update={"fast": False, "metadata": {"client": "ui"}}))
+        assert hit.status == "completed" and hit.cache == "hit" and hit.duration_seconds == 0.0
+        assert hit.workdir.parent == tmp_path / "runs"
+        assert len(list(Path(hit.result["output_dir"]).glob("day_*.json"))) == 21
+        assert Path(hit.result["checkpoint"]).is_file() and Path(hit.result["state_hashes"]).parent == hit.workdir / "output"
+
+        (extended,) = _wait(manager, [manager.start(longer).run_id])
+        assert extended.status == "completed" and extended.cache == "prefix"
+        assert extended.progress["day_index"] == 42
+    finally:
+        manager.close()
+
+    run_simulation(longer, workdir=tmp_path / "straight")
+    for relative in (".sim_saves/2025-10-31.json", "output/finance_run_5_2025-09-20.csv", ".sim_logs/2025-10-31.log"):
+        assert (extended.workdir / relative).read_text() == (tmp_path / "straight" / relative).read_text()
+    # The resumed run wrote into its own copy, not into the cached short run.
+    assert not (hit.workdir / ".sim_saves" / "2025-10-31.json").exists()
+
+    cache = RunCache(tmp_path / "cache", max_entries=1)
+    assert cache.lookup(longer) is not None
+    assert cache.evict() == 1
+    assert cache.lookup(short) is None and cache.lookup(longer) is not None
+    # The hit kept its own copy of the evicted entry.
+    assert compare_runs(Path(hit.result["output_dir"]), first.workdir).identical
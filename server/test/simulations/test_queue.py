@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import shutil
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from server.src.simulations.config import SimulationConfig
+from server.src.simulations.manager import SimulationRunManager
+from server.src.simulations.queue import QueueWorker, RunQueue
+from server.src.simulations.schema import SimulationLaunchRequest
+from server.src.simulations.service import run_simulation
+from sim.engines.scheduler import SimulationCancelled
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+
+def _queue_config(tmp_path, **overrides) -> SimulationConfig:
+    values = dict(worker_mode="queue", queue_path=tmp_path / "queue.db", runs_root=tmp_path / "runs")
+    values.update(overrides)
+    return SimulationConfig(**values)
+
+
+def _payload(seed: int, days: int = 3) -> SimulationLaunchRequest:
+    return SimulationLaunchRequest(start=date(2025, 9, 20), until=date(2025, 9, 19) + timedelta(days=days), seed=seed)
+
+
+def test_cli_workers_drain_durable_queue(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_ENABLED", "false")
+    config = _queue_config(tmp_path)
+    run_ids = [SimulationRunManager(config=config).start(_payload(seed)).run_id for seed in range(4)]
+
+    env = {"SIM_QUEUE_DB": str(config.queue_path), "SIM_RUNS_ROOT": str(config.runs_root), "MEMORY_ENABLED": "false"}
+    workers = [
+        subprocess.Popen(
+            [sys.executable, str(REPO_ROOT / "cli.py"), "worker", "--once"],
+            cwd=tmp_path,
+            env=dict(os.environ, **env),
+            stdout=subprocess.DEVNULL,
+        )
+        for _ in range(2)
+    ]
+    assert [worker.wait(timeout=120) for worker in workers] == [0, 0]
+
+    # A fresh manager (an API restart) still sees every run and its artifacts.
+    statuses = SimulationRunManager(config=config).list()
+    assert set(statuses) == set(run_ids)
+    for run_id, status in statuses.items():
+        assert status.status == "completed" and status.progress.day_index == 3
+        assert Path(status.result["saves_dir"], "2025-09-22.json").exists()
+        assert Path(status.result["saves_dir"]).parent.parent == Path(status.workdir)
+    with sqlite3.connect(config.queue_path) as connection:
+        assert connection.execute("SELECT DISTINCT attempts FROM simulation_runs").fetchall() == [(1,)]
+
+
+def test_expired_lease_is_reclaimed_then_abandoned(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_ENABLED", "false")
+    config = _queue_config(tmp_path)
+    queue = RunQueue(config.queue_path, lease_seconds=0.2, max_attempts=2)
+    manager = SimulationRunManager(config=config)
+    run_id = manager.start(_payload(1)).run_id
+
+    crashed = queue.claim("crashed-worker")
+    assert crashed._lease_token
+    assert crashed.run_id == run_id and queue.claim("other") is None
+    time.sleep(0.3)
+
+    worker = QueueWorker(queue, config, worker_id="healthy-worker")
+    assert worker.run_once() == run_id
+    assert manager.get(run_id).status == "completed"
+    # The crashed worker's late report is ignored.
+    crashed.status = "failed"
+    assert not queue.finish(crashed, crashed._lease_token)
+    assert manager.get(run_id).status == "completed"
+
+    stuck_id = manager.start(_payload(2)).run_id
+    queue.claim("first")
+    time.sleep(0.3)
+    queue.claim("second")
+    time.sleep(0.3)
+    assert queue.claim("third") is None
+    stuck = manager.get(stuck_id)
+    assert stuck.status == "failed" and "lease expired 2 time(s)" in stuck.message
+
+
+def test_queue_cancel_and_resume(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_ENABLED", "false")
+    manager = SimulationRunManager(config=_queue_config(tmp_path))
+    queued = manager.start(_payload(1))
+    assert manager.cancel(queued.run_id).status == "cancelled"
+
+    running = manager.start(_payload(2, days=30))
+    claimed = manager.queue.claim("worker")
+    assert claimed.run_id == running.run_id
+    token = claimed._lease_token
+    assert manager.queue.heartbeat(running.run_id, token, {"day": "2025-09-21"}) is False
+    assert manager.cancel(running.run_id).cancel_requested
+    assert manager.queue.heartbeat(running.run_id, token) is True
+    assert manager.queue.heartbeat(running.run_id, "stale-token") is None
+
+    # What the worker does once its scheduler sees the flag: stop with a checkpoint and report.
+    try:
+        run_simulation(running.payload, workdir=claimed.workdir, should_stop=lambda: True)
+    except SimulationCancelled as exc:
+        claimed.status, claimed.checkpoint = "cancelled", str(exc.checkpoint)
+    assert manager.queue.finish(claimed, token)
+
+    assert manager.resume(running.run_id).status == "queued"
+    assert QueueWorker(manager.queue, manager.config).run_once() == running.run_id
+    resumed = manager.get(running.run_id)
+    assert resumed.status == "completed" and resumed.progress["day_index"] == 30
+    assert len(list(Path(resumed.result["saves_dir"]).glob("2025-*.json"))) == 30
+
+
+def test_reclaimed_resume_starts_from_a_clean_copy_of_its_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_ENABLED", "false")
+    config = _queue_config(tmp_path)
+    queue = RunQueue(config.queue_path, lease_seconds=0.2)
+    manager = SimulationRunManager(config=config)
+    run = manager.start(_payload(3, days=12))
+
+    first = queue.claim("first")
+    with pytest.raises(SimulationCancelled) as cancelled:
+        run_simulation(run.payload, workdir=first.workdir / "attempt-first", should_stop=lambda: True)
+    first.status, first.checkpoint = "cancelled", str(cancelled.value.checkpoint)
+    assert queue.finish(first, first._lease_token)
+    manager.resume(run.run_id)
+
+    # The resumed attempt dies after running ahead of its checkpoint; its lease lapses.
+    stale = queue.claim("stale")
+    stale_dir = stale.workdir / f"attempt-{stale._lease_token}"
+    shutil.copytree(first.workdir / "attempt-first", stale_dir)
+    run_simulation(run.payload, workdir=stale_dir, resume_from=stale_dir / ".sim_saves" / Path(first.checkpoint).name)
+    time.sleep(0.3)
+
+    assert QueueWorker(queue, config, worker_id="healthy").run_once() == run.run_id
+    done = manager.get(run.run_id)
+    assert done.status == "completed"
+    saves = Path(done.result["saves_dir"])
+    straight = run_simulation(run.payload, workdir=tmp_path / "straight")
+    for name in ("finance_run_3_2025-09-20.csv", "state_hashes_run_3_2025-09-20.csv"):
+        assert (saves.parent / "output" / name).read_text() == (Path(straight["output_dir"]) / name).read_text()
+    # The stale worker's late report is fenced off, and only the finishing attempt's directory remains.
+    stale.status = "failed"
+    assert not queue.finish(stale, stale._lease_token)
+    assert [path.name for path in done.workdir.iterdir()] == [saves.parent.name]
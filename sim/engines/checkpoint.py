@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import os
+import pickle
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sim.engines.statehash import StateHasher
+from sim.world.state import WorldState
+
+CHECKPOINT_VERSION = 2
+
+
+@dataclass
+class Checkpoint:
+    """Everything needed to continue a run after ``last_day`` exactly as if it had never stopped."""
+
+    last_day: date
+    index: int
+    step: str
+    seed: int
+    # First day of the run; with the seed and step it identifies which run the checkpoint continues.
+    start: Optional[date]
+    state: WorldState
+    rng_state: Any
+    renderer_state: Dict[str, Any] = field(default_factory=dict)
+    # Older checkpoints predate state hashing; unpickling them falls back to this default.
+    state_hasher: Optional[StateHasher] = None
+    version: int = CHECKPOINT_VERSION
+
+
+def save_checkpoint(path: Path, checkpoint: Checkpoint) -> Path:
+    """Atomically write ``checkpoint`` so a crash mid-write never leaves a truncated file behind."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("wb") as handle:
+        pickle.dump(checkpoint, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return path
+
+
+def load_checkpoint(path: Path) -> Checkpoint:
+    with Path(path).open("rb") as handle:
+        checkpoint = pickle.load(handle)
+    if not isinstance(checkpoint, Checkpoint) or checkpoint.version != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} is not a version {CHECKPOINT_VERSION} simulation checkpoint")
+    return checkpoint
+
+
+__all__ = ["Checkpoint", "load_checkpoint", "save_checkpoint"]
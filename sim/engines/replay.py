@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import copy
+from bisect import bisect_right
+from datetime import date
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from sim.world.mutations import CASH, JOURNAL, METRICS_PREFIX, TOKENS_PREFIX, Mutation, read_mutations
+from sim.world.state import WorldState, data_fingerprint
+
+
+def apply_mutations(state: WorldState, mutations: Iterable[Mutation]) -> WorldState:
+    """Apply logged changes through the same mutators that made them, so values match bit for bit."""
+    for mutation in mutations:
+        name = mutation.field
+        if name == CASH:
+            state.people[mutation.entity].adjust_cash(mutation.delta)  # type: ignore[arg-type]
+        elif name.startswith(TOKENS_PREFIX):
+            state.people[mutation.entity].add_tokens(name[len(TOKENS_PREFIX) :], mutation.delta)  # type: ignore[arg-type]
+        elif name.startswith(METRICS_PREFIX):
+            key = name[len(METRICS_PREFIX) :]
+            state.metrics[key] = state.metrics.get(key, 0.0) + mutation.delta  # type: ignore[operator]
+        elif name == JOURNAL:
+            state.journal.append(mutation.delta)  # type: ignore[arg-type]
+        else:
+            raise ValueError(f"Cannot replay a change to {mutation.entity}.{name}")
+    return state
+
+
+class ReplayEngine:
+    """Rebuilds a run's world at any day from its mutation log, without running rules or rendering.
+
+    The log is read once; each ``state_at`` copies the initial world and applies the entries up to
+    that day, so scrubbing back and forth costs a copy plus the changes in between. Without an
+    explicit ``base`` the initial world is rebuilt from the data files, which must be the ones the
+    run started from.
+    """
+
+    def __init__(self, log_path: Path, *, base: Optional[WorldState] = None) -> None:
+        seed, recorded, self.mutations = read_mutations(log_path)
+        if base is None:
+            if recorded != data_fingerprint():
+                raise ValueError(
+                    f"{log_path} was recorded against different world data; pass its original world as base"
+                )
+            base = WorldState.from_files(seed=seed)
+        self.base = base
+        # Entries before the first day (``day`` is None) sort first.
+        self._days: List[int] = [mutation.day.toordinal() if mutation.day else 0 for mutation in self.mutations]
+
+    def state_at(self, day: date) -> WorldState:
+        """The world at the end of ``day``."""
+        end = bisect_right(self._days, day.toordinal())
+        return apply_mutations(copy.deepcopy(self.base), self.mutations[:end])
+
+    def changed_days(self) -> List[date]:
+        return sorted({mutation.day for mutation in self.mutations if mutation.day is not None})
+
+    def iter_states(self) -> Iterator[Tuple[date, WorldState]]:
+        """The world after each day that changed it, in order; the same object is yielded each time."""
+        state = copy.deepcopy(self.base)
+        start = 0
+        for day in self.changed_days():
+            end = bisect_right(self._days, day.toordinal(), lo=start)
+            apply_mutations(state, self.mutations[start:end])
+            start = end
+            yield day, state
+
+
+def replay_state(log_path: Path, day: date, *, base: Optional[WorldState] = None) -> WorldState:
+    return ReplayEngine(log_path, base=base).state_at(day)
+
+
+__all__ = ["ReplayEngine", "apply_mutations", "replay_state"]
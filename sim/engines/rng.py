@@ -13,6 +13,12 @@ class RNG:
         self.seed = seed
         self._random = random.Random(seed)
 
+    def getstate(self) -> object:
+        return self._random.getstate()
+
+    def setstate(self, state: object) -> None:
+        self._random.setstate(state)
+
     def random(self) -> float:
         return self._random.random()
 
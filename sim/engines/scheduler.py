@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import time
+from dataclasses import asdict, dataclass, field
 from datetime import date
-from typing import List, Optional
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
 
+from sim.engines.checkpoint import Checkpoint, save_checkpoint
 from sim.engines.rng import RNG
+from sim.engines.statehash import StateHasher, StateHashMismatch
 from sim.output.render import DailyRenderer
 from sim.time import SimClock
 from sim.world.events import run_scripted_events
@@ -14,10 +18,36 @@ from sim.world.rules import (
     apply_romance_rules,
     apply_social_rules,
 )
-from sim.world.state import WorldState
+from sim.world.mutations import MutationLog
+from sim.world.state import WorldState, data_fingerprint
 from sim.world.choices import Choice, pick_choices
 
 
+@dataclass
+class SchedulerProgress:
+    day: date
+    day_index: int
+    total_days: int
+    elapsed_seconds: float
+    days_per_second: float
+    eta_seconds: Optional[float]
+    phase_ms: Dict[str, float]
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload = asdict(self)
+        payload["day"] = self.day.isoformat()
+        return payload
+
+
+class SimulationCancelled(Exception):
+    """Raised at a day boundary once ``should_stop`` reports true; ``checkpoint`` resumes after ``last_day``."""
+
+    def __init__(self, last_day: date, checkpoint: Optional[Path]) -> None:
+        super().__init__(f"Simulation cancelled after {last_day.isoformat()}")
+        self.last_day = last_day
+        self.checkpoint = checkpoint
+
+
 @dataclass
 class SimulationScheduler:
     state: WorldState
@@ -26,12 +56,80 @@ class SimulationScheduler:
     rng: RNG
     interactive: bool = False
     memory_bridge: Optional[object] = None
+    on_progress: Optional[Callable[[SchedulerProgress], None]] = None
+    progress_interval: float = 0.5
+    should_stop: Optional[Callable[[], bool]] = None
+    checkpoint_path: Optional[Path] = None
+    start_index: int = 1
+    hasher: StateHasher = field(default_factory=StateHasher)
+    expected_hashes: Optional[Dict[date, str]] = None
+    last_day: Optional[date] = field(default=None, init=False)
+    _phase_seconds: Dict[str, float] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # A state restored from a checkpoint keeps its log, which then continues the file it was flushed to.
+        if self.state.mutations is None:
+            self.state.mutations = MutationLog(
+                self.renderer.mutation_log_path, seed=self.rng.seed, data_fingerprint=data_fingerprint()
+            )
+        else:
+            self.state.mutations.path = self.renderer.mutation_log_path
 
     def run(self) -> None:
-        for index, day in enumerate(self.clock, start=1):
+        total = self.start_index - 1 + self.clock.total_steps
+        started = time.perf_counter()
+        last_published = float("-inf")
+        last_day: Optional[date] = None
+        index = self.start_index - 1
+        for index, day in enumerate(self.clock, start=self.start_index):
             self._run_single_day(day=day, index=index)
+            last_day = self.last_day = day
+            now = time.perf_counter()
+            if self.on_progress and (index == total or now - last_published >= self.progress_interval):
+                last_published = now
+                self.on_progress(self._progress(day, index, total, now - started))
+            if self.should_stop and index < total and self.should_stop():
+                raise SimulationCancelled(day, self.write_checkpoint(day, index))
+        if last_day is not None:
+            # The final checkpoint lets a later run extend this range without replaying it.
+            self.write_checkpoint(last_day, index)
+
+    def write_checkpoint(self, day: date, index: int) -> Optional[Path]:
+        if self.checkpoint_path is None:
+            return None
+        checkpoint = Checkpoint(
+            last_day=day,
+            index=index,
+            step=self.clock.step,
+            seed=self.rng.seed,
+            start=self.renderer.start,
+            state=self.state,
+            rng_state=self.rng.getstate(),
+            renderer_state=self.renderer.checkpoint_state(),
+            state_hasher=self.hasher,
+        )
+        return save_checkpoint(self.checkpoint_path, checkpoint)
+
+    def _progress(self, day: date, index: int, total: int, elapsed: float) -> SchedulerProgress:
+        completed = index - self.start_index + 1
+        rate = completed / elapsed if elapsed > 0 else 0.0
+        return SchedulerProgress(
+            day=day,
+            day_index=index,
+            total_days=total,
+            elapsed_seconds=round(elapsed, 3),
+            days_per_second=round(rate, 2),
+            eta_seconds=round((total - index) / rate, 1) if rate > 0 else None,
+            phase_ms={phase: round(seconds * 1000 / completed, 3) for phase, seconds in self._phase_seconds.items()},
+        )
+
+    def _lap(self, phase: str, since: float) -> float:
+        now = time.perf_counter()
+        self._phase_seconds[phase] = self._phase_seconds.get(phase, 0.0) + (now - since)
+        return now
 
     def _run_single_day(self, *, day: date, index: int) -> None:
+        mark = time.perf_counter()
         calendar_week = ((index - 1) // 7) + 1
         moods = self.state.mood_snapshot()
         location = self.state.primary_location()
@@ -45,12 +143,18 @@ class SimulationScheduler:
             clock_step=self.clock.step,
         )
 
+        mutations = self.state.mutations
+        mutations.at(day, "event")
         run_scripted_events(day, state=self.state, rng=self.rng, renderer=self.renderer)
+        mark = self._lap("events", mark)
 
+        mutations.at(day, "rule")
         apply_finance_rules(day, state=self.state, renderer=self.renderer)
+        mark = self._lap("finance", mark)
         apply_social_rules(day, state=self.state, rng=self.rng, renderer=self.renderer)
         apply_romance_rules(day, state=self.state, rng=self.rng, renderer=self.renderer)
         apply_legal_rules(day, state=self.state, rng=self.rng, renderer=self.renderer)
+        mark = self._lap("rules", mark)
 
         choices: List[Choice] = []
         if self.interactive:
@@ -63,17 +167,30 @@ class SimulationScheduler:
         if self.interactive and choices:
             selection = self.renderer.read_choice_input(len(choices))
             if selection is not None:
+                mutations.at(day, f"choice:{choices[selection].id}")
                 outcome_lines = choices[selection].effect(self.state, day.isoformat())
                 self.state.append_journal(outcome_lines)
                 self.renderer.present_choice_result(outcome_lines)
+        mark = self._lap("render", mark)
+
+        digest = self.hasher.update(day, self.state, self.rng)
+        expected = self.expected_hashes.get(day) if self.expected_hashes is not None else None
+        if expected is not None and expected != digest:
+            raise StateHashMismatch(day, expected, digest)
+        self.renderer.record_state_hash(digest)
+        mark = self._lap("hash", mark)
 
         self.renderer.maybe_render_weekly_summary()
         self.renderer.maybe_render_monthly_summary()
         self.renderer.finalise_day()
+        mark = self._lap("render", mark)
 
-        self.state.save_snapshot(day)
+        self.state.save_snapshot(day, self.renderer.saves_dir)
+        mutations.flush()
+        mark = self._lap("snapshot", mark)
         if self.memory_bridge:
             try:
                 self.memory_bridge.on_day_complete(day, self.state)
             except Exception:  # pragma: no cover - memory bridge is optional
                 pass
+            self._lap("memory", mark)
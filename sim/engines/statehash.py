@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import csv
+import struct
+from array import array
+from dataclasses import dataclass
+from datetime import date
+from hashlib import blake2b
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from sim.engines.rng import RNG
+from sim.output.render import STATE_HASHES_PARAMETERS
+from sim.world.state import WorldState
+
+DIGEST_SIZE = 16
+STATE_HASHES_PREFIX = "state_hashes_"
+
+
+class StateHashMismatch(Exception):
+    """Raised by a verifying run on the first day whose state hash differs from the recorded one."""
+
+    def __init__(self, day: date, expected: str, actual: str) -> None:
+        super().__init__(f"State hash mismatch on {day.isoformat()}: expected {expected}, got {actual}")
+        self.day = day
+        self.expected = expected
+        self.actual = actual
+
+
+@dataclass
+class StateHasher:
+    """Chained digest of the world at each day boundary.
+
+    A day's hash covers holdings, metrics, relationships, the journal and the RNG state, and folds
+    in the previous day's hash, so two runs with equal hashes on a day have equal histories up to it.
+    Journal lines are hashed once, when they first appear, so the daily cost does not grow with the run.
+    The hasher is plain data and travels in checkpoints, so resumed runs continue the same chain.
+    """
+
+    chain: bytes = b""
+    journal_digest: bytes = b""
+    journal_length: int = 0
+
+    def update(self, day: date, state: WorldState, rng: RNG) -> str:
+        self._absorb_journal(state.journal)
+        digest = blake2b(self.chain, digest_size=DIGEST_SIZE)
+        _text(digest, day.isoformat())
+        for person_id in sorted(state.people):
+            holdings = state.people[person_id].holdings
+            tokens = sorted(holdings.tokens.items())
+            _text(digest, person_id)
+            _floats(digest, [holdings.cash_usd, holdings.equities_usd])
+            _text(digest, "\0".join(symbol for symbol, _ in tokens))
+            _floats(digest, [quantity for _, quantity in tokens])
+        metrics = sorted(state.metrics.items())
+        _text(digest, "\0".join(key for key, _ in metrics))
+        _floats(digest, [value for _, value in metrics])
+        for relationship in state.relationships:
+            _text(digest, f"{relationship.src_id}\0{relationship.dst_id}\0{chr(1).join(relationship.tags)}")
+            _floats(digest, [relationship.weight])
+        digest.update(struct.pack("<q", self.journal_length))
+        digest.update(self.journal_digest)
+        version, internal, gauss_next = rng.getstate()  # type: ignore[misc]
+        digest.update(struct.pack("<q", version))
+        digest.update(array("Q", internal).tobytes())
+        _floats(digest, [float("nan") if gauss_next is None else gauss_next])
+        self.chain = digest.digest()
+        return self.chain.hex()
+
+    def _absorb_journal(self, journal: list) -> None:
+        if len(journal) < self.journal_length:
+            # The journal was replaced rather than appended to; start its digest over.
+            self.journal_digest, self.journal_length = b"", 0
+        if len(journal) == self.journal_length:
+            return
+        digest = blake2b(self.journal_digest, digest_size=DIGEST_SIZE)
+        for line in journal[self.journal_length :]:
+            _text(digest, line)
+        self.journal_digest = digest.digest()
+        self.journal_length = len(journal)
+
+
+def _text(digest: "blake2b", value: str) -> None:
+    digest.update(value.encode("utf-8"))
+    digest.update(b"\0")
+
+
+def _floats(digest: "blake2b", values: Iterable[float]) -> None:
+    values = list(values)
+    digest.update(struct.pack(f"<{len(values)}d", *values))
+
+
+def locate_state_hashes(path: Path, run_tag: Optional[str] = None) -> Path:
+    """Find a run's hash CSV given the CSV itself, an ``output/`` directory or a run working directory."""
+    path = Path(path)
+    if path.is_file():
+        return path
+    output_dir = path / "output" if (path / "output").is_dir() else path
+    if run_tag is not None:
+        candidate = output_dir / f"{STATE_HASHES_PREFIX}{run_tag}.csv"
+        if candidate.exists():
+            return candidate
+        raise FileNotFoundError(f"No {candidate.name} in {output_dir}")
+    matches = sorted(output_dir.glob(f"{STATE_HASHES_PREFIX}run_*.csv"))
+    if len(matches) != 1:
+        found = ", ".join(match.name for match in matches) or "none"
+        raise FileNotFoundError(f"Expected one {STATE_HASHES_PREFIX}run_*.csv in {output_dir} (found {found}); pass the CSV path")
+    return matches[0]
+
+
+def read_state_hashes(path: Path) -> Dict[date, str]:
+    """Recorded hashes of a run, in day order, from its ``state_hashes_<run>.csv``."""
+    with Path(path).open(newline="", encoding="utf-8") as handle:
+        lines = (line for line in handle if not line.startswith(STATE_HASHES_PARAMETERS))
+        return {date.fromisoformat(row["date"]): row["hash"] for row in csv.DictReader(lines)}
+
+
+def recorded_parameters(path: Path) -> Tuple[int, date, str]:
+    """Seed, start and step of the run that wrote ``path``, from the parameter line at its top."""
+    with Path(path).open(encoding="utf-8") as handle:
+        first = handle.readline()
+    if not first.startswith(STATE_HASHES_PARAMETERS):
+        raise ValueError(f"{path} does not record the parameters of the run that wrote it")
+    try:
+        values = dict(item.split("=", 1) for item in first[len(STATE_HASHES_PARAMETERS) :].strip().split(","))
+        return int(values["seed"]), date.fromisoformat(values["start"]), values["step"]
+    except (KeyError, ValueError) as exc:
+        raise ValueError(f"{path} has a malformed parameter line: {first.strip()!r}") from exc
+
+
+__all__ = [
+    "STATE_HASHES_PREFIX",
+    "StateHashMismatch",
+    "StateHasher",
+    "locate_state_hashes",
+    "read_state_hashes",
+    "recorded_parameters",
+]
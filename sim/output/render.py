@@ -7,6 +7,8 @@ from datetime import date
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Sequence
 
+# First line of a state hash file: the run parameters ``cli.py verify`` replays.
+STATE_HASHES_PARAMETERS = "# "
 
 @dataclass
 class SectionLine:
@@ -29,6 +31,7 @@ class DailyRenderer:
         start: Optional[date] = None,
         story_length: str = "adaptive",
         story_tone: str = "neutral",
+        base_dir: Optional[Path] = None,
     ) -> None:
         self.fast = fast
         self.view = view
@@ -47,15 +50,21 @@ class DailyRenderer:
         base_run = f"{seed}_{start.isoformat()}" if start else str(seed)
         self.run_id = f"run_{base_run}"
 
-        self.logs_dir = Path(".sim_logs")
+        # Artifacts land under ``base_dir`` (the CWD by default) so concurrent runs can be kept apart.
+        root = Path(base_dir) if base_dir is not None else Path()
+        self.logs_dir = root / ".sim_logs"
         self.logs_dir.mkdir(parents=True, exist_ok=True)
-        self.saves_dir = Path(".sim_saves")
+        self.saves_dir = root / ".sim_saves"
         self.saves_dir.mkdir(parents=True, exist_ok=True)
-        self.output_dir = Path("output")
+        self.output_dir = root / "output"
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
         self.finance_csv_path = self.output_dir / f"finance_{self.run_id}.csv"
         self.social_csv_path = self.output_dir / f"social_{self.run_id}.csv"
+        self.state_hashes_path = self.output_dir / f"state_hashes_{self.run_id}.csv"
+        self.mutation_log_path = self.output_dir / f"mutations_{self.run_id}.bin"
+        # Tagged like the outputs, so runs sharing a directory never resume from each other's checkpoint.
+        self.checkpoint_path = self.saves_dir / f"checkpoint_{self.run_id}.pkl"
         self._ensure_csv_headers()
 
         self._history: List[Dict[str, object]] = []
@@ -202,6 +211,9 @@ class DailyRenderer:
                     for line in summary:
                         print(line)
 
+    def record_state_hash(self, digest: str) -> None:
+        self._state_hash = digest
+
     def finalise_day(self) -> None:
         if not self._day:
             raise RuntimeError("start_day must be called before finalise_day")
@@ -217,11 +229,13 @@ class DailyRenderer:
             "moods": self._moods,
             "sections": self._current_sections_payload,
             "choices": self._choice_payload,
+            "state_hash": self._state_hash,
         }
         json_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
 
         self._append_finance_csv()
         self._append_social_csv()
+        self._append_state_hash()
 
         self._history.append(
             {
@@ -250,6 +264,7 @@ class DailyRenderer:
         self._finance_entries: List[Dict[str, object]] = []
         self._social_records: List[Dict[str, object]] = []
         self._current_sections_payload: Dict[str, List[str]] = {}
+        self._state_hash: Optional[str] = None
 
     def _ensure_csv_headers(self) -> None:
         if not self.finance_csv_path.exists():
@@ -293,6 +308,19 @@ class DailyRenderer:
                     ]
                 )
 
+    def _append_state_hash(self) -> None:
+        if self._state_hash is None or self._day is None:
+            return
+        new_file = not self.state_hashes_path.exists()
+        with self.state_hashes_path.open("a", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            if new_file:
+                # The run's parameters travel inside the file, so a renamed copy can still be replayed.
+                start = self.start.isoformat() if self.start else ""
+                handle.write(f"{STATE_HASHES_PARAMETERS}seed={self.seed},start={start},step={self._clock_step}\n")
+                writer.writerow(["date", "day_index", "hash"])
+            writer.writerow([self._day.isoformat(), self._index, self._state_hash])
+
     def _build_layout(self, choices: Sequence[dict] | None = None) -> List[str]:
         lines: List[SectionLine] = []
         header = self._build_header_line()
@@ -433,6 +461,14 @@ class DailyRenderer:
             self._last_finance_values[holder] = value
         return delta
 
+    def checkpoint_state(self) -> Dict[str, object]:
+        """Cross-day state needed to continue a run from a checkpoint (summary history, last valuations)."""
+        return {"history": list(self._history), "last_finance_values": dict(self._last_finance_values)}
+
+    def restore_checkpoint_state(self, payload: Dict[str, object]) -> None:
+        self._history = list(payload.get("history", []))  # type: ignore[arg-type]
+        self._last_finance_values = dict(payload.get("last_finance_values", {}))  # type: ignore[arg-type]
+
     @property
     def sections_payload(self) -> Dict[str, List[str]]:
         return self._current_sections_payload
@@ -40,6 +40,15 @@ class SimClock:
     def day_index(self) -> int:
         return self._index
 
+    @property
+    def total_steps(self) -> int:
+        """Number of timesteps ``iter`` yields for the inclusive range."""
+        span = (self.end - self.start).days
+        return span + 1 if self.step == "day" else span // 7 + 1
+
+    def next_after(self, day: date) -> date:
+        return day + (timedelta(days=1) if self.step == "day" else timedelta(weeks=1))
+
     def iter(self) -> Generator[date, None, None]:
         """Yield each timestep inclusive of the end date."""
         self.current = self.start
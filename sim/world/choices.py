@@ -50,9 +50,9 @@ def _trim_origin_effect(state: WorldState, date_str: str) -> List[str]:
     price = state.price_for_str(date_str)
     quantity = thomas.token_quantity(state.coin_symbol)
     sell_units = quantity * 0.03
-    thomas.holdings.tokens[state.coin_symbol] = max(quantity - sell_units, 0.0)
+    state.add_tokens("thomas", state.coin_symbol, -sell_units)
     proceeds = sell_units * price
-    thomas.adjust_cash(proceeds)
+    state.adjust_cash("thomas", proceeds)
     state.adjust_metric("thomas_cash_realised", proceeds)
     return [
         f"Thomas trims 3% of ORIGIN, selling {sell_units:,.0f} units at ${price:.2f} for ${proceeds:,.0f} cash.",
@@ -71,9 +71,9 @@ def _jordy_take_profit_effect(state: WorldState, date_str: str) -> List[str]:
     price = state.price_for_str(date_str)
     quantity = jordy.token_quantity(state.coin_symbol)
     sell_units = quantity * 0.02
-    jordy.holdings.tokens[state.coin_symbol] = max(quantity - sell_units, 0.0)
+    state.add_tokens("jordy", state.coin_symbol, -sell_units)
     proceeds = sell_units * price
-    jordy.adjust_cash(proceeds)
+    state.adjust_cash("jordy", proceeds)
     state.adjust_metric("jordy_cash_realised", proceeds)
     return [
         f"Jordy quietly slices 2% of ORIGIN ({sell_units:,.0f} units) at ${price:.2f}, banking ${proceeds:,.0f} for ops.",
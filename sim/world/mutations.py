@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import io
+import struct
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+MAGIC = b"LWML"
+LOG_VERSION = 2
+
+# Header: magic, format version, run seed, SHA-256 of the world data the run started from.
+_HEADER = struct.Struct("<4sBq32s")
+# Every record starts with a one-byte tag. Names are interned: a string record defines the next id.
+_TAG_STRING = 1
+_TAG_DELTA = 2
+_TAG_TEXT = 3
+_STRING = struct.Struct("<BH")
+# tag, day ordinal (0 before the first day), source id, entity id, field id, then a float64 delta ...
+_DELTA = struct.Struct("<BIHHHd")
+# ... or a uint32 length and that many UTF-8 bytes of text.
+_TEXT = struct.Struct("<BIHHHI")
+
+# Entity of world-level fields (metrics and the journal).
+WORLD = "world"
+CASH = "cash_usd"
+JOURNAL = "journal"
+TOKENS_PREFIX = "tokens."
+METRICS_PREFIX = "metrics."
+
+
+class Mutation(NamedTuple):
+    """One change to a ``WorldState``; ``delta`` is the text of journal lines and numeric otherwise."""
+
+    day: Optional[date]
+    source: str
+    entity: str
+    field: str
+    delta: Union[float, str]
+
+
+@dataclass
+class MutationLog:
+    """Append-only binary record of every change made to a ``WorldState``.
+
+    The state calls ``record`` from its mutators; the scheduler sets the day and source with ``at``
+    and calls ``flush`` once per day. ``size`` is the length of the file as of the last flush, so a
+    log restored from a checkpoint drops anything a crashed run appended after it.
+    ``data_fingerprint`` identifies the world data the entries apply to.
+    """
+
+    path: Path
+    seed: int = 0
+    data_fingerprint: bytes = b""
+    day: Optional[date] = None
+    source: str = "setup"
+    size: int = 0
+    _names: Dict[str, int] = field(default_factory=dict, repr=False)
+    _pending: bytearray = field(default_factory=bytearray, repr=False)
+
+    def at(self, day: date, source: str) -> None:
+        self.day = day
+        self.source = source
+
+    def record(self, entity: str, field_name: str, delta: float) -> None:
+        self._pending += _DELTA.pack(_TAG_DELTA, *self._key(entity, field_name), float(delta))
+
+    def record_text(self, entity: str, field_name: str, text: str) -> None:
+        encoded = text.encode("utf-8")
+        self._pending += _TEXT.pack(_TAG_TEXT, *self._key(entity, field_name), len(encoded))
+        self._pending += encoded
+
+    def flush(self) -> None:
+        if self.size and not self._pending:
+            return
+        path = Path(self.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A new log replaces whatever an earlier run left at this path.
+        with path.open("r+b" if self.size else "wb") as handle:
+            if handle.seek(0, io.SEEK_END) < self.size:
+                raise ValueError(f"{path} is shorter than the log it should continue ({self.size} bytes)")
+            handle.truncate(self.size)
+            handle.seek(self.size)
+            if not self.size:
+                handle.write(_HEADER.pack(MAGIC, LOG_VERSION, self.seed, self.data_fingerprint))
+            handle.write(self._pending)
+            self.size = handle.tell()
+        self._pending.clear()
+
+    def _key(self, entity: str, field_name: str) -> Tuple[int, int, int, int]:
+        day = self.day.toordinal() if self.day else 0
+        return day, self._name(self.source), self._name(entity), self._name(field_name)
+
+    def _name(self, name: str) -> int:
+        index = self._names.get(name)
+        if index is None:
+            encoded = name.encode("utf-8")
+            self._pending += _STRING.pack(_TAG_STRING, len(encoded))
+            self._pending += encoded
+            index = self._names[name] = len(self._names)
+        return index
+
+
+def read_mutations(path: Path) -> Tuple[int, bytes, List[Mutation]]:
+    """The seed, world data fingerprint and entries of a mutation log, in the order they were made."""
+    data = Path(path).read_bytes()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"{path} is not a mutation log")
+    magic, version, seed, data_fingerprint = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != LOG_VERSION:
+        raise ValueError(f"{path} is not a version {LOG_VERSION} mutation log")
+
+    names: List[str] = []
+    days: Dict[int, Optional[date]] = {0: None}
+    mutations: List[Mutation] = []
+    offset, end = _HEADER.size, len(data)
+    while offset < end:
+        tag = data[offset]
+        if tag == _TAG_STRING:
+            _, length = _STRING.unpack_from(data, offset)
+            offset += _STRING.size
+            names.append(data[offset : offset + length].decode("utf-8"))
+            offset += length
+            continue
+        if tag == _TAG_DELTA:
+            _, ordinal, source, entity, field_id, delta = _DELTA.unpack_from(data, offset)
+            offset += _DELTA.size
+        elif tag == _TAG_TEXT:
+            _, ordinal, source, entity, field_id, length = _TEXT.unpack_from(data, offset)
+            offset += _TEXT.size
+            delta = data[offset : offset + length].decode("utf-8")
+            offset += length
+        else:
+            raise ValueError(f"{path} has an unknown record tag {tag} at byte {offset}")
+        day = days.get(ordinal)
+        if day is None and ordinal:
+            day = days[ordinal] = date.fromordinal(ordinal)
+        mutations.append(Mutation(day, names[source], names[entity], names[field_id], delta))
+    return seed, data_fingerprint, mutations
+
+
+__all__ = [
+    "CASH",
+    "JOURNAL",
+    "METRICS_PREFIX",
+    "Mutation",
+    "MutationLog",
+    "TOKENS_PREFIX",
+    "WORLD",
+    "read_mutations",
+]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 import json
 from dataclasses import dataclass, field
 from datetime import date
@@ -9,6 +10,20 @@ from typing import Dict, Iterable, List, Optional
 from sim import config
 from sim.entities import Business, Person, Relationship, RealEstate, Vehicle
 from sim.world import loaders
+from sim.world.mutations import CASH, JOURNAL, METRICS_PREFIX, TOKENS_PREFIX, WORLD, MutationLog
+
+DATA_ROOT = Path(__file__).resolve().parents[1] / "data"
+
+
+def data_fingerprint(data_root: Optional[Path] = None) -> bytes:
+    """SHA-256 of the files ``WorldState.from_files`` builds the initial world from."""
+    root = data_root or DATA_ROOT
+    digest = hashlib.sha256()
+    for path in sorted(path for path in root.iterdir() if path.is_file()):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+    return digest.digest()
 
 
 @dataclass
@@ -24,6 +39,8 @@ class WorldState:
     seed: int
     metrics: Dict[str, float] = field(default_factory=dict)
     journal: List[str] = field(default_factory=list)
+    # Every mutator below records into this log when one is attached.
+    mutations: Optional[MutationLog] = field(default=None, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         self.coin_symbol = config.COIN_SYMBOL
@@ -38,7 +55,7 @@ class WorldState:
         *,
         seed: int = 1337,
     ) -> "WorldState":
-        data_root = base_path or Path(__file__).resolve().parents[1] / "data"
+        data_root = base_path or DATA_ROOT
         people = loaders.load_people(data_root / "people.yaml")
         relationships = loaders.load_relationships(data_root / "relationships.yaml")
         estates, vehicles, businesses = loaders.load_households(data_root / "households.yaml")
@@ -99,9 +116,23 @@ class WorldState:
         for line in lines:
             if line:
                 self.journal.append(line)
+                if self.mutations is not None:
+                    self.mutations.record_text(WORLD, JOURNAL, line)
 
     def adjust_metric(self, key: str, delta: float) -> None:
         self.metrics[key] = self.metrics.get(key, 0.0) + delta
+        if self.mutations is not None:
+            self.mutations.record(WORLD, METRICS_PREFIX + key, delta)
+
+    def adjust_cash(self, person_id: str, delta: float) -> None:
+        self.people[person_id].adjust_cash(delta)
+        if self.mutations is not None:
+            self.mutations.record(person_id, CASH, delta)
+
+    def add_tokens(self, person_id: str, symbol: str, quantity: float) -> None:
+        self.people[person_id].add_tokens(symbol, quantity)
+        if self.mutations is not None:
+            self.mutations.record(person_id, TOKENS_PREFIX + symbol, quantity)
 
     def save_snapshot(self, day: date, directory: Optional[Path] = None) -> None:
         save_dir = directory or Path(".sim_saves")
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import copy
+import itertools
+import json
+import shutil
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+from io import StringIO
+
+import pytest
+
+import cli
+from sim.engines.replay import ReplayEngine
+from sim.engines.rng import RNG
+from sim.engines.scheduler import SimulationScheduler
+from sim.output.render import DailyRenderer
+from sim.time import SimClock
+from sim.world.mutations import MutationLog, read_mutations
+from sim.world.state import DATA_ROOT, WorldState, data_fingerprint
+
+START, UNTIL = date(2025, 9, 20), date(2025, 10, 9)
+
+
+def _interactive_run(tmp_path, monkeypatch) -> SimulationScheduler:
+    answers = itertools.cycle(["1", "3", "2", "skip"])
+    monkeypatch.setattr("builtins.input", lambda *_: next(answers))
+    renderer = DailyRenderer(fast=True, interactive=True, seed=4, start=START, base_dir=tmp_path)
+    scheduler = SimulationScheduler(
+        state=WorldState.from_files(seed=4),
+        clock=SimClock(START, UNTIL),
+        renderer=renderer,
+        rng=RNG(4),
+        interactive=True,
+    )
+    with redirect_stdout(StringIO()):
+        scheduler.run()
+    return scheduler
+
+
+def test_replay_rebuilds_every_day_from_the_log(tmp_path, monkeypatch):
+    scheduler = _interactive_run(tmp_path, monkeypatch)
+    log_path = scheduler.renderer.mutation_log_path
+    seed, recorded, mutations = read_mutations(log_path)
+    assert seed == 4 and recorded == data_fingerprint()
+    assert {mutation.source for mutation in mutations} >= {"event", "choice:tell_ella", "choice:trim_origin"}
+    buy_in = next(mutation for mutation in mutations if mutation.source == "event")
+    assert buy_in.day == date(2025, 9, 21) and buy_in.field == "cash_usd" and buy_in.delta == -100_000
+
+    engine = ReplayEngine(log_path)
+    day = START
+    while day <= UNTIL:
+        snapshot = json.loads((scheduler.renderer.saves_dir / f"{day.isoformat()}.json").read_text())
+        replayed = engine.state_at(day)
+        for person_id, person in snapshot["people"].items():
+            assert replayed.people[person_id].holdings.cash_usd == person["holdings"]["cash_usd"]
+            assert replayed.people[person_id].holdings.tokens == person["holdings"]["tokens"]
+        assert replayed.metrics == snapshot["metrics"]
+        assert replayed.journal[-10:] == snapshot["journal_tail"]
+        day += timedelta(days=1)
+
+    final = engine.state_at(UNTIL)
+    assert final.journal == scheduler.state.journal
+    assert [day for day, _ in engine.iter_states()] == engine.changed_days()
+
+
+def test_restored_log_drops_writes_made_after_its_checkpoint(tmp_path):
+    log = MutationLog(tmp_path / "mutations.bin", seed=1)
+    log.at(START, "event")
+    log.record("thomas", "cash_usd", -5.0)
+    log.flush()
+    checkpointed = copy.deepcopy(log)
+
+    log.at(START + timedelta(days=1), "rule")
+    log.record("thomas", "cash_usd", -7.0)
+    log.flush()
+    assert len(read_mutations(log.path)[2]) == 2
+
+    checkpointed.at(START + timedelta(days=1), "choice:prep_ato")
+    checkpointed.record_text("world", "journal", "Replayed day two.")
+    checkpointed.flush()
+    _, _, mutations = read_mutations(log.path)
+    assert [(mutation.source, mutation.delta) for mutation in mutations] == [
+        ("event", -5.0),
+        ("choice:prep_ato", "Replayed day two."),
+    ]
+
+
+def test_replay_refuses_a_log_recorded_against_other_world_data(tmp_path, monkeypatch):
+    log_path = _interactive_run(tmp_path, monkeypatch).renderer.mutation_log_path
+    data_root = tmp_path / "data"
+    shutil.copytree(DATA_ROOT, data_root)
+    with (data_root / "coin_prices.csv").open("a", encoding="utf-8") as handle:
+        handle.write("\n")
+    monkeypatch.setattr("sim.world.state.DATA_ROOT", data_root)
+
+    with pytest.raises(ValueError, match="different world data"):
+        ReplayEngine(log_path)
+    # An explicitly supplied base is the caller's to vouch for.
+    assert ReplayEngine(log_path, base=WorldState.from_files(DATA_ROOT, seed=4)).state_at(UNTIL).journal
+
+
+def test_a_repeated_run_replaces_the_previous_log(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEMORY_ENABLED", "false")
+    monkeypatch.chdir(tmp_path)
+    args = ["run", "--start", "2025-09-20", "--until", "2025-10-20", "--seed", "7", "--fast"]
+    log_path = tmp_path / "output" / "mutations_run_7_2025-09-20.bin"
+    with redirect_stdout(StringIO()):
+        cli.main(args)
+        first = log_path.read_bytes()
+        cli.main(args)
+    assert log_path.read_bytes() == first
@@ -26,16 +26,8 @@ def _prep_renderer(
         start=date(2025, 9, 20),
         story_length=story_length,
         story_tone=story_tone,
+        base_dir=tmp_path,
     )
-    renderer.logs_dir = tmp_path / "logs"
-    renderer.logs_dir.mkdir(parents=True, exist_ok=True)
-    renderer.saves_dir = tmp_path / "saves"
-    renderer.saves_dir.mkdir(parents=True, exist_ok=True)
-    renderer.output_dir = tmp_path / "out"
-    renderer.output_dir.mkdir(parents=True, exist_ok=True)
-    renderer.finance_csv_path = renderer.output_dir / f"finance_{renderer.run_id}.csv"
-    renderer.social_csv_path = renderer.output_dir / f"social_{renderer.run_id}.csv"
-    renderer._ensure_csv_headers()
     return renderer
 
 